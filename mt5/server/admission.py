@@ -0,0 +1,200 @@
+"""
+Admission Controller for MT5 Trading HTTP Server.
+Rate limits and bounds concurrent trade requests, shedding load with 429.
+"""
+
+import logging
+import math
+import threading
+import time
+from collections import OrderedDict
+from typing import Dict, Any, Optional
+
+
+class TokenBucket:
+    """Token bucket refilled continuously at a fixed rate."""
+
+    __slots__ = ('rate', 'capacity', 'tokens', 'updated_at')
+
+    def __init__(self, rate: float, capacity: float):
+        """
+        Initialize token bucket.
+
+        Args:
+            rate: Tokens added per second
+            capacity: Maximum tokens (burst size)
+        """
+        self.rate = rate
+        self.capacity = capacity
+        self.tokens = capacity
+        self.updated_at = time.monotonic()
+
+    def wait_time(self) -> float:
+        """
+        Refill and check for a token without taking it (caller holds the controller lock).
+
+        Returns:
+            0 if a token is available, otherwise seconds until one is
+        """
+        now = time.monotonic()
+        self.tokens = min(self.capacity, self.tokens + (now - self.updated_at) * self.rate)
+        self.updated_at = now
+        if self.tokens >= 1:
+            return 0.0
+        return (1 - self.tokens) / self.rate
+
+    def take(self) -> None:
+        """Take the token found by wait_time() (caller holds the controller lock)."""
+        self.tokens -= 1
+
+    def refund(self) -> None:
+        """Return a token taken for a request that was not admitted."""
+        self.tokens = min(self.capacity, self.tokens + 1)
+
+
+class AdmissionDecision:
+    """Outcome of an admission attempt."""
+
+    __slots__ = ('admitted', 'reason', 'retry_after')
+
+    def __init__(self, admitted: bool, reason: str = None, retry_after: float = 0.0):
+        self.admitted = admitted
+        self.reason = reason
+        self.retry_after = retry_after
+
+    @property
+    def retry_after_header(self) -> str:
+        """Retry-After header value in whole seconds."""
+        return str(max(1, int(math.ceil(self.retry_after))))
+
+
+class AdmissionController:
+    """
+    Gate in front of the trade endpoints.
+
+    A request must take a token from both its API key bucket and its client IP
+    bucket, then a concurrency slot. When all slots are busy it may wait in a
+    bounded queue for queue_timeout_ms; beyond that it is shed and its tokens
+    are returned. Trade requests only validate and schedule, so they hold a
+    server thread for milliseconds; max_concurrent + max_queue should be at
+    least the server thread count, so a burst of alerts at bar close waits
+    briefly instead of being shed. /health never passes through this gate.
+    """
+
+    def __init__(self, rate_config: Dict[str, Any] = None, admission_config: Dict[str, Any] = None):
+        """
+        Initialize admission controller.
+
+        Args:
+            rate_config: performance.rate_limiting configuration dictionary (optional)
+            admission_config: performance.admission configuration dictionary (optional)
+        """
+        rate_config = rate_config or {}
+        admission_config = admission_config or {}
+        self.logger = logging.getLogger('mt5_server.admission')
+
+        self.rate_limiting = rate_config.get('enabled', False)
+        self.rate = rate_config.get('requests_per_minute', 600) / 60.0
+        self.burst = rate_config.get('burst_size', 60)
+        self.max_buckets = admission_config.get('max_buckets', 10000)
+
+        self.max_concurrent = admission_config.get('max_concurrent', 4)
+        self.max_queue = admission_config.get('max_queue', 4)
+        self.queue_timeout = admission_config.get('queue_timeout_ms', 1000) / 1000.0
+
+        self._buckets: 'OrderedDict[str, TokenBucket]' = OrderedDict()
+        self._condition = threading.Condition()
+        self._active = 0
+        self._waiting = 0
+        self._stats = {'admitted': 0, 'rate_limited': 0, 'queue_full': 0, 'queue_timeout': 0,
+                       'queued': 0, 'max_waiting': 0}
+
+    def acquire(self, api_key: Optional[str], client_ip: Optional[str]) -> AdmissionDecision:
+        """
+        Try to admit a request; an admitted request must call release().
+
+        Args:
+            api_key: API key presented by the request (optional)
+            client_ip: Client IP address (optional)
+
+        Returns:
+            Admission decision
+        """
+        with self._condition:
+            buckets = []
+            if self.rate_limiting:
+                if api_key:
+                    buckets.append(self._bucket(f"key:{api_key}"))
+                if client_ip:
+                    buckets.append(self._bucket(f"ip:{client_ip}"))
+                # Check every bucket before taking from any, so a rejection costs no tokens
+                retry_after = max((bucket.wait_time() for bucket in buckets), default=0.0)
+                if retry_after > 0:
+                    self._stats['rate_limited'] += 1
+                    return AdmissionDecision(False, 'rate_limited', retry_after)
+                for bucket in buckets:
+                    bucket.take()
+
+            if self._active >= self.max_concurrent:
+                if self._waiting >= self.max_queue:
+                    self._refund(buckets)
+                    self._stats['queue_full'] += 1
+                    return AdmissionDecision(False, 'queue_full', self.queue_timeout)
+
+                self._waiting += 1
+                self._stats['queued'] += 1
+                self._stats['max_waiting'] = max(self._stats['max_waiting'], self._waiting)
+                try:
+                    admitted = self._condition.wait_for(lambda: self._active < self.max_concurrent,
+                                                        self.queue_timeout)
+                finally:
+                    self._waiting -= 1
+                if not admitted:
+                    self._refund(buckets)
+                    self._stats['queue_timeout'] += 1
+                    return AdmissionDecision(False, 'queue_timeout', self.queue_timeout)
+
+            self._active += 1
+            self._stats['admitted'] += 1
+            return AdmissionDecision(True)
+
+    def release(self) -> None:
+        """Release a concurrency slot taken by an admitted request."""
+        with self._condition:
+            self._active -= 1
+            self._condition.notify()
+
+    def get_stats(self) -> Dict[str, Any]:
+        """
+        Get admission statistics.
+
+        Returns:
+            Statistics dictionary
+        """
+        with self._condition:
+            stats = dict(self._stats)
+            stats['active'] = self._active
+            stats['queue_depth'] = self._waiting
+            stats['buckets'] = len(self._buckets)
+        stats['rejected'] = stats['rate_limited'] + stats['queue_full'] + stats['queue_timeout']
+        stats['max_concurrent'] = self.max_concurrent
+        stats['max_queue'] = self.max_queue
+        stats['rate_limiting'] = self.rate_limiting
+        return stats
+
+    @staticmethod
+    def _refund(buckets) -> None:
+        """Return the tokens of a request shed after passing the rate limit (caller holds the lock)."""
+        for bucket in buckets:
+            bucket.refund()
+
+    def _bucket(self, key: str) -> TokenBucket:
+        """Get or create the bucket for a key, evicting the least recently used (caller holds the lock)."""
+        bucket = self._buckets.get(key)
+        if bucket is None:
+            bucket = self._buckets[key] = TokenBucket(self.rate, self.burst)
+            if len(self._buckets) > self.max_buckets:
+                self._buckets.popitem(last=False)
+        else:
+            self._buckets.move_to_end(key)
+        return bucket
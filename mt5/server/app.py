@@ -6,22 +6,34 @@ A Flask-based HTTP server for executing MT5 trades via webhook calls.
 
 import os
 import sys
+import json
 import logging
-import time
 from datetime import datetime
-from flask import Flask, request, jsonify
+from functools import wraps
+from flask import Flask, Response, request, jsonify, g, stream_with_context
 from flask_cors import CORS
 
 # Add current directory to Python path
 sys.path.append(os.path.dirname(os.path.abspath(__file__)))
 
+import mt5_backend
 from config_manager import ConfigManager
 from mt5_connector import MT5Connector
 from trading_manager import TradingManager
-from utils.logger import setup_logger
-from utils.validators import validate_webhook_payload, validate_api_key
+from scheduler import ExecutionScheduler, JobStatus
+from idempotency import IdempotencyStore
+from intake_journal import IntakeJournal
+from trade_journal import TradeJournal
+from coalescer import SignalCoalescer
+from admission import AdmissionController
+from tick_streamer import TickStreamer
+from payload_cache import PayloadCache
+from utils.logger import setup_logger, stop_logging, get_logging_stats
+from utils.validators import compile_webhook_validator, validate_api_key, get_request_api_key
 from utils.exceptions import MT5Error, ConfigError, ValidationError
-from utils.chinese_parser import parse_chinese_message
+from utils.ip_allowlist import IPAllowlist
+from utils.tracing import tracer
+from utils.chinese_parser import ChineseMessageParser, parse_chinese_message
 
 # Initialize Flask app
 app = Flask(__name__)
@@ -31,12 +43,21 @@ CORS(app)
 config_manager = None
 mt5_connector = None
 trading_manager = None
+scheduler = None
+idempotency_store = None
+intake_journal = None
+trade_journal = None
+admission = None
+tick_streamer = None
+payload_cache = None
+webhook_validator = None
+ip_allowlist = None
 logger = None
 
 
 def initialize_app():
     """Initialize the application components."""
-    global config_manager, mt5_connector, trading_manager, logger
+    global config_manager, mt5_connector, trading_manager, scheduler, idempotency_store, intake_journal, trade_journal, admission, tick_streamer, payload_cache, webhook_validator, ip_allowlist, logger
 
     try:
         # Load configuration
@@ -45,17 +66,75 @@ def initialize_app():
 
         # Setup logging
         logger = setup_logger(config['logging'])
+
+        # Stage latency histograms exported on /metrics
+        tracer.configure(config.get('tracing', {}))
         logger.info("Starting MT5 Trading HTTP Server...")
 
+        # Client IP allowlist, compiled once; enforced before every request except /health
+        ip_allowlist = build_ip_allowlist(config)
+
         # Initialize MT5 connector (使用当前已登录的MT5)
         mt5_connector = MT5Connector(config['mt5'])
         if not mt5_connector.connect():
             raise MT5Error("Failed to connect to MT5 terminal")
 
+        # Stream ticks in the background so pricing reads the latest tick without IPC
+        tick_streamer = TickStreamer(mt5_connector, config.get('tick_stream', {}),
+                                     config['trading'].get('allowed_symbols', []))
+        if tick_streamer.enabled:
+            tick_streamer.start()
+            mt5_connector.attach_tick_streamer(tick_streamer)
+
         # Initialize trading manager
-        trading_config = config['trading'].copy()
-        trading_config['custom_intervals'] = config.get('custom_intervals', {})
-        trading_manager = TradingManager(mt5_connector, trading_config)
+        trading_manager = TradingManager(mt5_connector, trading_config_from(config))
+
+        # Structured, indexed record of every order sent to MT5
+        trade_journal = TradeJournal(config.get('trade_journal', {}))
+        if trade_journal.enabled:
+            trade_journal.start()
+            trading_manager.attach_trade_journal(trade_journal)
+        else:
+            trade_journal = None
+
+        # Start execution scheduler for webhook trades
+        coalescer = SignalCoalescer(trading_manager, config.get('coalescing', {}))
+        scheduler = ExecutionScheduler(trading_manager.execute_webhook_trade, config.get('scheduler', {}),
+                                       coalescer if coalescer.enabled else None)
+        scheduler.start()
+
+        # Suppress duplicate alerts; outcomes are recorded so duplicates get the original result.
+        # Registered before the journal replay so replayed jobs record their outcome too
+        idempotency_store = IdempotencyStore(config.get('idempotency', {}))
+        scheduler.add_listener(idempotency_store.record_outcome)
+
+        # Replay trades accepted before a crash but never completed
+        intake_journal = IntakeJournal(config.get('intake_journal', {}))
+        if intake_journal.enabled:
+            scheduler.add_listener(intake_journal.record_done)
+            for record in intake_journal.recover():
+                if 'legs' in record:
+                    replay_atomic_batch(record)
+                else:
+                    scheduler.submit(record['payload'], record['run_at'], job_id=record['job_id'])
+            intake_journal.start()
+        else:
+            intake_journal = None
+
+        # Admission control for trade endpoints; /health is never gated
+        performance_config = config.get('performance') or {}
+        admission = AdmissionController(performance_config.get('rate_limiting'),
+                                        performance_config.get('admission'))
+
+        # Webhook rules, defaults and trading limits compiled into one validator
+        webhook_validator = compile_webhook_validator(config['webhook'], config['trading'])
+
+        # Repeated alert templates skip parsing and validation; validation depends on config
+        payload_cache = PayloadCache(config['webhook'].get('parse_cache'))
+
+        # Apply configuration file changes without a restart
+        config_manager.add_reload_listener(apply_config_reload)
+        config_manager.start_watcher()
 
         logger.info("Application initialized successfully")
         return True
@@ -68,6 +147,117 @@ def initialize_app():
         return False
 
 
+def build_ip_allowlist(config):
+    """Compile the client IP allowlist from a configuration snapshot."""
+    security = config['server'].get('security') or {}
+    return IPAllowlist(security.get('allowed_ips'), security.get('trusted_proxies'))
+
+
+def trading_config_from(config):
+    """Build the trading manager configuration from a configuration snapshot."""
+    trading_config = dict(config['trading'])
+    trading_config['custom_intervals'] = config.get('custom_intervals', {})
+    return trading_config
+
+
+def apply_config_reload(config):
+    """
+    Apply a reloaded configuration snapshot to the running components.
+
+    Settings read per request (API key) follow the snapshot automatically;
+    compiled state (IP allowlist, validators, trading hours) is rebuilt here. Worker counts, ports and
+    other startup settings still need a restart.
+
+    Args:
+        config: Newly published configuration snapshot
+    """
+    global webhook_validator, ip_allowlist
+    ip_allowlist = build_ip_allowlist(config)
+    webhook_validator = compile_webhook_validator(config['webhook'], config['trading'])
+    payload_cache.clear()
+    trading_manager.reload_config(trading_config_from(config))
+    logger.info(f"Applied configuration version {config.version}")
+
+
+@app.before_request
+def enforce_ip_allowlist():
+    """Reject clients outside server.security.allowed_ips; /health stays open for monitoring."""
+    if ip_allowlist is None:
+        return None
+
+    allowed, g.client_ip = ip_allowlist.check(request.remote_addr, request.headers.get('X-Forwarded-For'))
+    if allowed or request.endpoint == 'health_check':
+        return None
+
+    logger.warning(f"Request to {request.path} from {g.client_ip} rejected: IP not allowed")
+    return jsonify({'error': 'IP address not allowed'}), 403
+
+
+@app.before_request
+def open_ipc_scope():
+    """Attribute the MT5 calls made while serving a request to the request's endpoint."""
+    if mt5_connector is not None:
+        g.ipc_scope = mt5_connector.executor.open_scope(request.endpoint or 'unknown')
+
+
+@app.after_request
+def attach_ipc_debug(response):
+    """Add the request's MT5 call accounting to JSON responses when ?debug=ipc is given."""
+    scope = g.get('ipc_scope')
+    if scope is None or not ipc_debug_requested() or not response.is_json:
+        return response
+
+    body = response.get_json(silent=True)
+    if isinstance(body, dict):
+        body['ipc'] = scope.to_dict()
+        response.set_data(json.dumps(body))
+    return response
+
+
+@app.teardown_request
+def close_ipc_scope(error=None):
+    """Close the request's IPC scope and count it in the executor statistics."""
+    scope = g.pop('ipc_scope', None)
+    if scope is not None:
+        mt5_connector.executor.close_scope(scope)
+
+
+def ipc_debug_requested():
+    """Whether the client asked for MT5 IPC accounting (?debug=ipc or X-Debug: ipc)."""
+    return 'ipc' in (request.args.get('debug') or request.headers.get('X-Debug') or '').lower().split(',')
+
+
+def admission_controlled(func):
+    """
+    Decorator gating an endpoint through the admission controller.
+
+    Rejected requests get 429 with a Retry-After header.
+    """
+    @wraps(func)
+    def wrapper(*args, **kwargs):
+        if admission is None:
+            return func(*args, **kwargs)
+
+        client_ip = g.get('client_ip', request.remote_addr)
+        decision = admission.acquire(get_request_api_key(request), client_ip)
+        if not decision.admitted:
+            logger.warning(f"Request to {request.path} from {client_ip} shed: {decision.reason}")
+            response = jsonify({
+                'error': 'Too many requests',
+                'reason': decision.reason,
+                'retry_after': decision.retry_after_header
+            })
+            response.headers['Retry-After'] = decision.retry_after_header
+            return response, 429
+
+        try:
+            return func(*args, **kwargs)
+        finally:
+            admission.release()
+
+    return wrapper
+
+
 @app.route('/health', methods=['GET'])
 def health_check():
     """Health check endpoint."""
@@ -82,7 +272,9 @@ def health_check():
         return jsonify({
             'status': 'healthy' if mt5_status else 'unhealthy',
             'mt5_connected': mt5_status,
+            'connection_state': mt5_connector.state if mt5_connector else None,
             'account_info': account_info,
+            'tick_age_ms': tick_streamer.get_stats()['tick_age_ms'] if tick_streamer else None,
             'timestamp': trading_manager.get_server_time() if trading_manager else None
         })
     except Exception as e:
@@ -103,8 +295,26 @@ def get_status():
 
         return jsonify({
             'server_status': 'running',
+            'config': config_manager.get_stats(),
             'mt5_connected': mt5_connector.is_connected() if mt5_connector else False,
+            'connection': mt5_connector.get_connection_status() if mt5_connector else None,
             'account_info': account_info,
+            'scheduler': scheduler.get_stats() if scheduler else None,
+            'execution_lanes': scheduler.lanes.get_stats() if scheduler else None,
+            'coalescing': scheduler.coalescer.get_stats() if scheduler and scheduler.coalescer else None,
+            'admission': admission.get_stats() if admission else None,
+            'ip_allowlist': ip_allowlist.get_stats() if ip_allowlist else None,
+            'logging': get_logging_stats(),
+            'tracing': tracer.get_stats(),
+            'idempotency': idempotency_store.get_stats() if idempotency_store else None,
+            'payload_cache': payload_cache.get_stats() if payload_cache else None,
+            'intake_journal': intake_journal.get_stats() if intake_journal else None,
+            'trade_journal': trade_journal.get_stats() if trade_journal else None,
+            'mt5_backend': mt5_backend.get_stats(),
+            'mt5_executor': mt5_connector.executor.get_stats() if mt5_connector else None,
+            'symbol_cache': mt5_connector.symbol_cache.get_stats() if mt5_connector else None,
+            'tick_stream': tick_streamer.get_stats() if tick_streamer else None,
+            'trading_hours': trading_manager.trading_hours.explain() if trading_manager else None,
             'timestamp': trading_manager.get_server_time() if trading_manager else None
         })
     except Exception as e:
@@ -133,9 +343,41 @@ def get_positions():
 
 
 
+@app.route('/quote/<symbol>', methods=['GET'])
+def get_quote(symbol):
+    """Get the latest quote for a symbol, optionally with recent streamed ticks."""
+    try:
+        # Validate API key if required
+        if not validate_api_key(request, config_manager.get_config()['server'].get('security', {})):
+            return jsonify({'error': 'Invalid API key'}), 401
+
+        symbol = symbol.upper()
+        quote = mt5_connector.get_quote(symbol) if mt5_connector else None
+        if not quote:
+            return jsonify({'error': f'No quote available for {symbol}'}), 404
+
+        response = {
+            'success': True,
+            'symbol': symbol,
+            'quote': quote
+        }
+
+        history = request.args.get('history', type=int)
+        if history:
+            response['ticks'] = tick_streamer.history(symbol, history) if tick_streamer else []
+
+        return jsonify(response)
+    except Exception as e:
+        logger.error(f"Get quote failed: {e}")
+        return jsonify({'error': str(e)}), 500
+
+
 @app.route('/webhook', methods=['POST'])
+@tracer.trace('webhook')
+@admission_controlled
 def webhook():
     """Handle TradingView webhook requests."""
+    tracer.mark('webhook.admission')
     try:
         # Validate API key if required
         if not validate_api_key(request, config_manager.get_config()['server'].get('security', {})):
@@ -144,7 +386,13 @@ def webhook():
         # Get request data - support both JSON and plain text
         content_type = request.content_type or ''
 
-        if 'application/json' in content_type:
+        # Repeated alert templates: reuse the parsed and validated payload
+        cache_key = payload_cache.make_key(content_type, request.get_data())
+        cached_payload = payload_cache.get(cache_key)
+
+        if cached_payload is not None:
+            payload = cached_payload
+        elif 'application/json' in content_type:
             # JSON format
             payload = request.get_json()
             if not payload:
@@ -169,10 +417,10 @@ def webhook():
             # Check if it's Chinese message format in JSON
             if 'message' in payload and isinstance(payload['message'], str):
                 try:
-                    logger.info(f"Parsing Chinese message from JSON: {payload['message']}")
+                    logger.info("Parsing Chinese message from JSON: %s", payload['message'])
                     parsed_payload = parse_chinese_message(payload['message'])
                     payload = parsed_payload
-                    logger.info(f"Parsed to: {payload}")
+                    logger.info("Parsed to: %s", payload)
                 except ValidationError as e:
                     logger.warning(f"Chinese message parsing error: {e}")
                     return jsonify({'error': f'中文消息解析错误: {str(e)}'}), 400
@@ -183,41 +431,63 @@ def webhook():
                 return jsonify({'error': 'No message provided'}), 400
 
             try:
-                logger.info(f"Parsing Chinese message from text: {message}")
+                logger.info("Parsing Chinese message from text: %s", message)
                 payload = parse_chinese_message(message.strip())
-                logger.info(f"Parsed to: {payload}")
+                logger.info("Parsed to: %s", payload)
             except ValidationError as e:
                 logger.warning(f"Chinese message parsing error: {e}")
                 return jsonify({'error': f'中文消息解析错误: {str(e)}'}), 400
 
-        # Validate webhook payload
-        validation_result = validate_webhook_payload(payload, config_manager.get_config()['webhook'])
-        if not validation_result['valid']:
-            return jsonify({'error': validation_result['message']}), 400
+        tracer.mark('webhook.parse')
+
+        if cached_payload is None:
+            # Validate webhook payload
+            validation_result = webhook_validator(payload)
+            if not validation_result['valid']:
+                return jsonify({'error': validation_result['message'], 'errors': validation_result['errors']}), 400
+            payload_cache.put(cache_key, payload)
+
+        tracer.label(payload.get('action'), payload.get('symbol'))
+        tracer.mark('webhook.validate')
 
         # Log webhook received
-        logger.info(f"Webhook received: {payload}")
+        logger.info("Webhook received: %s", payload)
 
         # 移除账户参数（如果存在），因为现在只使用当前登录的账户
         if 'account_id' in payload:
             del payload['account_id']
 
-        # 计算到这个分钟结束需要等待的秒数
-        now = datetime.now()
-        seconds_to_next_minute = 60 - now.second # + 60  # 下个分钟的00秒
-        logger.info(f"Current time: {now.strftime('%H:%M:%S')}, waiting {seconds_to_next_minute} seconds")
-        
-        # 等待到下个分钟结束
-        time.sleep(seconds_to_next_minute)
-        
-        # Execute trade
-        result = trading_manager.execute_webhook_trade(payload)
+        alert_id = request.headers.get('X-Alert-Id') or payload.pop('alert_id', None)
+
+        if idempotency_store and idempotency_store.enabled:
+            # 同一告警重复发送时返回首次执行的任务，不再重复下单
+            key = idempotency_store.make_key(payload, alert_id)
+            entry, created = idempotency_store.execute_once(key, lambda: schedule_trade(payload))
+            if not created:
+                return duplicate_alert_response(entry)
+            job = scheduler.get_job(entry['job_id'])
+        else:
+            # 调度到这个分钟结束时执行，不再占用请求线程等待
+            job = schedule_trade(payload)
+
+        tracer.mark('webhook.schedule')
+
+        # 确认前等待日志落盘（组提交，多个请求共享一次刷盘）
+        if intake_journal and not intake_journal.sync(timeout=1.0):
+            logger.warning(f"Intake journal sync timed out for job {job.id}")
+
+        tracer.mark('webhook.journal_sync')
+
+        logger.info(f"Trade scheduled as job {job.id} for "
+                    f"{datetime.fromtimestamp(job.run_at).strftime('%H:%M:%S')}")
 
         return jsonify({
             'success': True,
-            'message': 'Trade executed successfully',
-            'result': result
-        })
+            'message': 'Trade scheduled for execution at bar close',
+            'job_id': job.id,
+            'status': job.status,
+            'scheduled_for': datetime.fromtimestamp(job.run_at).isoformat()
+        }), 202
         
     except ValidationError as e:
         logger.warning(f"Webhook validation error: {e}")
@@ -230,7 +500,337 @@ def webhook():
         return jsonify({'error': 'Internal server error'}), 500
 
 
+def schedule_trade(payload):
+    """
+    Journal a validated trade and schedule it for the bar close.
+
+    Args:
+        payload: Validated trade payload
+
+    Returns:
+        Scheduled job
+    """
+    run_at = scheduler.next_minute_boundary()
+    job_id = scheduler.new_job_id()
+    if intake_journal:
+        intake_journal.append(job_id, payload, run_at)
+    return scheduler.submit(payload, run_at, job_id=job_id)
+
+
+def duplicate_alert_response(entry):
+    """
+    Build the response for a duplicate alert from the original job.
+
+    A duplicate arriving while the original job is executing waits for it,
+    so both copies receive the same trade result.
+
+    Args:
+        entry: Idempotency entry of the original alert
+
+    Returns:
+        Flask response tuple
+    """
+    job = scheduler.get_job(entry['job_id'])
+    if job and job.status == JobStatus.RUNNING:
+        job.wait(timeout=mt5_connector.executor.timeout)
+
+    logger.info(f"Duplicate alert suppressed, original job {entry['job_id']}")
+    if job:
+        original = job.to_dict()
+    else:
+        # Job predates a restart or has been purged; use the recorded outcome
+        original = {
+            'job_id': entry['job_id'],
+            'status': entry['status'],
+            'result': entry['result'],
+            'error': entry['error']
+        }
+
+    return jsonify({
+        'success': True,
+        'duplicate': True,
+        'message': 'Duplicate alert - returning original execution',
+        'job_id': entry['job_id'],
+        'status': original['status'],
+        'job': original
+    }), 200
+
+
+def schedule_batch(payloads, atomic=False):
+    """
+    Journal validated legs and schedule them as one batch for the bar close.
+
+    Args:
+        payloads: Validated trade payloads, one per leg
+        atomic: Roll back filled entries when any leg fails
+
+    Returns:
+        Scheduled batch
+    """
+    run_at = scheduler.next_minute_boundary()
+    batch_id = scheduler.new_job_id()
+    job_ids = [scheduler.new_job_id() for _ in payloads]
+    if intake_journal:
+        if atomic:
+            # One record, so recovery replays the basket with its rollback
+            intake_journal.append_batch(batch_id, job_ids, payloads, run_at)
+        else:
+            for job_id, payload in zip(job_ids, payloads):
+                intake_journal.append(job_id, payload, run_at)
+    return scheduler.submit_batch(payloads, run_at, job_ids, atomic,
+                                  trading_manager.rollback_entries if atomic else None, batch_id)
+
+
+def replay_atomic_batch(record):
+    """
+    Reschedule an atomic batch recovered from the intake journal.
+
+    A batch interrupted before any leg finished is scheduled again as a
+    whole. Once some legs have finished, the rest can no longer be sent as
+    one basket, so the batch is abandoned and its filled entries are rolled
+    back.
+
+    Args:
+        record: Recovered accept record of the batch
+    """
+    legs = record['legs']
+    finished = record.get('finished_legs', {})
+    if not finished:
+        scheduler.submit_batch([leg['payload'] for leg in legs], record['run_at'],
+                               [leg['job_id'] for leg in legs], True,
+                               trading_manager.rollback_entries, record['job_id'])
+        return
+
+    filled = [leg['result'] for leg in finished.values()
+              if leg['status'] == JobStatus.COMPLETED and leg['result']]
+    unfinished = len(legs) - len(finished)
+    logger.warning(f"Atomic batch {record['job_id']} was interrupted after {len(finished)} of {len(legs)} legs "
+                   f"finished; rolling back {len(filled)} filled entries"
+                   + (f", {unfinished} legs may have been in flight, check MT5 positions" if unfinished else ""))
+    try:
+        result = trading_manager.rollback_entries(filled)
+        status = JobStatus.ROLLED_BACK
+        logger.info(f"Rolled back interrupted batch {record['job_id']}: "
+                    f"{len(result.get('closed_positions', []))} positions closed")
+    except Exception as e:
+        logger.error(f"Failed to roll back interrupted batch {record['job_id']}: {e}")
+        status = JobStatus.FAILED
+    intake_journal.mark_done(record['job_id'], status)
+
+
+def parse_batch_legs(webhook_config):
+    """
+    Parse and validate every leg of a batch request before anything is scheduled.
+
+    Accepts a JSON array of payloads, a JSON object with an "orders" array and
+    optional "atomic" flag, or plain text with Chinese commands separated by
+    newlines or semicolons.
+
+    Args:
+        webhook_config: Webhook configuration
+
+    Returns:
+        (validated payloads, atomic flag, list of per-leg errors)
+    """
+    atomic = request.args.get('atomic', '').lower() in ('1', 'true', 'yes')
+    content_type = request.content_type or ''
+
+    if 'application/json' in content_type:
+        body = request.get_json(silent=True)
+        if isinstance(body, dict):
+            atomic = atomic or bool(body.get('atomic'))
+            body = body.get('orders')
+        if not isinstance(body, list):
+            raise ValidationError("Batch must be a JSON array or an object with an 'orders' array")
+        raw_legs = body
+    else:
+        message = request.get_data(as_text=True)
+        raw_legs = ChineseMessageParser().split_commands(message)
+
+    if not raw_legs:
+        raise ValidationError("Batch contains no orders")
+
+    max_batch_size = webhook_config.get('max_batch_size', 50)
+    if len(raw_legs) > max_batch_size:
+        raise ValidationError(f"Batch contains {len(raw_legs)} orders, maximum is {max_batch_size}")
+
+    payloads, errors = [], []
+    for index, leg in enumerate(raw_legs):
+        try:
+            if isinstance(leg, str):
+                payload = parse_chinese_message(leg)
+            elif isinstance(leg, dict):
+                payload = dict(leg)
+                if isinstance(payload.get('message'), str):
+                    payload = parse_chinese_message(payload['message'])
+            else:
+                raise ValidationError("Order must be an object or a Chinese command string")
+
+            validation_result = webhook_validator(payload)
+            if not validation_result['valid']:
+                raise ValidationError(validation_result['message'])
+
+            payload.pop('account_id', None)
+            payload.pop('alert_id', None)
+            payloads.append(payload)
+        except ValidationError as e:
+            errors.append({'leg': index, 'error': str(e)})
+
+    if atomic and not errors:
+        for index, payload in enumerate(payloads):
+            if payload['action'].lower() not in ('buy', 'sell'):
+                errors.append({'leg': index, 'error': 'Atomic batches may only contain buy/sell entries'})
+
+    return payloads, atomic, errors
+
+
+@app.route('/webhook/batch', methods=['POST'])
+@admission_controlled
+def webhook_batch():
+    """Handle multi-order webhook requests scheduled as one basket."""
+    try:
+        # Validate API key if required
+        config = config_manager.get_config()
+        if not validate_api_key(request, config['server'].get('security', {})):
+            return jsonify({'error': 'Invalid API key'}), 401
+
+        payloads, atomic, errors = parse_batch_legs(config['webhook'])
+        if errors:
+            logger.warning(f"Batch validation failed: {errors}")
+            return jsonify({'error': 'Batch validation failed', 'errors': errors}), 400
+
+        alert_id = request.headers.get('X-Alert-Id')
+        if idempotency_store and idempotency_store.enabled:
+            key = idempotency_store.make_key({'batch': payloads, 'atomic': atomic}, alert_id)
+            entry, created = idempotency_store.execute_once(key, lambda: schedule_batch(payloads, atomic))
+            if not created:
+                return duplicate_alert_response(entry)
+            batch = scheduler.get_job(entry['job_id'])
+        else:
+            batch = schedule_batch(payloads, atomic)
+
+        if intake_journal and not intake_journal.sync(timeout=1.0):
+            logger.warning(f"Intake journal sync timed out for batch {batch.id}")
+
+        return jsonify({
+            'success': True,
+            'message': f'Batch of {len(batch.legs)} orders scheduled for execution at bar close',
+            'batch_id': batch.id,
+            'job_id': batch.id,
+            'status': batch.status,
+            'atomic': batch.atomic,
+            'scheduled_for': datetime.fromtimestamp(batch.run_at).isoformat(),
+            'legs': [
+                {
+                    'leg': index,
+                    'job_id': leg.id,
+                    'action': leg.payload.get('action'),
+                    'symbol': leg.payload.get('symbol'),
+                    'volume': leg.payload.get('volume')
+                }
+                for index, leg in enumerate(batch.legs)
+            ]
+        }), 202
+
+    except ValidationError as e:
+        logger.warning(f"Batch webhook validation error: {e}")
+        return jsonify({'error': str(e)}), 400
+    except Exception as e:
+        logger.error(f"Unexpected error in batch webhook: {e}")
+        return jsonify({'error': 'Internal server error'}), 500
+
+
+@app.route('/jobs/<job_id>', methods=['GET'])
+def get_job(job_id):
+    """Get the status and result of a scheduled webhook trade."""
+    try:
+        # Validate API key if required
+        if not validate_api_key(request, config_manager.get_config()['server'].get('security', {})):
+            return jsonify({'error': 'Invalid API key'}), 401
+
+        job = scheduler.get_job(job_id) if scheduler else None
+        if not job:
+            return jsonify({'error': f'Job not found: {job_id}'}), 404
+
+        return jsonify({
+            'success': True,
+            'job': job.to_dict(debug=ipc_debug_requested())
+        })
+    except Exception as e:
+        logger.error(f"Get job failed: {e}")
+        return jsonify({'error': str(e)}), 500
+
+
+@app.route('/journal', methods=['GET'])
+def query_journal():
+    """
+    Stream trade journal records as JSON lines.
+
+    Query parameters: ticket, symbol, side, status, magic, job_id, since,
+    until (ISO datetime in server local time, or epoch seconds) and limit
+    (default 1000).
+    """
+    try:
+        # Validate API key if required
+        if not validate_api_key(request, config_manager.get_config()['server'].get('security', {})):
+            return jsonify({'error': 'Invalid API key'}), 401
+
+        if not trade_journal:
+            return jsonify({'error': 'Trade journal is disabled'}), 404
+
+        args = request.args
+        filters = {field: args[field] for field in ('side', 'status', 'job_id') if args.get(field)}
+        if args.get('symbol'):
+            filters['symbol'] = args['symbol'].upper()
+        if args.get('magic'):
+            filters['magic'] = int(args['magic'])
+
+        records = trade_journal.query(
+            since=parse_journal_time(args.get('since')),
+            until=parse_journal_time(args.get('until')),
+            ticket=int(args['ticket']) if args.get('ticket') else None,
+            filters=filters,
+            limit=int(args.get('limit', 1000))
+        )
+    except ValueError as e:
+        return jsonify({'error': f'Invalid query parameter: {e}'}), 400
+    except Exception as e:
+        logger.error(f"Journal query failed: {e}")
+        return jsonify({'error': str(e)}), 500
+
+    return Response(stream_with_context(records), mimetype='application/x-ndjson')
+
+
+def parse_journal_time(value):
+    """Parse a /journal time parameter: epoch seconds or an ISO datetime (naive = local time)."""
+    if not value:
+        return None
+    try:
+        return float(value)
+    except ValueError:
+        return datetime.fromisoformat(value).timestamp()
+
+
+@app.route('/metrics', methods=['GET'])
+def metrics():
+    """Export per-stage latency histograms in Prometheus text format."""
+    try:
+        # Validate API key if required (Prometheus can send it as a bearer token)
+        if not validate_api_key(request, config_manager.get_config()['server'].get('security', {})):
+            return jsonify({'error': 'Invalid API key'}), 401
+
+        if not tracer.enabled:
+            return jsonify({'error': 'Tracing is disabled'}), 404
+
+        return Response(tracer.render_prometheus(), content_type='text/plain; version=0.0.4; charset=utf-8')
+    except Exception as e:
+        logger.error(f"Metrics export failed: {e}")
+        return jsonify({'error': str(e)}), 500
+
+
 @app.route('/trade', methods=['POST'])
+@tracer.trace('trade')
+@admission_controlled
 def manual_trade():
     """Manual trade endpoint for testing."""
     try:
@@ -293,9 +893,25 @@ def main():
     except Exception as e:
         logger.error(f"Server error: {e}")
     finally:
+        if config_manager:
+            config_manager.stop_watcher()
+        if scheduler:
+            scheduler.stop()
+        if trading_manager:
+            # Let in-flight bulk closes finish before the journals stop and the terminal disconnects
+            trading_manager.close_engine.shutdown()
+        if intake_journal:
+            intake_journal.stop()
+        if trade_journal:
+            trade_journal.stop()
+        if idempotency_store:
+            idempotency_store.close()
+        if tick_streamer:
+            tick_streamer.stop()
         if mt5_connector:
             mt5_connector.disconnect()
         logger.info("Server shutdown complete")
+        stop_logging()
 
 
 if __name__ == '__main__':
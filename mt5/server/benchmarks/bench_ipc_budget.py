@@ -0,0 +1,83 @@
+#!/usr/bin/env python3
+"""
+Check the MT5 IPC call budget of a market order.
+
+Sends 0.01 lot (or minimum volume) market orders through the trading
+manager on the terminal's logged-in account (demo accounts only), closes
+each one, and reports the terminal calls every order made. Exits with status 1 when any
+order exceeds the budget configured in mt5.ipc_accounting.budgets.market_order.
+Set MT5_BACKEND=simulated to run it against the simulator, e.g. on Linux CI.
+
+Usage:
+    [MT5_BACKEND=simulated] python benchmarks/bench_ipc_budget.py [--config config.yaml]
+        [--symbol EURUSD] [--orders 5] [--budget N]
+"""
+
+import argparse
+import os
+import sys
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from config_manager import ConfigManager
+from mt5_backend import mt5
+from mt5_connector import MT5Connector
+from trading_manager import TradingManager
+
+# Budget applied when the configuration does not set one
+DEFAULT_BUDGET = 4
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--config', default='config.yaml')
+    parser.add_argument('--symbol')
+    parser.add_argument('--orders', type=int, default=5)
+    parser.add_argument('--budget', type=int)
+    args = parser.parse_args()
+
+    config = ConfigManager(args.config).get_config()
+    budget = args.budget
+    if budget is None:
+        budget = config['mt5'].get('ipc_accounting', {}).get('budgets', {}).get('market_order', DEFAULT_BUDGET)
+    symbol = (args.symbol or (config['trading'].get('allowed_symbols') or ['EURUSD'])[0]).upper()
+
+    connector = MT5Connector(config['mt5'])
+    if not connector.connect():
+        print("Failed to connect to MT5 terminal")
+        return 2
+
+    try:
+        if connector.account_info.trade_mode != mt5.ACCOUNT_TRADE_MODE_DEMO:
+            print("Refusing to send orders on a non-demo account")
+            return 2
+
+        trading_config = dict(config['trading'])
+        trading_config['custom_intervals'] = config.get('custom_intervals', {})
+        manager = TradingManager(connector, trading_config)
+        executor = connector.executor
+
+        print(f"market order IPC budget: {budget} terminal calls, symbol {symbol}")
+        print(f"{'order':<7} {'terminal':>9} {'shared':>7} {'ipc ms':>8}  by command")
+        worst = 0
+        for index in range(args.orders):
+            # The first order runs with cold symbol caches
+            with executor.scope('bench_order') as scope:
+                result = manager.execute_trade({'action': 'buy', 'symbol': symbol, 'volume': 0.01})
+            manager.execute_trade({'action': 'close', 'symbol': symbol, 'ticket': result['ticket']})
+
+            worst = max(worst, scope.terminal_calls)
+            print(f"{index + 1:<7} {scope.terminal_calls:>9} {scope.shared_reads:>7} "
+                  f"{scope.ipc_ms:>8.3f}  {scope.by_command}")
+    finally:
+        connector.disconnect()
+
+    if worst > budget:
+        print(f"FAIL: a market order made {worst} terminal calls, budget is {budget}")
+        return 1
+    print(f"OK: at most {worst} terminal calls per market order")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
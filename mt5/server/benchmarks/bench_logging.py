@@ -0,0 +1,88 @@
+#!/usr/bin/env python3
+"""
+Benchmark the per-call cost of logging on the request thread.
+
+Compares the synchronous rotating file handler with queue mode, for a short
+message and for an order-request sized dict argument. The single worst call
+is dominated by OS scheduling on a busy machine; the 99.9th percentile is
+the steadier tail measure.
+
+Usage:
+    python benchmarks/bench_logging.py [iterations]
+"""
+
+import logging
+import os
+import sys
+import tempfile
+import time
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from utils.logger import setup_logger, stop_logging, get_logging_stats, BoundedQueueHandler
+
+
+ORDER_REQUEST = {
+    'action': 1, 'symbol': 'XAUUSD', 'volume': 0.1, 'type': 0, 'price': 3365.42,
+    'sl': 3350.0, 'tp': 3400.0, 'magic': 12345, 'comment': 'TradingView Signal',
+    'type_time': 0, 'type_filling': 1, 'deviation': 3
+}
+
+
+def measure(logger, iterations, message, *args):
+    """Mean, 99.9th percentile and worst seconds per logger.info call."""
+    timings = []
+    start = time.perf_counter()
+    for _ in range(iterations):
+        call_start = time.perf_counter()
+        logger.info(message, *args)
+        timings.append(time.perf_counter() - call_start)
+    mean = (time.perf_counter() - start) / iterations
+    timings.sort()
+    return mean, timings[int(len(timings) * 0.999)], timings[-1]
+
+
+def main():
+    iterations = int(sys.argv[1]) if len(sys.argv) > 1 else 20000
+    directory = tempfile.mkdtemp(prefix='mt5_log_bench_')
+    cases = [
+        ('short', ("Trade scheduled as job %s", 'a1b2c3')),
+        ('order dict', ("Sending order request: %s", ORDER_REQUEST))
+    ]
+
+    print(f"{'mode':<8} {'message':<12} {'mean us/call':>13} {'p99.9 us':>9} {'max us/call':>12}")
+    for mode, queue_config in (('sync', {'enabled': False}),
+                               ('queue', {'enabled': True, 'size': iterations * len(cases) + 1})):
+        logger = setup_logger({
+            'level': 'INFO',
+            'console': False,
+            'file': os.path.join(directory, f'{mode}.log'),
+            'max_size': 1048576,
+            'backup_count': 3,
+            'queue': queue_config
+        })
+        for name, (message, *args) in cases:
+            mean, p999, worst = measure(logger, iterations, message, *args)
+            print(f"{mode:<8} {name:<12} {mean * 1e6:>13.2f} {p999 * 1e6:>9.1f} {worst * 1e6:>12.1f}")
+
+        start = time.perf_counter()
+        stats = get_logging_stats()
+        stop_logging()
+        if mode == 'queue':
+            print(f"{'':<8} listener drained in {time.perf_counter() - start:.2f}s, "
+                  f"dropped {stats['dropped']}")
+
+    # Request-thread floor: record creation and enqueue only, no listener competing for the GIL
+    logger = logging.getLogger('mt5_server.bench')
+    logger.propagate = False
+    logger.setLevel(logging.INFO)
+    logger.addHandler(BoundedQueueHandler(iterations * len(cases) + 1))
+    for name, (message, *args) in cases:
+        mean, p999, worst = measure(logger, iterations, message, *args)
+        print(f"{'enqueue':<8} {name:<12} {mean * 1e6:>13.2f} {p999 * 1e6:>9.1f} {worst * 1e6:>12.1f}")
+
+    print(f"\nlog files in {directory}")
+
+
+if __name__ == '__main__':
+    main()
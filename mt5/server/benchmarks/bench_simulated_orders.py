@@ -0,0 +1,115 @@
+#!/usr/bin/env python3
+"""
+Load-test order execution against the simulated MT5 backend.
+
+Sends market orders from concurrent threads through the trading manager,
+connector and executor, then closes everything, and reports throughput,
+order latency percentiles, terminal calls per order and the simulator's
+requote and disconnect counts. The backend is always the simulator; its
+settings come from mt5.simulator in the configuration, and a fixed seed
+makes prices, latencies and events repeat between runs.
+
+Usage:
+    python benchmarks/bench_simulated_orders.py [--config config.yaml] [--threads 8]
+        [--orders 50] [--seed 42] [--requote 0.0] [--disconnect 0.0]
+"""
+
+import argparse
+import logging
+import os
+import sys
+import threading
+import time
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import mt5_backend
+
+os.environ[mt5_backend.BACKEND_ENV] = mt5_backend.SIMULATED
+
+from config_manager import ConfigManager
+from mt5_connector import MT5Connector
+from trading_manager import TradingManager
+from utils.metrics import LatencyHistogram
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--config', default='config.yaml')
+    parser.add_argument('--threads', type=int, default=8)
+    parser.add_argument('--orders', type=int, default=50, help='Orders per thread')
+    parser.add_argument('--seed', type=int)
+    parser.add_argument('--requote', type=float, help='Override requote_probability')
+    parser.add_argument('--disconnect', type=float, help='Override disconnect_probability')
+    args = parser.parse_args()
+
+    # Rejected orders are expected with requotes and disconnects; keep the report readable
+    logging.getLogger('mt5_server').setLevel(logging.CRITICAL)
+
+    config = ConfigManager(args.config).get_config()
+    mt5_config = dict(config['mt5'])
+    simulator = dict(mt5_config.get('simulator') or {})
+    for key, value in (('seed', args.seed), ('requote_probability', args.requote),
+                       ('disconnect_probability', args.disconnect)):
+        if value is not None:
+            simulator[key] = value
+    mt5_config['simulator'] = simulator
+
+    connector = MT5Connector(mt5_config)
+    if not connector.connect():
+        print("Failed to connect to the simulated terminal")
+        return 2
+
+    trading_config = dict(config['trading'])
+    trading_config['custom_intervals'] = config.get('custom_intervals', {})
+    manager = TradingManager(connector, trading_config)
+    symbols = [symbol.name for symbol in connector.executor.symbols_get()]
+
+    latency = LatencyHistogram()
+    failures = []
+
+    def worker(index):
+        for number in range(args.orders):
+            started = time.perf_counter()
+            try:
+                manager.execute_trade({
+                    'action': 'buy' if number % 2 else 'sell',
+                    'symbol': symbols[(index + number) % len(symbols)],
+                    'volume': 0.01
+                })
+            except Exception as e:
+                failures.append(str(e))
+                continue
+            latency.record((time.perf_counter() - started) * 1000)
+
+    threads = [threading.Thread(target=worker, args=(index,)) for index in range(args.threads)]
+    started = time.perf_counter()
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    elapsed = time.perf_counter() - started
+
+    closed = sum(len(manager.execute_trade({'action': 'close_all', 'symbol': symbol}).get('closed_positions', []))
+                 for symbol in symbols)
+    stats = connector.executor.get_stats()
+    simulator_stats = mt5_backend.get_stats()['simulator']
+    connector.disconnect()
+
+    orders = latency.to_dict()
+    market_orders = stats['ipc']['scopes'].get('market_order', {})
+    print(f"threads {args.threads}, orders {args.threads * args.orders}, seed {simulator_stats['seed']}")
+    print(f"filled {orders['count']}, failed {len(failures)} in {elapsed:.2f}s "
+          f"({orders['count'] / elapsed:.1f} orders/s)")
+    print(f"order latency ms: p50 {orders['p50_ms']}, p99 {orders['p99_ms']}, max {orders['max_ms']}")
+    print(f"terminal calls per market order: mean {market_orders.get('mean_terminal_calls')}, "
+          f"max {market_orders.get('max_terminal_calls')}; batched reads {stats['batched_reads']}")
+    print(f"simulator: requotes {simulator_stats['requotes']}, disconnects {simulator_stats['disconnects']}, "
+          f"closed {closed}, balance {simulator_stats['balance']}")
+    for reason in sorted(set(failures))[:5]:
+        print(f"  failure: {reason}")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
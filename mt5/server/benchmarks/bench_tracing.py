@@ -0,0 +1,79 @@
+#!/usr/bin/env python3
+"""
+Benchmark the overhead of stage tracing.
+
+Times a webhook-shaped trace (five checkpoints and three traced calls)
+with tracing enabled and disabled, plus the individual primitives.
+
+Usage:
+    python benchmarks/bench_tracing.py [iterations]
+"""
+
+import os
+import sys
+import time
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from utils.tracing import Tracer
+
+
+def measure(func, iterations):
+    """Mean microseconds per call."""
+    start = time.perf_counter()
+    for _ in range(iterations):
+        func()
+    return (time.perf_counter() - start) / iterations * 1e6
+
+
+def main():
+    iterations = int(sys.argv[1]) if len(sys.argv) > 1 else 100000
+    tracer = Tracer()
+
+    @tracer.traced('mt5.get_quote')
+    def lookup():
+        return None
+
+    def plain_lookup():
+        return None
+
+    @tracer.trace('webhook')
+    def request():
+        tracer.mark('webhook.admission')
+        tracer.mark('webhook.parse')
+        tracer.label('buy', 'XAUUSD')
+        tracer.mark('webhook.validate')
+        lookup()
+        lookup()
+        with tracer.span('log'):
+            pass
+        tracer.mark('webhook.schedule')
+        tracer.mark('webhook.journal_sync')
+
+    def untraced_request():
+        plain_lookup()
+        plain_lookup()
+
+    baseline = measure(untraced_request, iterations)
+    cases = [
+        ('traced call, outside trace', lambda: lookup()),
+        ('span, outside trace', lambda: tracer.span('log').__enter__().__exit__(None, None, None)),
+        ('webhook-shaped trace', request),
+    ]
+
+    print(f"{'case':<30} {'enabled us':>11} {'disabled us':>12}")
+    for name, func in cases:
+        tracer.configure({'enabled': True})
+        enabled = measure(func, iterations)
+        tracer.configure({'enabled': False})
+        disabled = measure(func, iterations)
+        print(f"{name:<30} {enabled:>11.2f} {disabled:>12.2f}")
+    print(f"{'untraced baseline':<30} {baseline:>11.2f}")
+
+    tracer.configure({'enabled': True})
+    print(f"series: {tracer.get_stats()['series']}, "
+          f"exposition: {len(tracer.render_prometheus().splitlines())} lines")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,299 @@
+"""
+Close Engine for MT5 Trading HTTP Server.
+Closes many positions from a single snapshot through a bounded concurrent pipeline.
+"""
+
+from mt5_backend import mt5
+import logging
+import time
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+from typing import Dict, Any, List, Callable, Optional, Tuple
+from utils.exceptions import TradingError
+from utils.logger import log_trade_operation, log_error_with_context
+from trade_journal import STATUS_DONE, STATUS_REJECTED, STATUS_FAILED, bind_job_context, elapsed_ms
+from utils.ipc_accounting import bind_ipc_scope
+
+
+class CloseEngine:
+    """
+    Bulk position closer.
+
+    Positions are grouped by symbol; each group is priced from one quote and
+    its close orders are submitted through a bounded worker pool, so the MT5
+    executor queue stays fed instead of waiting on one round trip at a time.
+
+    On hedging accounts, opposite positions of a symbol are first paired and
+    closed against each other with TRADE_ACTION_CLOSE_BY: one order per pair
+    and no spread paid. Only the unpaired remainder is closed at market.
+    """
+
+    def __init__(self, mt5_connector, config: Dict[str, Any],
+                 filling_mode_resolver: Callable[[Dict[str, Any]], int]):
+        """
+        Initialize close engine.
+
+        Args:
+            mt5_connector: MT5Connector instance
+            config: Trading configuration dictionary
+            filling_mode_resolver: Callable mapping symbol info to an MT5 filling mode
+        """
+        self.mt5_connector = mt5_connector
+        self.logger = logging.getLogger('mt5_server.close')
+        self.concurrency = config.get('close_concurrency', 8)
+        self.use_close_by = config.get('use_close_by', True)
+        self.resolve_filling_mode = filling_mode_resolver
+        self.trade_journal = None
+        self._pool = ThreadPoolExecutor(max_workers=self.concurrency, thread_name_prefix='mt5-close')
+
+    def close_positions(self, positions: List[Dict[str, Any]], volume: float = None,
+                        allow_close_by: bool = True) -> Dict[str, Any]:
+        """
+        Close a snapshot of positions.
+
+        Args:
+            positions: Position dictionaries from a single positions snapshot
+            volume: Partial close volume per position (optional, defaults to full volume)
+            allow_close_by: Whether opposite positions may be netted with close-by orders
+
+        Returns:
+            Close operation result with per-ticket outcomes and timing
+        """
+        started = time.perf_counter()
+
+        groups: 'OrderedDict[str, List[Dict[str, Any]]]' = OrderedDict()
+        for position in positions:
+            groups.setdefault(position['symbol'], []).append(position)
+
+        # Netting only applies to full closes on hedging accounts
+        hedging = volume is None and allow_close_by and self.use_close_by and self._is_hedging_account()
+
+        priced = []
+        results = []
+        for symbol, group in groups.items():
+            try:
+                # One static lookup and one quote per symbol group
+                static_info = self.mt5_connector.get_symbol_static(symbol)
+                if not static_info:
+                    raise TradingError(f"Failed to get symbol info for {symbol}")
+
+                quote = self.mt5_connector.get_quote(symbol)
+                if not quote:
+                    raise TradingError(f"Failed to get quote for {symbol}")
+
+                filling_mode = self.resolve_filling_mode(static_info)
+            except Exception as e:
+                log_error_with_context(self.logger, e, f"Failed to price close group {symbol}")
+                results.extend(self._error_result(position, e, 0.0) for position in group)
+                continue
+
+            close_by = hedging and bool(static_info.get('order_mode', 0) & mt5.SYMBOL_ORDER_CLOSEBY)
+            priced.append((group, quote, filling_mode, close_by))
+
+        # Phase 1: pair opposite positions per symbol; pairs within a symbol are sequential
+        # Pool threads inherit the scheduled job of the caller for the trade journal
+        # and its IPC scope for call accounting
+        net_group = bind_ipc_scope(bind_job_context(self._net_group))
+        netting = [(self._pool.submit(net_group, group), quote, filling_mode)
+                   for group, quote, filling_mode, close_by in priced if close_by]
+        leftovers = [(group, quote, filling_mode)
+                     for group, quote, filling_mode, close_by in priced if not close_by]
+        for future, quote, filling_mode in netting:
+            net_results, remaining = future.result()
+            results.extend(net_results)
+            leftovers.append((remaining, quote, filling_mode))
+
+        # Phase 2: close whatever is left at market
+        close_one = bind_ipc_scope(bind_job_context(self._close_one))
+        futures = [self._pool.submit(close_one, position, volume, quote, filling_mode)
+                   for group, quote, filling_mode in leftovers for position in group]
+        results.extend(future.result() for future in futures)
+
+        return {
+            'closed_positions': results,
+            # Each close-by order is reported under both of its tickets
+            'orders_sent': (sum(1 for r in results if 'close_ticket' in r and not r.get('netted'))
+                            + sum(1 for r in results if r.get('netted')) // 2),
+            'elapsed_ms': round((time.perf_counter() - started) * 1000, 3)
+        }
+
+    def _is_hedging_account(self) -> bool:
+        """Whether the cached account info reports a retail hedging account."""
+        account_info = self.mt5_connector.account_info
+        margin_mode = getattr(account_info, 'margin_mode', None)
+        return margin_mode == mt5.ACCOUNT_MARGIN_MODE_RETAIL_HEDGING
+
+    def _net_group(self, group: List[Dict[str, Any]]) -> Tuple[List[Dict[str, Any]], List[Dict[str, Any]]]:
+        """
+        Close opposite positions of one symbol against each other.
+
+        Largest positions are paired first so the fewest pairs flatten the most
+        volume. A partially consumed position keeps its ticket and re-enters
+        pairing with its remaining volume.
+
+        Returns:
+            (per-ticket results, positions left to close at market)
+        """
+        longs = sorted((dict(p) for p in group if p['type'] == 0), key=lambda p: p['volume'], reverse=True)
+        shorts = sorted((dict(p) for p in group if p['type'] == 1), key=lambda p: p['volume'], reverse=True)
+        results = []
+
+        while longs and shorts:
+            long_position, short_position = longs[0], shorts[0]
+            started = time.perf_counter()
+            try:
+                result = self._send_close_by(long_position, short_position)
+            except Exception as e:
+                log_error_with_context(
+                    self.logger, e,
+                    f"Failed to close {long_position['ticket']} by {short_position['ticket']}"
+                )
+                # Fall back to market closes for everything still unpaired
+                break
+
+            netted = min(long_position['volume'], short_position['volume'])
+            elapsed = round((time.perf_counter() - started) * 1000, 3)
+            timestamp = datetime.now().isoformat()
+            for position, opposite in ((long_position, short_position), (short_position, long_position)):
+                results.append({
+                    'original_ticket': position['ticket'],
+                    'closed_by': opposite['ticket'],
+                    'close_ticket': result.order,
+                    'symbol': position['symbol'],
+                    'volume': netted,
+                    # A close-by settles at the open price of the opposite position
+                    'price': opposite['price_open'],
+                    'profit': position['profit'],
+                    'retcode': result.retcode,
+                    'netted': True,
+                    'elapsed_ms': elapsed,
+                    'timestamp': timestamp
+                })
+
+            log_trade_operation(
+                self.logger, 'close_by', long_position['symbol'], netted, None,
+                f"Success - Closed {long_position['ticket']} by {short_position['ticket']}"
+            )
+
+            for side in (longs, shorts):
+                side[0]['volume'] = round(side[0]['volume'] - netted, 8)
+                if side[0]['volume'] <= 0:
+                    side.pop(0)
+
+        return results, longs + shorts
+
+    def _send_close_by(self, position: Dict[str, Any], opposite: Dict[str, Any]):
+        """Send a TRADE_ACTION_CLOSE_BY request for a pair of opposite positions."""
+        request = {
+            'action': mt5.TRADE_ACTION_CLOSE_BY,
+            'symbol': position['symbol'],
+            'position': position['ticket'],
+            'position_by': opposite['ticket'],
+            'magic': position['magic'],
+            'comment': f"Close {position['ticket']} by {opposite['ticket']}",
+        }
+
+        sent = time.perf_counter()
+        result = self.mt5_connector.executor.order_send(request)
+        latency = {'send': elapsed_ms(sent, time.perf_counter())}
+        netted = min(position['volume'], opposite['volume'])
+
+        if result is None:
+            self.mt5_connector.report_failure(f"order_send returned no result closing {position['ticket']} by {opposite['ticket']}")
+            self._journal('close_by', request, None, STATUS_FAILED, latency, "No result", netted)
+            raise TradingError(f"Failed to close position {position['ticket']} by {opposite['ticket']} - no result")
+
+        if result.retcode != mt5.TRADE_RETCODE_DONE:
+            self._journal('close_by', request, result, STATUS_REJECTED, latency, result.comment, netted)
+            raise TradingError(f"Failed to close position {position['ticket']} by {opposite['ticket']}: {result.comment}")
+
+        self._journal('close_by', request, result, STATUS_DONE, latency, volume=netted)
+        return result
+
+    def _journal(self, side: str, request: Dict[str, Any], result, status: str,
+                 latency: Dict[str, float], error: str = None, volume: float = None) -> None:
+        """Record a sent order in the trade journal, if one is attached."""
+        if self.trade_journal is not None:
+            self.trade_journal.record_order(side, request, result, status, latency, error, volume)
+
+    def shutdown(self) -> None:
+        """Release the worker pool."""
+        self._pool.shutdown(wait=True)
+
+    def _close_one(self, position: Dict[str, Any], volume: Optional[float],
+                   quote: Dict[str, Any], filling_mode: int) -> Dict[str, Any]:
+        """Send one close order and return its per-ticket result."""
+        started = time.perf_counter()
+        try:
+            # Determine close volume
+            close_volume = volume if volume else position['volume']
+            if close_volume > position['volume']:
+                close_volume = position['volume']
+
+            # Opposite side of the position, priced from the group quote
+            if position['type'] == 0:
+                order_type, price = mt5.ORDER_TYPE_SELL, quote['bid']
+            else:
+                order_type, price = mt5.ORDER_TYPE_BUY, quote['ask']
+
+            request = {
+                'action': mt5.TRADE_ACTION_DEAL,
+                'symbol': position['symbol'],
+                'volume': close_volume,
+                'type': order_type,
+                'position': position['ticket'],
+                'price': price,
+                'magic': position['magic'],
+                'comment': f"Close {position['ticket']}",
+                'type_time': mt5.ORDER_TIME_GTC,
+                'type_filling': filling_mode,
+            }
+
+            sent = time.perf_counter()
+            result = self.mt5_connector.executor.order_send(request)
+            latency = {'prepare': elapsed_ms(started, sent), 'send': elapsed_ms(sent, time.perf_counter())}
+
+            if result is None:
+                self.mt5_connector.report_failure(f"order_send returned no result closing {position['ticket']}")
+                self._journal('close', request, None, STATUS_FAILED, latency, "No result")
+                raise TradingError(f"Failed to close position {position['ticket']} - no result")
+
+            if result.retcode != mt5.TRADE_RETCODE_DONE:
+                self._journal('close', request, result, STATUS_REJECTED, latency, result.comment)
+                raise TradingError(f"Failed to close position {position['ticket']}: {result.comment}")
+
+            self._journal('close', request, result, STATUS_DONE, latency)
+
+            # Log successful close
+            log_trade_operation(
+                self.logger, 'close', position['symbol'], close_volume,
+                result.price, f"Success - Closed ticket: {position['ticket']}"
+            )
+
+            return {
+                'original_ticket': position['ticket'],
+                'close_ticket': result.order,
+                'symbol': position['symbol'],
+                'volume': close_volume,
+                'price': result.price,
+                'profit': position['profit'],
+                'retcode': result.retcode,
+                'elapsed_ms': round((time.perf_counter() - started) * 1000, 3),
+                'timestamp': datetime.now().isoformat()
+            }
+
+        except Exception as e:
+            log_error_with_context(self.logger, e, f"Failed to close position {position['ticket']}")
+            return self._error_result(position, e, (time.perf_counter() - started) * 1000)
+
+    @staticmethod
+    def _error_result(position: Dict[str, Any], error: Exception, elapsed_ms: float) -> Dict[str, Any]:
+        """Build a per-ticket error result."""
+        return {
+            'original_ticket': position['ticket'],
+            'symbol': position['symbol'],
+            'error': str(error),
+            'elapsed_ms': round(elapsed_ms, 3),
+            'timestamp': datetime.now().isoformat()
+        }
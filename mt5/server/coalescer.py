@@ -0,0 +1,198 @@
+"""
+Signal Coalescer for MT5 Trading HTTP Server.
+Nets same-bar market signals for a symbol into a single order.
+"""
+
+import logging
+import threading
+import uuid
+from collections import OrderedDict
+from datetime import datetime
+from typing import Dict, Any, List, Tuple
+
+
+class SignalCoalescer:
+    """
+    Coalesces buy/sell jobs that come due at the same bar boundary.
+
+    Jobs are grouped by (symbol, magic, bar). Only contiguous runs of a
+    symbol's signals are merged: any other job for the symbol in between,
+    such as a close, ends the run so the symbol keeps its arrival order.
+    Opposing volumes inside a group are crossed internally and only the net
+    volume is sent, as one order.
+    Every original job receives its own allocation of the outcome: the share
+    of the market fill on the net side plus the internally crossed volume.
+
+    Only plain market signals are coalesced. Jobs carrying stops, targets,
+    tickets or a time check keep their own order, as do legs of atomic
+    batches, so a rollback can close exactly the position each leg opened.
+    """
+
+    EXCLUDED_FIELDS = ('sl', 'stop_loss', 'tp', 'take_profit', 'ticket', 'enable_time_check')
+
+    def __init__(self, trading_manager, config: Dict[str, Any] = None):
+        """
+        Initialize signal coalescer.
+
+        Args:
+            trading_manager: TradingManager executing the net orders
+            config: Coalescing configuration dictionary (optional)
+        """
+        config = config or {}
+        self.trading_manager = trading_manager
+        self.logger = logging.getLogger('mt5_server.coalescer')
+        self.enabled = config.get('enabled', False)
+        self._lock = threading.Lock()
+        self._stats = {'groups': 0, 'signals': 0, 'orders_sent': 0, 'orders_saved': 0}
+
+    def eligible(self, payload: Dict[str, Any]) -> bool:
+        """
+        Check whether a payload may be coalesced.
+
+        Args:
+            payload: Trade payload
+
+        Returns:
+            True for plain buy/sell signals
+        """
+        if (payload.get('action') or '').lower() not in ('buy', 'sell') or not payload.get('symbol'):
+            return False
+        return not any(payload.get(field) for field in self.EXCLUDED_FIELDS)
+
+    def group(self, jobs: List[Any]) -> List[List[Any]]:
+        """
+        Partition due jobs into execution units.
+
+        Args:
+            jobs: Jobs that came due together
+
+        Returns:
+            Units in first-arrival order; units with several jobs are coalesced groups
+        """
+        units: 'OrderedDict[Any, List[Any]]' = OrderedDict()
+        # A close or modify between signals of a symbol must keep its place in
+        # the symbol's FIFO, so it starts a new run for that symbol
+        runs: Dict[str, int] = {}
+        barriers = 0
+        for job in jobs:
+            atomic_leg = job.batch is not None and job.batch.atomic
+            if self.enabled and not atomic_leg and self.eligible(job.payload):
+                symbol = job.payload['symbol'].upper()
+                key = (symbol, self._magic(job.payload), job.run_at, barriers, runs.get(symbol, 0))
+            else:
+                key = job.id
+                symbol = (job.payload.get('symbol') or '').upper()
+                if symbol:
+                    runs[symbol] = runs.get(symbol, 0) + 1
+                else:
+                    # Without a symbol the job may touch every symbol
+                    barriers += 1
+            units.setdefault(key, []).append(job)
+        return list(units.values())
+
+    def execute(self, jobs: List[Any]) -> List[Tuple[Any, Exception]]:
+        """
+        Execute a coalesced group as one net order.
+
+        Args:
+            jobs: Jobs of one (symbol, magic, bar) group
+
+        Returns:
+            (result, error) per job, in job order
+        """
+        group_id = uuid.uuid4().hex[:12]
+        first = jobs[0].payload
+        symbol = first['symbol'].upper()
+        magic = self._magic(first)
+
+        volumes = [self._volume(job.payload) for job in jobs]
+        sides = [job.payload['action'].lower() for job in jobs]
+        buy_volume = round(sum(v for v, side in zip(volumes, sides) if side == 'buy'), 8)
+        sell_volume = round(sum(v for v, side in zip(volumes, sides) if side == 'sell'), 8)
+        net_volume = round(buy_volume - sell_volume, 8)
+        net_side = 'buy' if net_volume > 0 else 'sell' if net_volume < 0 else None
+
+        order = None
+        filled = 0.0
+        try:
+            if net_side:
+                order = self.trading_manager.execute_webhook_trade({
+                    'action': net_side,
+                    'symbol': symbol,
+                    'volume': abs(net_volume),
+                    'magic': magic,
+                    'comment': f"Coalesced {len(jobs)} signals"
+                })
+                price = order['price']
+                filled = order['volume']
+            else:
+                # Fully crossed: no order, internal fills at the current mid price
+                quote = self.trading_manager.mt5_connector.get_quote(symbol)
+                price = round((quote['bid'] + quote['ask']) / 2, 8) if quote else None
+        except Exception as e:
+            self.logger.error(f"Coalesced order for {symbol} failed ({len(jobs)} signals): {e}")
+            self._record(len(jobs), 0)
+            return [(None, e)] * len(jobs)
+
+        orders_sent = 1 if order else 0
+        self._record(len(jobs), orders_sent)
+        self.logger.info(f"Coalesced {len(jobs)} signals for {symbol}: buy {buy_volume}, sell {sell_volume}, "
+                         f"net {net_side or 'flat'} {abs(net_volume)}, saved {len(jobs) - orders_sent} orders")
+
+        side_volume = buy_volume if net_side == 'buy' else sell_volume
+        opposite_volume = sell_volume if net_side == 'buy' else buy_volume
+        timestamp = datetime.now().isoformat()
+        outcomes = []
+        for volume, side in zip(volumes, sides):
+            if side == net_side:
+                # Pro-rata share of the market fill plus of the crossed volume
+                market = round(filled * volume / side_volume, 8)
+                internal = round(opposite_volume * volume / side_volume, 8)
+            else:
+                market, internal = 0.0, volume
+
+            outcomes.append(({
+                'coalesced': True,
+                'group_id': group_id,
+                'group_size': len(jobs),
+                'ticket': order['ticket'] if order else None,
+                'symbol': symbol,
+                'action': side,
+                'requested_volume': volume,
+                'volume': round(market + internal, 8),
+                'market_volume': market,
+                'internal_volume': internal,
+                'price': price,
+                'magic': magic,
+                'net_order': {'action': net_side, 'volume': filled} if order else None,
+                'timestamp': timestamp
+            }, None))
+        return outcomes
+
+    def get_stats(self) -> Dict[str, Any]:
+        """
+        Get coalescing statistics.
+
+        Returns:
+            Statistics dictionary
+        """
+        with self._lock:
+            stats = dict(self._stats)
+        stats['enabled'] = self.enabled
+        return stats
+
+    def _record(self, signals: int, orders_sent: int) -> None:
+        """Update statistics for one group."""
+        with self._lock:
+            self._stats['groups'] += 1
+            self._stats['signals'] += signals
+            self._stats['orders_sent'] += orders_sent
+            self._stats['orders_saved'] += signals - orders_sent
+
+    def _magic(self, payload: Dict[str, Any]) -> int:
+        """Magic number a payload would trade with."""
+        return payload.get('magic', self.trading_manager.config.get('magic_number', 12345))
+
+    def _volume(self, payload: Dict[str, Any]) -> float:
+        """Volume a payload would trade with."""
+        return payload.get('volume', self.trading_manager.config.get('default_volume', 0.1))
@@ -4,14 +4,107 @@ Handles loading and validation of configuration files.
 """
 
 import os
+import ipaddress
+import threading
+import time
 import yaml
+from datetime import datetime
 import logging
-from typing import Dict, Any, Optional
+from collections.abc import Mapping
+from types import MappingProxyType
+from typing import Dict, Any, Optional, Callable, Iterator
 from utils.exceptions import ConfigError
+from utils.logger import BoundedQueueHandler
+from trade_journal import PARTITION_FORMATS
+
+
+def freeze(value: Any) -> Any:
+    """
+    Recursively convert a loaded configuration value into a read-only one.
+
+    Args:
+        value: Value loaded from YAML
+
+    Returns:
+        Mappings become read-only mappings and lists become tuples
+    """
+    if isinstance(value, dict):
+        return MappingProxyType({key: freeze(item) for key, item in value.items()})
+    if isinstance(value, list):
+        return tuple(freeze(item) for item in value)
+    return value
+
+
+def thaw(value: Any) -> Any:
+    """
+    Recursively convert a frozen configuration value back into plain dicts and lists.
+
+    Args:
+        value: Frozen configuration value
+
+    Returns:
+        Mutable copy of the value
+    """
+    if isinstance(value, Mapping):
+        return {key: thaw(item) for key, item in value.items()}
+    if isinstance(value, tuple):
+        return [thaw(item) for item in value]
+    return value
+
+
+class ConfigSnapshot(Mapping):
+    """
+    Immutable, versioned view of one loaded configuration.
+
+    A snapshot is never modified after it is published, so readers can hold
+    a reference for as long as they like without copying or locking; a
+    reload publishes a new snapshot instead.
+    """
+
+    __slots__ = ('_data', 'version', 'loaded_at', 'mtime')
+
+    def __init__(self, data: Dict[str, Any], version: int, mtime: Optional[float] = None):
+        """
+        Initialize snapshot.
+
+        Args:
+            data: Validated configuration dictionary
+            version: Snapshot version, incremented on every publish
+            mtime: Modification time of the file the snapshot was loaded from (optional)
+        """
+        self._data = freeze(data)
+        self.version = version
+        self.loaded_at = time.time()
+        self.mtime = mtime
+
+    def __getitem__(self, key: str) -> Any:
+        return self._data[key]
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(self._data)
+
+    def __len__(self) -> int:
+        return len(self._data)
+
+    def to_dict(self) -> Dict[str, Any]:
+        """
+        Get a mutable copy of the configuration.
+
+        Returns:
+            Plain configuration dictionary
+        """
+        return thaw(self._data)
 
 
 class ConfigManager:
-    """Manages application configuration."""
+    """
+    Manages application configuration.
+
+    The current configuration is an immutable ConfigSnapshot. Reloads, either
+    explicit or from the file watcher, load and validate a new snapshot off
+    the request path and swap the reference in one assignment; an invalid
+    file keeps the previous snapshot in place.
+    """
     
     def __init__(self, config_file: str = "config.yaml"):
         """
@@ -21,50 +114,135 @@ class ConfigManager:
             config_file: Path to configuration file
         """
         self.config_file = config_file
-        self.config = None
-        self._load_config()
-        self._validate_config()
+        self.logger = logging.getLogger('mt5_server.config')
+        self._snapshot: Optional[ConfigSnapshot] = None
+        self._publish_lock = threading.Lock()
+        self._reload_listeners = []
+        self._watch_thread = None
+        self._watch_stop = threading.Event()
+        self._stats = {'reloads': 0, 'reload_failures': 0, 'last_error': None}
+        self._publish(self._build_snapshot())
+
+    @property
+    def config(self) -> ConfigSnapshot:
+        """Current configuration snapshot."""
+        return self._snapshot
+
+    @property
+    def version(self) -> int:
+        """Version of the current configuration snapshot."""
+        return self._snapshot.version
     
-    def _load_config(self) -> None:
-        """Load configuration from file."""
+    def _load_config(self) -> Dict[str, Any]:
+        """
+        Load configuration from file.
+
+        Returns:
+            Raw configuration dictionary
+        """
         try:
             if not os.path.exists(self.config_file):
                 raise ConfigError(f"Configuration file not found: {self.config_file}")
             
             with open(self.config_file, 'r', encoding='utf-8') as f:
-                self.config = yaml.safe_load(f)
+                config = yaml.safe_load(f)
             
-            if not self.config:
+            if not config:
                 raise ConfigError("Configuration file is empty or invalid")
+
+            return config
                 
         except yaml.YAMLError as e:
             raise ConfigError(f"Invalid YAML in configuration file: {e}")
+        except ConfigError:
+            raise
         except Exception as e:
             raise ConfigError(f"Error loading configuration: {e}")
+
+    def _file_mtime(self) -> Optional[float]:
+        """Modification time of the configuration file, or None if it cannot be read."""
+        try:
+            return os.stat(self.config_file).st_mtime
+        except OSError:
+            return None
+
+    def _build_snapshot(self, config: Dict[str, Any] = None) -> ConfigSnapshot:
+        """
+        Load (unless given) and validate a configuration into an unpublished snapshot.
+
+        Args:
+            config: Raw configuration dictionary (optional, loaded from file if omitted)
+
+        Returns:
+            New snapshot numbered after the current one
+
+        Raises:
+            ConfigError: If the configuration is invalid
+        """
+        mtime = self._file_mtime() if config is None else (self._snapshot.mtime if self._snapshot else None)
+        if config is None:
+            config = self._load_config()
+        self._validate_config(config)
+        version = self._snapshot.version + 1 if self._snapshot else 1
+        return ConfigSnapshot(config, version, mtime)
+
+    def _publish(self, snapshot: ConfigSnapshot) -> None:
+        """Swap in a new snapshot; readers see either the old or the new one, never a mix."""
+        self._snapshot = snapshot
     
-    def _validate_config(self) -> None:
+    def _validate_config(self, config: Dict[str, Any]) -> None:
         """Validate configuration structure and values."""
         required_sections = ['mt5', 'server', 'trading', 'logging', 'webhook']
         
         for section in required_sections:
-            if section not in self.config:
+            if section not in config:
                 raise ConfigError(f"Missing required configuration section: {section}")
         
         # Validate MT5 configuration
-        self._validate_mt5_config()
+        self._validate_mt5_config(config)
         
         # Validate server configuration
-        self._validate_server_config()
+        self._validate_server_config(config)
         
         # Validate trading configuration
-        self._validate_trading_config()
+        self._validate_trading_config(config)
         
         # Validate logging configuration
-        self._validate_logging_config()
+        self._validate_logging_config(config)
+
+        # Validate webhook configuration
+        self._validate_webhook_config(config)
+
+        # Validate optional scheduler configuration
+        self._validate_scheduler_config(config)
+
+        # Validate optional tick stream configuration
+        self._validate_tick_stream_config(config)
+
+        # Validate optional idempotency configuration
+        self._validate_idempotency_config(config)
+
+        # Validate optional coalescing configuration
+        self._validate_coalescing_config(config)
+
+        # Validate optional performance configuration
+        self._validate_performance_config(config)
+
+        # Validate optional intake journal configuration
+        self._validate_intake_journal_config(config)
+
+        # Validate optional trade journal configuration
+        self._validate_trade_journal_config(config)
+
+        # Validate optional tracing configuration
+        self._validate_tracing_config(config)
+
+        # Validate optional config watch configuration
+        self._validate_config_watch_config(config)
     
-    def _validate_mt5_config(self) -> None:
+    def _validate_mt5_config(self, config: Dict[str, Any]) -> None:
         """Validate MT5 configuration section."""
-        mt5_config = self.config['mt5']
+        mt5_config = config['mt5']
 
         # 简化验证，只检查基本配置
         # 不再需要账户配置，直接使用MT5客户端当前登录的账户
@@ -77,10 +255,85 @@ class ConfigManager:
                 raise ConfigError("MT5 connect timeout must be a positive integer")
             if 'trade' in timeout and (not isinstance(timeout['trade'], int) or timeout['trade'] <= 0):
                 raise ConfigError("MT5 trade timeout must be a positive integer")
+
+        # Validate heartbeat settings
+        if 'heartbeat' in mt5_config:
+            heartbeat = mt5_config['heartbeat']
+            if 'interval' in heartbeat and (not isinstance(heartbeat['interval'], (int, float)) or heartbeat['interval'] <= 0):
+                raise ConfigError("MT5 heartbeat interval must be a positive number")
+            if 'failure_threshold' in heartbeat and (not isinstance(heartbeat['failure_threshold'], int) or heartbeat['failure_threshold'] <= 0):
+                raise ConfigError("MT5 heartbeat failure_threshold must be a positive integer")
+
+        # Validate symbol cache settings
+        if 'symbol_cache' in mt5_config:
+            symbol_cache = mt5_config['symbol_cache']
+            for field in ['static_ttl', 'quote_max_age_ms']:
+                if field in symbol_cache and (not isinstance(symbol_cache[field], (int, float)) or symbol_cache[field] < 0):
+                    raise ConfigError(f"MT5 symbol_cache {field} must be a non-negative number")
+
+        # Validate IPC accounting settings
+        if 'ipc_accounting' in mt5_config:
+            accounting = mt5_config['ipc_accounting']
+            if 'enabled' in accounting and not isinstance(accounting['enabled'], bool):
+                raise ConfigError("MT5 ipc_accounting enabled must be a boolean")
+            if 'max_details' in accounting and (not isinstance(accounting['max_details'], int) or accounting['max_details'] < 0):
+                raise ConfigError("MT5 ipc_accounting max_details must be a non-negative integer")
+            budgets = accounting.get('budgets', {})
+            if not isinstance(budgets, dict):
+                raise ConfigError("MT5 ipc_accounting budgets must be a mapping of scope name to call count")
+            for scope, budget in budgets.items():
+                if not isinstance(budget, int) or isinstance(budget, bool) or budget < 0:
+                    raise ConfigError(f"MT5 ipc_accounting budget for {scope} must be a non-negative integer")
+
+        # Validate backend selection and simulator settings
+        if 'backend' in mt5_config and mt5_config['backend'] not in ('terminal', 'simulated'):
+            raise ConfigError("MT5 backend must be 'terminal' or 'simulated'")
+        if 'simulator' in mt5_config:
+            self._validate_simulator_config(mt5_config['simulator'] or {})
+
+    def _validate_simulator_config(self, simulator: Dict[str, Any]) -> None:
+        """Validate the simulated MT5 backend settings (mt5.simulator)."""
+        if 'seed' in simulator and not isinstance(simulator['seed'], (int, str)):
+            raise ConfigError("MT5 simulator seed must be an integer or string")
+        for field in ['requote_probability', 'disconnect_probability']:
+            if field in simulator and (not isinstance(simulator[field], (int, float)) or not 0 <= simulator[field] <= 1):
+                raise ConfigError(f"MT5 simulator {field} must be between 0 and 1")
+        for field in ['tick_interval_ms', 'disconnect_ms']:
+            if field in simulator and (not isinstance(simulator[field], (int, float)) or simulator[field] < 0):
+                raise ConfigError(f"MT5 simulator {field} must be a non-negative number")
+        if 'execution' in simulator and simulator['execution'] not in ('market', 'instant'):
+            raise ConfigError("MT5 simulator execution must be 'market' or 'instant'")
+
+        account = simulator.get('account', {})
+        if 'margin_mode' in account and account['margin_mode'] not in ('hedging', 'netting'):
+            raise ConfigError("MT5 simulator account margin_mode must be 'hedging' or 'netting'")
+        for field in ['balance', 'leverage']:
+            if field in account and (not isinstance(account[field], (int, float)) or account[field] <= 0):
+                raise ConfigError(f"MT5 simulator account {field} must be a positive number")
+
+        for name, spec in (simulator.get('symbols') or {}).items():
+            for field in ['bid', 'contract_size', 'volume_min', 'volume_max', 'volume_step']:
+                if field in spec and (not isinstance(spec[field], (int, float)) or spec[field] <= 0):
+                    raise ConfigError(f"MT5 simulator symbol {name} {field} must be a positive number")
+
+        # Millisecond parameters of each latency distribution
+        parameters = {
+            'fixed': ['value_ms'], 'uniform': ['min_ms', 'max_ms'], 'normal': ['mean_ms', 'stddev_ms'],
+            'lognormal': ['median_ms', 'sigma'], 'exponential': ['mean_ms']
+        }
+        for function, spec in (simulator.get('latency') or {}).items():
+            distribution = spec.get('distribution', 'fixed')
+            if distribution not in parameters:
+                raise ConfigError(f"MT5 simulator latency for {function}: distribution must be one of {list(parameters)}")
+            for field in parameters[distribution]:
+                if field in spec and (not isinstance(spec[field], (int, float)) or spec[field] < 0):
+                    raise ConfigError(f"MT5 simulator latency for {function}: {field} must be a non-negative number")
+            if distribution == 'lognormal' and spec.get('median_ms', 1.0) <= 0:
+                raise ConfigError(f"MT5 simulator latency for {function}: median_ms must be positive")
     
-    def _validate_server_config(self) -> None:
+    def _validate_server_config(self, config: Dict[str, Any]) -> None:
         """Validate server configuration section."""
-        server_config = self.config['server']
+        server_config = config['server']
         
         # Validate required fields
         required_fields = ['host', 'port']
@@ -95,13 +348,22 @@ class ConfigManager:
         
         # Validate security settings if present
         if 'security' in server_config:
-            security = server_config['security']
-            if 'allowed_ips' in security and not isinstance(security['allowed_ips'], list):
-                raise ConfigError("allowed_ips must be a list")
+            security = server_config['security'] or {}
+            for field in ['allowed_ips', 'trusted_proxies']:
+                if field not in security:
+                    continue
+                entries = security[field]
+                if not isinstance(entries, list):
+                    raise ConfigError(f"{field} must be a list")
+                for entry in entries:
+                    try:
+                        ipaddress.ip_network(str(entry).strip(), strict=False)
+                    except ValueError:
+                        raise ConfigError(f"Invalid IP address or network in {field}: {entry}")
     
-    def _validate_trading_config(self) -> None:
+    def _validate_trading_config(self, config: Dict[str, Any]) -> None:
         """Validate trading configuration section."""
-        trading_config = self.config['trading']
+        trading_config = config['trading']
         
         # Validate volume settings
         volume_fields = ['default_volume', 'max_volume', 'min_volume']
@@ -126,15 +388,21 @@ class ConfigManager:
             if not isinstance(magic, int) or magic < 0:
                 raise ConfigError("Magic number must be a non-negative integer")
         
+        # Validate close concurrency
+        if 'close_concurrency' in trading_config:
+            concurrency = trading_config['close_concurrency']
+            if not isinstance(concurrency, int) or concurrency <= 0:
+                raise ConfigError("close_concurrency must be a positive integer")
+        
         # Validate allowed symbols
         if 'allowed_symbols' in trading_config:
             symbols = trading_config['allowed_symbols']
             if not isinstance(symbols, list):
                 raise ConfigError("allowed_symbols must be a list")
     
-    def _validate_logging_config(self) -> None:
+    def _validate_logging_config(self, config: Dict[str, Any]) -> None:
         """Validate logging configuration section."""
-        logging_config = self.config['logging']
+        logging_config = config['logging']
         
         # Validate log level
         if 'level' in logging_config:
@@ -150,17 +418,189 @@ class ConfigManager:
                 value = logging_config[field]
                 if not isinstance(value, int) or value < 0:
                     raise ConfigError(f"Logging {field} must be a non-negative integer")
+
+        # Validate queue mode settings
+        queue_config = logging_config.get('queue') or {}
+        if 'size' in queue_config and (not isinstance(queue_config['size'], int) or queue_config['size'] <= 0):
+            raise ConfigError("Logging queue size must be a positive integer")
+        if 'batch_size' in queue_config and (not isinstance(queue_config['batch_size'], int)
+                                             or queue_config['batch_size'] <= 0):
+            raise ConfigError("Logging queue batch_size must be a positive integer")
+        if 'overflow' in queue_config and queue_config['overflow'] not in BoundedQueueHandler.OVERFLOW_POLICIES:
+            raise ConfigError(f"Invalid logging queue overflow policy: {queue_config['overflow']}. "
+                              f"Must be one of {list(BoundedQueueHandler.OVERFLOW_POLICIES)}")
     
-    def get_config(self) -> Dict[str, Any]:
+    def _validate_webhook_config(self, config: Dict[str, Any]) -> None:
+        """Validate webhook configuration section."""
+        webhook_config = config['webhook'] or {}
+
+        if 'max_batch_size' in webhook_config:
+            value = webhook_config['max_batch_size']
+            if not isinstance(value, int) or value <= 0:
+                raise ConfigError("Webhook max_batch_size must be a positive integer")
+
+        parse_cache = webhook_config.get('parse_cache') or {}
+        for field in ['max_entries', 'max_body_bytes']:
+            if field in parse_cache:
+                value = parse_cache[field]
+                if not isinstance(value, int) or value <= 0:
+                    raise ConfigError(f"Webhook parse_cache {field} must be a positive integer")
+    
+    def _validate_scheduler_config(self, config: Dict[str, Any]) -> None:
+        """Validate optional scheduler configuration section."""
+        scheduler_config = config.get('scheduler') or {}
+
+        for field in ['workers', 'job_retention', 'max_jobs']:
+            if field in scheduler_config:
+                value = scheduler_config[field]
+                if not isinstance(value, int) or value <= 0:
+                    raise ConfigError(f"Scheduler {field} must be a positive integer")
+
+        if 'starvation_ms' in scheduler_config:
+            value = scheduler_config['starvation_ms']
+            if not isinstance(value, (int, float)) or value <= 0:
+                raise ConfigError("Scheduler starvation_ms must be a positive number")
+
+        weights = scheduler_config.get('priority_weights')
+        if weights is not None:
+            if not isinstance(weights, dict):
+                raise ConfigError("Scheduler priority_weights must be a mapping")
+            for priority, weight in weights.items():
+                if priority not in ('exit', 'modify', 'entry'):
+                    raise ConfigError(f"Invalid priority class: {priority}. Must be one of ['exit', 'modify', 'entry']")
+                if not isinstance(weight, (int, float)) or weight <= 0:
+                    raise ConfigError(f"Scheduler priority weight for {priority} must be a positive number")
+    
+    def _validate_tick_stream_config(self, config: Dict[str, Any]) -> None:
+        """Validate optional tick stream configuration section."""
+        tick_config = config.get('tick_stream') or {}
+
+        for field in ['poll_interval_ms', 'buffer_size', 'max_age_ms', 'recent_symbol_ttl']:
+            if field in tick_config:
+                value = tick_config[field]
+                if not isinstance(value, (int, float)) or value <= 0:
+                    raise ConfigError(f"Tick stream {field} must be a positive number")
+
+        if 'buffer_size' in tick_config and not isinstance(tick_config['buffer_size'], int):
+            raise ConfigError("Tick stream buffer_size must be an integer")
+    
+    def _validate_idempotency_config(self, config: Dict[str, Any]) -> None:
+        """Validate optional idempotency configuration section."""
+        idempotency_config = config.get('idempotency') or {}
+
+        for field in ['ttl', 'max_entries']:
+            if field in idempotency_config:
+                value = idempotency_config[field]
+                if not isinstance(value, int) or value <= 0:
+                    raise ConfigError(f"Idempotency {field} must be a positive integer")
+
+        if 'persist_file' in idempotency_config and not isinstance(idempotency_config['persist_file'], str):
+            raise ConfigError("Idempotency persist_file must be a string")
+    
+    def _validate_coalescing_config(self, config: Dict[str, Any]) -> None:
+        """Validate optional coalescing configuration section."""
+        coalescing_config = config.get('coalescing') or {}
+
+        if 'enabled' in coalescing_config and not isinstance(coalescing_config['enabled'], bool):
+            raise ConfigError("Coalescing enabled must be true or false")
+    
+    def _validate_performance_config(self, config: Dict[str, Any]) -> None:
+        """Validate optional performance configuration section (rate limiting and admission)."""
+        performance_config = config.get('performance') or {}
+
+        rate_config = performance_config.get('rate_limiting') or {}
+        for field in ['requests_per_minute', 'burst_size']:
+            if field in rate_config:
+                value = rate_config[field]
+                if not isinstance(value, (int, float)) or value <= 0:
+                    raise ConfigError(f"Rate limiting {field} must be a positive number")
+
+        admission_config = performance_config.get('admission') or {}
+        for field in ['max_concurrent', 'max_buckets']:
+            if field in admission_config:
+                value = admission_config[field]
+                if not isinstance(value, int) or value <= 0:
+                    raise ConfigError(f"Admission {field} must be a positive integer")
+
+        if 'max_queue' in admission_config:
+            value = admission_config['max_queue']
+            if not isinstance(value, int) or value < 0:
+                raise ConfigError("Admission max_queue must be a non-negative integer")
+
+        if 'queue_timeout_ms' in admission_config:
+            value = admission_config['queue_timeout_ms']
+            if not isinstance(value, (int, float)) or value < 0:
+                raise ConfigError("Admission queue_timeout_ms must be a non-negative number")
+    
+    def _validate_intake_journal_config(self, config: Dict[str, Any]) -> None:
+        """Validate optional intake journal configuration section."""
+        journal_config = config.get('intake_journal') or {}
+
+        for field in ['segment_size', 'flush_interval_ms', 'replay_grace']:
+            if field in journal_config:
+                value = journal_config[field]
+                if not isinstance(value, (int, float)) or value <= 0:
+                    raise ConfigError(f"Intake journal {field} must be a positive number")
+
+        if 'segment_size' in journal_config and journal_config['segment_size'] < 4096:
+            raise ConfigError("Intake journal segment_size must be at least 4096 bytes")
+
+        if 'directory' in journal_config and not isinstance(journal_config['directory'], str):
+            raise ConfigError("Intake journal directory must be a string")
+    
+    def _validate_trade_journal_config(self, config: Dict[str, Any]) -> None:
+        """Validate optional trade journal configuration section."""
+        journal_config = config.get('trade_journal') or {}
+
+        for field in ['flush_interval_ms', 'max_pending', 'index_interval']:
+            if field in journal_config:
+                value = journal_config[field]
+                if not isinstance(value, (int, float)) or value <= 0:
+                    raise ConfigError(f"Trade journal {field} must be a positive number")
+
+        if 'index_interval' in journal_config and not isinstance(journal_config['index_interval'], int):
+            raise ConfigError("Trade journal index_interval must be an integer")
+
+        if 'partition' in journal_config and journal_config['partition'] not in PARTITION_FORMATS:
+            raise ConfigError(f"Trade journal partition must be one of {list(PARTITION_FORMATS)}")
+
+        if 'directory' in journal_config and not isinstance(journal_config['directory'], str):
+            raise ConfigError("Trade journal directory must be a string")
+
+    def _validate_tracing_config(self, config: Dict[str, Any]) -> None:
+        """Validate optional tracing configuration section."""
+        tracing_config = config.get('tracing') or {}
+
+        if 'enabled' in tracing_config and not isinstance(tracing_config['enabled'], bool):
+            raise ConfigError("Tracing enabled must be true or false")
+
+        if 'max_series' in tracing_config:
+            max_series = tracing_config['max_series']
+            if not isinstance(max_series, int) or max_series <= 0:
+                raise ConfigError("Tracing max_series must be a positive integer")
+
+    def _validate_config_watch_config(self, config: Dict[str, Any]) -> None:
+        """Validate optional config_watch section."""
+        watch_config = config.get('config_watch') or {}
+
+        if 'enabled' in watch_config and not isinstance(watch_config['enabled'], bool):
+            raise ConfigError("config_watch enabled must be true or false")
+
+        if 'interval' in watch_config:
+            interval = watch_config['interval']
+            if not isinstance(interval, (int, float)) or interval <= 0:
+                raise ConfigError("config_watch interval must be a positive number")
+    
+    def get_config(self) -> ConfigSnapshot:
         """
         Get the complete configuration.
         
         Returns:
-            Complete configuration dictionary
+            Current read-only configuration snapshot (not copied)
         """
-        return self.config.copy()
+        return self._snapshot
     
-    def get_section(self, section: str) -> Dict[str, Any]:
+    def get_section(self, section: str) -> Mapping:
         """
         Get a specific configuration section.
         
@@ -168,15 +608,16 @@ class ConfigManager:
             section: Section name
             
         Returns:
-            Configuration section dictionary
+            Read-only configuration section
             
         Raises:
             ConfigError: If section doesn't exist
         """
-        if section not in self.config:
+        snapshot = self._snapshot
+        if section not in snapshot:
             raise ConfigError(f"Configuration section not found: {section}")
         
-        return self.config[section].copy()
+        return snapshot[section]
     
     def get_value(self, section: str, key: str, default: Any = None) -> Any:
         """
@@ -190,34 +631,126 @@ class ConfigManager:
         Returns:
             Configuration value or default
         """
-        if section not in self.config:
+        snapshot = self._snapshot
+        if section not in snapshot:
             return default
         
-        return self.config[section].get(key, default)
+        return snapshot[section].get(key, default)
     
-    def reload_config(self) -> None:
-        """Reload configuration from file."""
-        self._load_config()
-        self._validate_config()
+    def reload_config(self) -> ConfigSnapshot:
+        """
+        Reload configuration from file and notify reload listeners.
+
+        Returns:
+            Newly published snapshot
+
+        Raises:
+            ConfigError: If the file is invalid; the current snapshot stays in place
+        """
+        with self._publish_lock:
+            try:
+                snapshot = self._build_snapshot()
+            except ConfigError as e:
+                self._stats['reload_failures'] += 1
+                self._stats['last_error'] = str(e)
+                raise
+            self._publish(snapshot)
+            self._stats['reloads'] += 1
+            self._stats['last_error'] = None
+
+        self.logger.info(f"Configuration reloaded (version {snapshot.version})")
+        self._notify(snapshot)
+        return snapshot
+
+    def add_reload_listener(self, callback: Callable[[ConfigSnapshot], None]) -> None:
+        """
+        Register a callback invoked with the new snapshot after each reload.
+
+        Args:
+            callback: Callable receiving the reloaded configuration
+        """
+        self._reload_listeners.append(callback)
+
+    def _notify(self, snapshot: ConfigSnapshot) -> None:
+        """Invoke reload listeners with a newly published snapshot."""
+        for callback in self._reload_listeners:
+            try:
+                callback(snapshot)
+            except Exception as e:
+                self.logger.error(f"Config reload listener failed: {e}")
+
+    def start_watcher(self) -> None:
+        """Start polling the configuration file for changes if config_watch is enabled."""
+        watch_config = self._snapshot.get('config_watch') or {}
+        if not watch_config.get('enabled', False) or self._watch_thread:
+            return
+
+        interval = watch_config.get('interval', 2)
+        self._watch_stop.clear()
+        self._watch_thread = threading.Thread(target=self._watch, args=(interval,),
+                                              name='config-watcher', daemon=True)
+        self._watch_thread.start()
+        self.logger.info(f"Watching {self.config_file} for changes every {interval}s")
+
+    def stop_watcher(self) -> None:
+        """Stop the configuration file watcher."""
+        self._watch_stop.set()
+        if self._watch_thread:
+            self._watch_thread.join(timeout=5)
+            self._watch_thread = None
+
+    def _watch(self, interval: float) -> None:
+        """Watcher loop: reload when the file modification time changes."""
+        failed_mtime = None
+        while not self._watch_stop.wait(interval):
+            mtime = self._file_mtime()
+            if mtime is None or mtime == self._snapshot.mtime or mtime == failed_mtime:
+                continue
+            try:
+                self.reload_config()
+                failed_mtime = None
+            except ConfigError as e:
+                # Keep serving the previous snapshot; retry once the file changes again
+                failed_mtime = mtime
+                self.logger.error(f"Configuration change rejected, keeping version {self.version}: {e}")
+
+    def get_stats(self) -> Dict[str, Any]:
+        """
+        Get configuration statistics.
+
+        Returns:
+            Statistics dictionary with the current snapshot version
+        """
+        snapshot = self._snapshot
+        stats = dict(self._stats)
+        stats['version'] = snapshot.version
+        stats['loaded_at'] = datetime.fromtimestamp(snapshot.loaded_at).isoformat()
+        stats['watching'] = self._watch_thread is not None
+        return stats
     
     def update_config(self, section: str, key: str, value: Any) -> None:
         """
-        Update a configuration value.
+        Update a configuration value by publishing a new snapshot.
         
         Args:
             section: Section name
             key: Key name
             value: New value
+
+        Raises:
+            ConfigError: If the updated configuration is invalid
         """
-        if section not in self.config:
-            self.config[section] = {}
-        
-        self.config[section][key] = value
+        with self._publish_lock:
+            config = self._snapshot.to_dict()
+            config.setdefault(section, {})[key] = value
+            snapshot = self._build_snapshot(config)
+            self._publish(snapshot)
+        self._notify(snapshot)
     
     def save_config(self) -> None:
         """Save current configuration to file."""
         try:
             with open(self.config_file, 'w', encoding='utf-8') as f:
-                yaml.dump(self.config, f, default_flow_style=False, indent=2)
+                yaml.dump(self._snapshot.to_dict(), f, default_flow_style=False, indent=2)
         except Exception as e:
             raise ConfigError(f"Error saving configuration: {e}")
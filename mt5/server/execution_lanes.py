@@ -0,0 +1,276 @@
+"""
+Execution Lanes for MT5 Trading HTTP Server.
+Per-symbol FIFO lanes served by a bounded worker pool, with priority classes
+deciding which ready lane runs next.
+"""
+
+import logging
+import threading
+import time
+from collections import deque
+from typing import Dict, Any, Callable, List, Optional
+from utils.metrics import LatencyHistogram
+
+
+# Lane for work that is not tied to one symbol (e.g. close_all without a symbol)
+GLOBAL_LANE = '*'
+
+
+class Priority:
+    """Priority classes, highest first."""
+    EXIT = 'exit'
+    MODIFY = 'modify'
+    ENTRY = 'entry'
+
+    ORDER = (EXIT, MODIFY, ENTRY)
+    DEFAULT_WEIGHTS = {EXIT: 8, MODIFY: 4, ENTRY: 1}
+
+    # action -> priority class
+    ACTIONS = {
+        'close': EXIT,
+        'close_all': EXIT,
+        'modify': MODIFY,
+        'buy': ENTRY,
+        'sell': ENTRY
+    }
+
+    @classmethod
+    def for_action(cls, action: Optional[str]) -> str:
+        """
+        Get the priority class of a trade action.
+
+        Args:
+            action: Trade action (optional)
+
+        Returns:
+            Priority class, risk-reducing exits first
+        """
+        return cls.ACTIONS.get((action or '').lower(), cls.ENTRY)
+
+
+class Lane:
+    """FIFO queue of work items for one symbol."""
+
+    __slots__ = ('key', 'queue', 'active', 'processed', 'max_depth', 'wait_total', 'wait_max')
+
+    def __init__(self, key: str):
+        self.key = key
+        # (enqueued_at monotonic, priority, fn, args)
+        self.queue = deque()
+        self.active = False
+        self.processed = 0
+        self.max_depth = 0
+        self.wait_total = 0.0
+        self.wait_max = 0.0
+
+    def to_dict(self) -> Dict[str, Any]:
+        """
+        Serialize lane metrics.
+
+        Returns:
+            Lane metrics dictionary
+        """
+        oldest = self.queue[0][0] if self.queue else None
+        return {
+            'depth': len(self.queue),
+            'active': self.active,
+            'processed': self.processed,
+            'max_depth': self.max_depth,
+            'avg_wait_ms': round(self.wait_total / self.processed * 1000, 3) if self.processed else 0.0,
+            'max_wait_ms': round(self.wait_max * 1000, 3),
+            'oldest_wait_ms': round((time.monotonic() - oldest) * 1000, 3) if oldest else 0.0
+        }
+
+
+class ExecutionLanes:
+    """
+    Bounded worker pool over per-symbol FIFO lanes.
+
+    At most one item per lane runs at a time, so work for one symbol executes
+    in submission order. A lane with queued work sits in exactly one ready
+    queue, chosen by the priority class of its head item; after running one
+    item it rejoins the back of a ready queue, so a burst on one symbol takes
+    turns with the other symbols instead of stalling them.
+
+    Workers pick the next ready queue by smooth weighted round-robin over the
+    classes, so exits are served ahead of a backlog of entries. A lane whose
+    head item has waited longer than starvation_ms is served first regardless
+    of class.
+    """
+
+    def __init__(self, workers: int = 4, config: Dict[str, Any] = None):
+        """
+        Initialize execution lanes.
+
+        Args:
+            workers: Number of worker threads
+            config: Scheduler configuration dictionary (optional)
+        """
+        config = config or {}
+        self.logger = logging.getLogger('mt5_server.lanes')
+        self.workers = workers
+        self.weights = dict(Priority.DEFAULT_WEIGHTS)
+        self.weights.update(config.get('priority_weights') or {})
+        self.starvation = config.get('starvation_ms', 500) / 1000.0
+
+        self._lanes: Dict[str, Lane] = {}
+        self._ready: Dict[str, deque] = {priority: deque() for priority in Priority.ORDER}
+        self._credit: Dict[str, float] = {priority: 0.0 for priority in Priority.ORDER}
+        self._latency = {
+            priority: {'wait': LatencyHistogram(), 'total': LatencyHistogram()}
+            for priority in Priority.ORDER
+        }
+        self._aged = 0
+        self._condition = threading.Condition()
+        self._threads: List[threading.Thread] = []
+        self._running = False
+
+    @staticmethod
+    def lane_key(symbol: Optional[str]) -> str:
+        """
+        Get the lane key for a symbol.
+
+        Args:
+            symbol: Trading symbol (optional)
+
+        Returns:
+            Lane key
+        """
+        return symbol.upper() if symbol else GLOBAL_LANE
+
+    def start(self) -> None:
+        """Start the worker threads."""
+        with self._condition:
+            if self._running:
+                return
+            self._running = True
+
+        self._threads = [
+            threading.Thread(target=self._worker, name=f'mt5-lane-{i}', daemon=True)
+            for i in range(self.workers)
+        ]
+        for thread in self._threads:
+            thread.start()
+
+    def stop(self) -> None:
+        """Stop the workers after the queued work has drained."""
+        with self._condition:
+            self._running = False
+            self._condition.notify_all()
+
+        for thread in self._threads:
+            thread.join(timeout=30)
+        self._threads = []
+
+    def submit(self, symbol: Optional[str], fn: Callable, *args, priority: str = Priority.ENTRY) -> None:
+        """
+        Queue work on the lane for a symbol.
+
+        Args:
+            symbol: Trading symbol selecting the lane (optional)
+            fn: Callable to run
+            *args: Arguments for the callable
+            priority: Priority class of the work (default: entry)
+        """
+        key = self.lane_key(symbol)
+        with self._condition:
+            lane = self._lanes.get(key)
+            if lane is None:
+                lane = self._lanes[key] = Lane(key)
+
+            lane.queue.append((time.monotonic(), priority, fn, args))
+            lane.max_depth = max(lane.max_depth, len(lane.queue))
+
+            # A lane is in a ready queue at most once, and never while running
+            if not lane.active and len(lane.queue) == 1:
+                self._make_ready(lane)
+
+    def get_stats(self) -> Dict[str, Any]:
+        """
+        Get lane statistics.
+
+        Returns:
+            Statistics dictionary with per-lane depth and wait metrics
+        """
+        with self._condition:
+            lanes = {key: lane.to_dict() for key, lane in self._lanes.items()}
+            ready = {priority: len(queue) for priority, queue in self._ready.items()}
+            aged = self._aged
+        return {
+            'workers': self.workers,
+            'ready_lanes': ready,
+            'queued': sum(lane['depth'] for lane in lanes.values()),
+            'weights': self.weights,
+            'starvation_ms': int(self.starvation * 1000),
+            'aged_dispatches': aged,
+            'latency': {
+                priority: {name: histogram.to_dict() for name, histogram in histograms.items()}
+                for priority, histograms in self._latency.items()
+            },
+            'lanes': lanes
+        }
+
+    def _has_ready(self) -> bool:
+        """Whether any lane is ready (caller holds the lock)."""
+        return any(self._ready.values())
+
+    def _make_ready(self, lane: Lane) -> None:
+        """Queue a lane under the priority of its head item (caller holds the lock)."""
+        self._ready[lane.queue[0][1]].append(lane.key)
+        self._condition.notify()
+
+    def _next_lane(self) -> Lane:
+        """Pick the next ready lane to serve (caller holds the lock)."""
+        candidates = [priority for priority in Priority.ORDER if self._ready[priority]]
+
+        # Starvation protection: the longest-waiting head item past the limit goes first
+        now = time.monotonic()
+        oldest, oldest_at = None, now - self.starvation
+        for priority in candidates:
+            enqueued_at = self._lanes[self._ready[priority][0]].queue[0][0]
+            if enqueued_at < oldest_at:
+                oldest, oldest_at = priority, enqueued_at
+        if oldest is not None:
+            self._aged += 1
+            return self._lanes[self._ready[oldest].popleft()]
+
+        # Smooth weighted round-robin across classes with ready lanes
+        total = 0
+        selected = None
+        for priority in candidates:
+            weight = self.weights.get(priority, 1)
+            self._credit[priority] += weight
+            total += weight
+            if selected is None or self._credit[priority] > self._credit[selected]:
+                selected = priority
+        self._credit[selected] -= total
+        return self._lanes[self._ready[selected].popleft()]
+
+    def _worker(self) -> None:
+        """Worker loop serving one item at a time from ready lanes."""
+        while True:
+            with self._condition:
+                while self._running and not self._has_ready():
+                    self._condition.wait()
+                if not self._has_ready():
+                    return
+
+                lane = self._next_lane()
+                enqueued_at, priority, fn, args = lane.queue.popleft()
+                lane.active = True
+                wait = time.monotonic() - enqueued_at
+                lane.wait_total += wait
+                lane.wait_max = max(lane.wait_max, wait)
+
+            self._latency[priority]['wait'].record(wait * 1000)
+            try:
+                fn(*args)
+            except Exception as e:
+                self.logger.error(f"Lane {lane.key} task failed: {e}")
+            finally:
+                self._latency[priority]['total'].record((time.monotonic() - enqueued_at) * 1000)
+                with self._condition:
+                    lane.active = False
+                    lane.processed += 1
+                    if lane.queue:
+                        self._make_ready(lane)
@@ -0,0 +1,237 @@
+"""
+Idempotency Store for MT5 Trading HTTP Server.
+Suppresses duplicate webhook alerts so a retried alert never trades twice.
+"""
+
+import hashlib
+import json
+import logging
+import os
+import threading
+import time
+from collections import OrderedDict
+from typing import Dict, Any, Callable, Tuple
+from utils.logger import log_error_with_context
+
+
+# Job states whose outcome has not been recorded yet
+OPEN_STATUSES = ('pending', 'running')
+
+# The persistence file is compacted once it holds this many lines per max_entries
+COMPACT_FACTOR = 2
+
+
+class IdempotencyStore:
+    """
+    Bounded LRU+TTL map from alert key to the job that first executed it.
+
+    The key is the caller supplied alert id when present, otherwise a hash of
+    the canonical payload and the bar minute it arrived in. Entries and job
+    outcomes are appended to a local JSONL file, which is replayed on startup
+    so deduplication survives a restart. The file is compacted on startup and
+    whenever it grows past COMPACT_FACTOR times max_entries lines.
+    """
+
+    def __init__(self, config: Dict[str, Any] = None):
+        """
+        Initialize idempotency store.
+
+        Args:
+            config: Idempotency configuration dictionary (optional)
+        """
+        config = config or {}
+        self.logger = logging.getLogger('mt5_server.idempotency')
+        self.enabled = config.get('enabled', True)
+        self.ttl = config.get('ttl', 600)
+        self.max_entries = config.get('max_entries', 10000)
+        self.persist_file = config.get('persist_file', 'idempotency.jsonl')
+
+        self._entries: 'OrderedDict[str, Dict[str, Any]]' = OrderedDict()
+        self._keys_by_job: Dict[str, str] = {}
+        self._lock = threading.Lock()
+        self._file = None
+        self._lines = 0
+        self._stats = {'duplicates': 0, 'accepted': 0, 'evicted': 0, 'compactions': 0}
+
+        if self.enabled and self.persist_file:
+            self._load()
+
+    @staticmethod
+    def make_key(payload: Dict[str, Any], alert_id: str = None, now: float = None) -> str:
+        """
+        Derive the idempotency key for an alert.
+
+        Args:
+            payload: Parsed webhook payload
+            alert_id: Caller supplied alert id (optional)
+            now: Arrival timestamp (optional, defaults to current time)
+
+        Returns:
+            Idempotency key
+        """
+        if alert_id:
+            return f"alert:{alert_id}"
+
+        if now is None:
+            now = time.time()
+        canonical = json.dumps(payload, sort_keys=True, separators=(',', ':'), ensure_ascii=False, default=str)
+        digest = hashlib.sha256(f"{int(now // 60)}|{canonical}".encode('utf-8')).hexdigest()
+        return f"hash:{digest}"
+
+    def execute_once(self, key: str, submit: Callable[[], Any]) -> Tuple[Dict[str, Any], bool]:
+        """
+        Submit work for a key unless a live entry already exists.
+
+        The lookup and submission happen under one lock, so concurrent copies
+        of an alert resolve to the same job.
+
+        Args:
+            key: Idempotency key
+            submit: Callable scheduling the work and returning a job with an id
+
+        Returns:
+            (entry for the key, True if this call submitted the work)
+        """
+        now = time.time()
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry and entry['expires_at'] > now:
+                self._entries.move_to_end(key)
+                self._stats['duplicates'] += 1
+                return dict(entry), False
+
+            job = submit()
+            entry = {
+                'key': key,
+                'job_id': job.id,
+                'expires_at': now + self.ttl,
+                'status': job.status,
+                'result': None,
+                'error': None
+            }
+            self._entries[key] = entry
+            self._entries.move_to_end(key)
+            self._keys_by_job[job.id] = key
+            self._stats['accepted'] += 1
+            self._evict(now)
+            self._persist(entry)
+            return dict(entry), True
+
+    def record_outcome(self, job) -> None:
+        """
+        Store the final outcome of a job submitted through execute_once.
+
+        Intended as an ExecutionScheduler listener.
+
+        Args:
+            job: Finished job
+        """
+        with self._lock:
+            key = self._keys_by_job.pop(job.id, None)
+            entry = self._entries.get(key) if key else None
+            if entry is None:
+                return
+            entry['status'] = job.status
+            entry['result'] = job.result
+            entry['error'] = job.error
+            self._persist(entry)
+
+    def get_stats(self) -> Dict[str, Any]:
+        """
+        Get store statistics.
+
+        Returns:
+            Statistics dictionary
+        """
+        with self._lock:
+            stats = dict(self._stats)
+            stats['entries'] = len(self._entries)
+        stats['enabled'] = self.enabled
+        stats['ttl'] = self.ttl
+        return stats
+
+    def close(self) -> None:
+        """Close the persistence file."""
+        with self._lock:
+            if self._file:
+                self._file.close()
+                self._file = None
+
+    def _evict(self, now: float) -> None:
+        """Drop expired entries from the LRU end and enforce the size cap (caller holds the lock)."""
+        while self._entries:
+            key, entry = next(iter(self._entries.items()))
+            if len(self._entries) <= self.max_entries and entry['expires_at'] > now:
+                break
+            del self._entries[key]
+            self._keys_by_job.pop(entry['job_id'], None)
+            self._stats['evicted'] += 1
+
+    def _persist(self, entry: Dict[str, Any]) -> None:
+        """Append an entry to the persistence file (caller holds the lock)."""
+        if not self._file:
+            return
+        try:
+            self._file.write(json.dumps(entry, ensure_ascii=False, default=str) + '\n')
+            self._file.flush()
+            self._lines += 1
+        except Exception as e:
+            log_error_with_context(self.logger, e, "Failed to persist idempotency entry", key=entry['key'])
+            return
+
+        if self._lines > COMPACT_FACTOR * self.max_entries:
+            try:
+                self._compact()
+                self._stats['compactions'] += 1
+            except Exception as e:
+                log_error_with_context(self.logger, e, "Failed to compact idempotency store")
+
+    def _load(self) -> None:
+        """Replay the persistence file, keep live entries and rewrite it compacted."""
+        now = time.time()
+        if os.path.exists(self.persist_file):
+            try:
+                with open(self.persist_file, 'r', encoding='utf-8') as f:
+                    for line in f:
+                        try:
+                            entry = json.loads(line)
+                        except ValueError:
+                            # A torn final line from a crash is expected
+                            continue
+                        self._entries[entry['key']] = entry
+                        self._entries.move_to_end(entry['key'])
+            except Exception as e:
+                log_error_with_context(self.logger, e, "Failed to load idempotency store")
+                self._entries.clear()
+
+        self._evict(now)
+
+        # Jobs accepted before a restart may be replayed by the intake journal;
+        # track them so their outcome replaces the pending status
+        self._keys_by_job = {entry['job_id']: key for key, entry in self._entries.items()
+                             if entry['status'] in OPEN_STATUSES}
+
+        directory = os.path.dirname(self.persist_file)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+
+        self._compact()
+        self.logger.info(f"Idempotency store loaded {len(self._entries)} live entries from {self.persist_file}")
+
+    def _compact(self) -> None:
+        """Rewrite the persistence file from the live entries and reopen it for appending (caller holds the lock)."""
+        self._evict(time.time())
+        if self._file:
+            self._file.close()
+            self._file = None
+
+        temp_file = f"{self.persist_file}.tmp"
+        try:
+            with open(temp_file, 'w', encoding='utf-8') as f:
+                for entry in self._entries.values():
+                    f.write(json.dumps(entry, ensure_ascii=False, default=str) + '\n')
+            os.replace(temp_file, self.persist_file)
+        finally:
+            # Keep appending even if the rewrite failed (the old file is intact) and retry later
+            self._lines = len(self._entries)
+            self._file = open(self.persist_file, 'a', encoding='utf-8')
@@ -0,0 +1,423 @@
+"""
+Intake Journal for MT5 Trading HTTP Server.
+Append-only, memory-mapped write-ahead log of accepted webhook trades.
+"""
+
+import json
+import logging
+import mmap
+import os
+import struct
+import threading
+import time
+import zlib
+from typing import Dict, Any, List, Optional
+from utils.logger import log_error_with_context
+
+
+# Record frame: body length, crc32 of body; a zero length marks the end of a segment
+RECORD_HEADER = struct.Struct('<II')
+
+
+class JournalSegment:
+    """One pre-sized, memory-mapped segment file."""
+
+    def __init__(self, path: str, size: int):
+        """
+        Open or create a segment.
+
+        Args:
+            path: Segment file path
+            size: Segment size in bytes for new files
+        """
+        self.path = path
+        self.index = int(os.path.basename(path)[len('intake-'):-len('.wal')])
+        if not os.path.exists(path):
+            with open(path, 'wb') as f:
+                f.truncate(size)
+        self._file = open(path, 'r+b')
+        self.size = os.path.getsize(path)
+        self.mm = mmap.mmap(self._file.fileno(), self.size)
+        self.position = 0
+        self.open_jobs = 0
+        self.closed = False
+
+    def records(self):
+        """
+        Iterate over intact records, stopping at the end marker or a torn record.
+
+        Yields:
+            Decoded record dictionaries
+        """
+        position = 0
+        while position + RECORD_HEADER.size <= self.size:
+            length, crc = RECORD_HEADER.unpack_from(self.mm, position)
+            start = position + RECORD_HEADER.size
+            if length == 0 or start + length > self.size:
+                break
+            body = self.mm[start:start + length]
+            if zlib.crc32(body) != crc:
+                break
+            position = start + length
+            self.position = position
+            yield json.loads(body.decode('utf-8'))
+
+    def fits(self, length: int) -> bool:
+        """Whether a record body of the given length fits in the remaining space."""
+        return self.position + RECORD_HEADER.size + length <= self.size
+
+    def write(self, body: bytes) -> None:
+        """Write one framed record at the current position (caller holds the journal lock)."""
+        RECORD_HEADER.pack_into(self.mm, self.position, len(body), zlib.crc32(body))
+        start = self.position + RECORD_HEADER.size
+        self.mm[start:start + len(body)] = body
+        self.position = start + len(body)
+
+    def flush(self) -> None:
+        """Flush written pages to disk."""
+        self.mm.flush()
+
+    def close(self) -> None:
+        """Unmap and close the segment file."""
+        if not self.closed:
+            self.mm.close()
+            self._file.close()
+            self.closed = True
+
+
+class IntakeJournal:
+    """
+    Write-ahead log of accepted webhook trades.
+
+    Every accepted trade is appended as an 'accept' record before the webhook
+    is acknowledged, and a 'done' record is appended when its job finishes.
+    An atomic batch is one accept record carrying all of its legs; each
+    finished leg adds a 'leg' record with its outcome, so recovery knows
+    which entries filled before a crash.
+    Appends only copy into the mapped segment; a flusher thread syncs all
+    pending records every few milliseconds (group commit) and wakes the
+    requests waiting for durability. On startup, accepts without a done
+    record are handed back for replay.
+    """
+
+    def __init__(self, config: Dict[str, Any] = None):
+        """
+        Initialize intake journal.
+
+        Args:
+            config: Intake journal configuration dictionary (optional)
+        """
+        config = config or {}
+        self.logger = logging.getLogger('mt5_server.journal')
+        self.enabled = config.get('enabled', True)
+        self.directory = config.get('directory', 'journal')
+        self.segment_size = config.get('segment_size', 16 * 1024 * 1024)
+        self.flush_interval = config.get('flush_interval_ms', 5) / 1000.0
+        self.replay_grace = config.get('replay_grace', 30)
+
+        self._segment: Optional[JournalSegment] = None
+        self._segments: Dict[int, JournalSegment] = {}
+        self._retired: List[JournalSegment] = []
+        self._open_jobs: Dict[str, int] = {}
+        self._sequence = 0
+        self._flushed = 0
+        self._lock = threading.Lock()
+        self._durable = threading.Condition(threading.Lock())
+        self._stop = threading.Event()
+        self._thread = None
+        self._stats = {'appends': 0, 'flushes': 0, 'replayed': 0, 'expired': 0}
+
+    def recover(self, now: float = None) -> List[Dict[str, Any]]:
+        """
+        Read existing segments and return accepted trades that never completed.
+
+        Entries still within their deadline are re-journaled into a fresh
+        segment and returned for rescheduling; expired entries are dropped.
+        The old segments are deleted afterwards.
+
+        Args:
+            now: Reference timestamp (optional, defaults to current time)
+
+        Returns:
+            Accept records to replay, in journal order
+        """
+        if now is None:
+            now = time.time()
+        os.makedirs(self.directory, exist_ok=True)
+
+        pending: Dict[str, Dict[str, Any]] = {}
+        old_segments = []
+        for name in sorted(os.listdir(self.directory)):
+            if not (name.startswith('intake-') and name.endswith('.wal')):
+                continue
+            segment = JournalSegment(os.path.join(self.directory, name), self.segment_size)
+            old_segments.append(segment)
+            try:
+                for record in segment.records():
+                    self._sequence = max(self._sequence, record['seq'])
+                    if record['type'] == 'accept':
+                        pending[record['job_id']] = record
+                    elif record['type'] == 'done':
+                        pending.pop(record['job_id'], None)
+                    elif record['type'] == 'leg' and record['batch_id'] in pending:
+                        pending[record['batch_id']].setdefault('finished_legs', {})[record['job_id']] = record
+            except Exception as e:
+                log_error_with_context(self.logger, e, f"Failed to read journal segment {name}")
+
+        next_index = old_segments[-1].index + 1 if old_segments else 1
+        self._flushed = self._sequence
+        self._open_segment(next_index)
+
+        replay = []
+        for record in pending.values():
+            if record['deadline'] < now:
+                self._stats['expired'] += 1
+                self.logger.warning(f"Dropping journaled job {record['job_id']} past its deadline: "
+                                    f"{self._describe(record)}")
+                continue
+            if 'legs' in record:
+                self.append_batch(record['job_id'], [leg['job_id'] for leg in record['legs']],
+                                  [leg['payload'] for leg in record['legs']], record['run_at'])
+                for leg in record.get('finished_legs', {}).values():
+                    with self._lock:
+                        self._write(dict(leg))
+            else:
+                self.append(record['job_id'], record['payload'], record['run_at'])
+            replay.append(record)
+        self._stats['replayed'] += len(replay)
+        self._sync_now()
+
+        for segment in old_segments:
+            segment.close()
+            os.remove(segment.path)
+
+        if pending:
+            self.logger.info(f"Intake journal recovered {len(replay)} pending trades "
+                             f"({self._stats['expired']} expired)")
+        return replay
+
+    def start(self) -> None:
+        """Start the group-commit flusher thread."""
+        if self._segment is None:
+            self.recover()
+        if self._thread and self._thread.is_alive():
+            return
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._run, name='mt5-journal', daemon=True)
+        self._thread.start()
+        self.logger.info(f"Intake journal started in {self.directory}, "
+                         f"group commit every {int(self.flush_interval * 1000)}ms")
+
+    def stop(self) -> None:
+        """Flush outstanding records and close all segments."""
+        self._stop.set()
+        if self._thread:
+            self._thread.join(timeout=5)
+            self._thread = None
+        self._sync_now()
+        with self._lock:
+            for segment in list(self._segments.values()):
+                segment.close()
+
+    def append(self, job_id: str, payload: Dict[str, Any], run_at: float) -> int:
+        """
+        Append an accept record without waiting for it to be durable.
+
+        Args:
+            job_id: Identifier the job will be scheduled under
+            payload: Validated trade payload
+            run_at: Scheduled execution timestamp
+
+        Returns:
+            Sequence number of the record
+        """
+        with self._lock:
+            seq = self._write({
+                'type': 'accept',
+                'job_id': job_id,
+                'run_at': run_at,
+                'deadline': run_at + self.replay_grace,
+                'payload': payload
+            })
+            self._open_jobs[job_id] = self._segment.index
+            self._segment.open_jobs += 1
+        return seq
+
+    def append_batch(self, batch_id: str, job_ids: List[str], payloads: List[Dict[str, Any]],
+                     run_at: float) -> int:
+        """
+        Append one accept record for an atomic batch without waiting for it to be durable.
+
+        The batch is replayed as a whole, never leg by leg, so a recovered
+        basket keeps its rollback.
+
+        Args:
+            batch_id: Identifier the batch will be scheduled under
+            job_ids: Leg job identifiers
+            payloads: Validated trade payloads, one per leg
+            run_at: Scheduled execution timestamp
+
+        Returns:
+            Sequence number of the record
+        """
+        with self._lock:
+            seq = self._write({
+                'type': 'accept',
+                'job_id': batch_id,
+                'run_at': run_at,
+                'deadline': run_at + self.replay_grace,
+                'atomic': True,
+                'legs': [{'job_id': job_id, 'payload': payload} for job_id, payload in zip(job_ids, payloads)]
+            })
+            self._open_jobs[batch_id] = self._segment.index
+            self._segment.open_jobs += 1
+        return seq
+
+    def record_done(self, job) -> None:
+        """
+        Append a done record for a finished job.
+
+        Intended as an ExecutionScheduler listener; durability follows with the
+        next group commit. A leg of a journaled atomic batch gets a leg record
+        with its result instead; the batch itself is done only after its
+        rollback.
+
+        Args:
+            job: Finished job or batch
+        """
+        batch = getattr(job, 'batch', None)
+        with self._lock:
+            if batch is not None and batch.id in self._open_jobs:
+                self._write({'type': 'leg', 'job_id': job.id, 'batch_id': batch.id,
+                             'status': job.status, 'result': job.result})
+                return
+        self.mark_done(job.id, job.status)
+
+    def mark_done(self, job_id: str, status: str) -> None:
+        """
+        Append a done record for a job or batch finished outside the scheduler.
+
+        Args:
+            job_id: Job or batch identifier
+            status: Final status
+        """
+        with self._lock:
+            index = self._open_jobs.pop(job_id, None)
+            if index is None:
+                return
+            self._write({'type': 'done', 'job_id': job_id, 'status': status})
+
+            segment = self._segments.get(index)
+            if segment is not None:
+                segment.open_jobs -= 1
+                self._collect_segments()
+
+    def sync(self, timeout: float = None) -> bool:
+        """
+        Wait until every record appended so far is durable.
+
+        Args:
+            timeout: Maximum seconds to wait (optional)
+
+        Returns:
+            True if the records were flushed within the timeout
+        """
+        target = self._sequence
+        with self._durable:
+            return self._durable.wait_for(lambda: self._flushed >= target, timeout)
+
+    def get_stats(self) -> Dict[str, Any]:
+        """
+        Get journal statistics.
+
+        Returns:
+            Statistics dictionary
+        """
+        with self._lock:
+            stats = dict(self._stats)
+            stats['sequence'] = self._sequence
+            stats['open_jobs'] = len(self._open_jobs)
+            stats['segments'] = len(self._segments)
+        stats['flushed'] = self._flushed
+        stats['records_per_flush'] = round(stats['appends'] / stats['flushes'], 2) if stats['flushes'] else 0
+        return stats
+
+    @staticmethod
+    def _describe(record: Dict[str, Any]) -> str:
+        """Short description of an accept record for log messages."""
+        if 'legs' in record:
+            return f"atomic batch of {len(record['legs'])} legs"
+        return f"{record['payload'].get('action')} {record['payload'].get('symbol')}"
+
+    def _write(self, record: Dict[str, Any]) -> int:
+        """Frame and write a record into the current segment (caller holds the lock)."""
+        self._sequence += 1
+        record['seq'] = self._sequence
+        body = json.dumps(record, ensure_ascii=False, separators=(',', ':'), default=str).encode('utf-8')
+
+        if not self._segment.fits(len(body)):
+            self._retired.append(self._segment)
+            self._open_segment(self._segment.index + 1, RECORD_HEADER.size * 2 + len(body))
+
+        self._segment.write(body)
+        self._stats['appends'] += 1
+        return self._sequence
+
+    def _open_segment(self, index: int, min_size: int = 0) -> None:
+        """Create a new current segment (caller holds the lock or is recovering)."""
+        path = os.path.join(self.directory, f"intake-{index:08d}.wal")
+        segment = JournalSegment(path, max(self.segment_size, min_size))
+        self._segments[index] = segment
+        self._segment = segment
+
+    def _collect_segments(self) -> None:
+        """
+        Delete the oldest closed segments whose jobs have all completed (caller holds the lock).
+
+        Done records land in later segments than their accepts, so segments
+        are only ever removed as a prefix: a segment still holding open jobs
+        keeps every newer segment, and the done records in them, on disk.
+        """
+        for index in sorted(self._segments):
+            segment = self._segments[index]
+            if not segment.closed or segment.open_jobs > 0:
+                break
+            del self._segments[index]
+            try:
+                os.remove(segment.path)
+            except OSError as e:
+                self.logger.warning(f"Failed to remove journal segment {segment.path}: {e}")
+
+    def _run(self) -> None:
+        """Group-commit loop."""
+        while not self._stop.wait(self.flush_interval):
+            try:
+                self._sync_now()
+            except Exception as e:
+                log_error_with_context(self.logger, e, "Intake journal flush failed")
+
+    def _sync_now(self) -> None:
+        """Flush all records written so far and wake waiting requests."""
+        with self._lock:
+            target = self._sequence
+            if target <= self._flushed:
+                return
+            current = self._segment
+            retired, self._retired = self._retired, []
+
+        # Flushing happens outside the append lock; retired segments are only
+        # touched by this thread once they leave the current slot
+        for segment in retired:
+            segment.flush()
+        current.flush()
+
+        with self._lock:
+            for segment in retired:
+                segment.close()
+            if retired:
+                self._collect_segments()
+            self._stats['flushes'] += 1
+
+        with self._durable:
+            self._flushed = max(self._flushed, target)
+            self._durable.notify_all()
@@ -0,0 +1,138 @@
+"""
+MT5 backend selection for MT5 Trading HTTP Server.
+Modules use `from mt5_backend import mt5` instead of importing MetaTrader5;
+the first attribute access loads either the terminal package or the
+in-process simulator, selected by the MT5_BACKEND environment variable or
+mt5.backend in the configuration.
+"""
+
+import logging
+import os
+import threading
+from typing import Dict, Any
+from utils.exceptions import MT5Error, ConfigError
+
+
+# Environment variable overriding mt5.backend
+BACKEND_ENV = 'MT5_BACKEND'
+
+TERMINAL = 'terminal'
+SIMULATED = 'simulated'
+BACKENDS = (TERMINAL, SIMULATED)
+
+logger = logging.getLogger('mt5_server.backend')
+
+_config: Dict[str, Any] = {}
+_backend = None
+_backend_name = None
+_lock = threading.Lock()
+
+
+class BackendProxy:
+    """
+    Stand-in for the MetaTrader5 module.
+
+    Loading copies the backend's public attributes onto the proxy, so after
+    the first access `mt5.order_send` and `mt5.TRADE_RETCODE_DONE` are plain
+    attribute lookups.
+    """
+
+    def __getattr__(self, name: str):
+        if name.startswith('__'):
+            raise AttributeError(name)
+        _load()
+        try:
+            return self.__dict__[name]
+        except KeyError:
+            raise AttributeError(f"MT5 backend '{_backend_name}' has no attribute '{name}'") from None
+
+    def __repr__(self) -> str:
+        return f"<mt5 backend {_backend_name or 'not loaded'}>"
+
+
+mt5 = BackendProxy()
+
+
+def selected_backend(config: Dict[str, Any] = None) -> str:
+    """
+    Get the backend name that the environment and configuration select.
+
+    Args:
+        config: MT5 configuration dictionary (optional, defaults to the configured one)
+
+    Returns:
+        'terminal' or 'simulated'
+    """
+    config = _config if config is None else config
+    return (os.environ.get(BACKEND_ENV) or config.get('backend') or TERMINAL).strip().lower()
+
+
+def configure(config: Dict[str, Any]) -> None:
+    """
+    Set the MT5 configuration used to select and build the backend.
+
+    Must run before the first MT5 call; the backend cannot change once loaded.
+
+    Args:
+        config: MT5 configuration dictionary
+    """
+    global _config
+    with _lock:
+        if _backend is not None:
+            if selected_backend(config) != _backend_name:
+                logger.warning(f"MT5 backend is already '{_backend_name}'; restart to switch backends")
+            return
+        _config = config or {}
+
+
+def backend():
+    """
+    Get the loaded backend: the MetaTrader5 module or the SimulatedMT5 instance.
+
+    Returns:
+        Backend object (loads it if necessary)
+    """
+    _load()
+    return _backend
+
+
+def get_stats() -> Dict[str, Any]:
+    """
+    Get backend information for /status.
+
+    Returns:
+        Statistics dictionary
+    """
+    stats = {'backend': _backend_name or selected_backend(), 'loaded': _backend is not None}
+    if _backend is not None and _backend_name == SIMULATED:
+        stats['simulator'] = _backend.get_stats()
+    return stats
+
+
+def _load() -> None:
+    """Load the selected backend and publish its attributes on the proxy."""
+    global _backend, _backend_name
+    if _backend is not None:
+        return
+
+    with _lock:
+        if _backend is not None:
+            return
+
+        name = selected_backend()
+        if name == SIMULATED:
+            from mt5_simulator import SimulatedMT5
+            module = SimulatedMT5(_config.get('simulator', {}))
+        elif name == TERMINAL:
+            try:
+                import MetaTrader5 as module
+            except ImportError as e:
+                raise MT5Error(f"MetaTrader5 package is not available ({e}); "
+                               f"set {BACKEND_ENV}={SIMULATED} to use the simulator") from e
+        else:
+            raise ConfigError(f"Unknown MT5 backend: {name}. Must be one of {list(BACKENDS)}")
+
+        mt5.__dict__.update({attr: getattr(module, attr) for attr in dir(module) if not attr.startswith('_')})
+        _backend_name = name
+        _backend = module
+        logger.info(f"MT5 backend: {name}")
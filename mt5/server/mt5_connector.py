@@ -3,14 +3,27 @@ MT5 Connector for MT5 Trading HTTP Server.
 Handles connection and communication with MetaTrader 5 terminal.
 """
 
-import MetaTrader5 as mt5
 import logging
+import threading
+import time
 from typing import Dict, Any, Optional, List, Tuple
 from datetime import datetime
 import pandas as pd
 from functools import wraps
-from utils.exceptions import MT5Error, ConnectionError
+import mt5_backend
+from mt5_executor import MT5Executor
+from symbol_cache import SymbolCache
+from utils.exceptions import MT5Error, ConnectionError, OutcomeUnknownError
 from utils.logger import log_mt5_connection, log_error_with_context
+from utils.tracing import tracer
+
+
+class ConnectionState:
+    """Terminal connection states maintained by the heartbeat."""
+    CONNECTED = 'connected'
+    DEGRADED = 'degraded'
+    RECONNECTING = 'reconnecting'
+    DOWN = 'down'
 
 
 def auto_reconnect(func):
@@ -20,15 +33,19 @@ def auto_reconnect(func):
     @wraps(func)
     def wrapper(self, *args, **kwargs):
         try:
-            # Check connection before attempting operation
+            # Check cached connection state before attempting operation
             if not self.is_connected():
                 self.logger.warning(f"MT5 not connected before {func.__name__}, attempting to reconnect...")
-                if not self.connect():
+                if not self.ensure_connected():
                     raise ConnectionError(f"MT5 connection failed before {func.__name__}")
 
             # First attempt
             return func(self, *args, **kwargs)
         except Exception as e:
+            # A write that may have filled must not be sent again
+            if isinstance(e, OutcomeUnknownError):
+                raise
+
             # Check if it's a connection-related error
             error_str = str(e).lower()
             if (not self.is_connected() or
@@ -36,12 +53,12 @@ def auto_reconnect(func):
                 "connection" in error_str or
                 isinstance(e, ConnectionError)):
 
-                self.logger.warning(f"MT5 connection lost during {func.__name__}, attempting to reconnect...")
+                self.logger.warning(f"MT5 connection lost during {func.__name__}, attempting to recover...")
 
-                # Attempt to reconnect
-                if self.connect():
-                    self.logger.info(f"MT5 reconnection successful, retrying {func.__name__}")
-                    # Retry the operation after successful reconnection
+                # Probe the terminal, reconnecting only if the probe fails
+                if self.recover(f"{func.__name__}: {e}"):
+                    self.logger.info(f"MT5 connection recovered, retrying {func.__name__}")
+                    # Retry the operation after successful recovery
                     return func(self, *args, **kwargs)
                 else:
                     self.logger.error(f"MT5 reconnection failed for {func.__name__}")
@@ -52,6 +69,7 @@ def auto_reconnect(func):
     return wrapper
 
 
+@tracer.trace_methods('mt5')
 class MT5Connector:
     """Manages connection to MetaTrader 5 terminal."""
     
@@ -64,8 +82,26 @@ class MT5Connector:
         """
         self.config = config
         self.logger = logging.getLogger('mt5_server.connector')
-        self.connected = False
+        self.state = ConnectionState.DOWN
         self.account_info = None
+
+        # Terminal package or simulator, loaded on the first MT5 call
+        mt5_backend.configure(config)
+
+        # All terminal calls go through the single-owner executor thread
+        self.executor = MT5Executor(config)
+        self.symbol_cache = SymbolCache(self.executor, config.get('symbol_cache', {}))
+
+        # Background heartbeat drives the connection state
+        heartbeat_config = config.get('heartbeat', {})
+        self.heartbeat_interval = heartbeat_config.get('interval', 5)
+        self.failure_threshold = heartbeat_config.get('failure_threshold', 3)
+        self._failures = 0
+        self._last_heartbeat = None
+        self._connect_lock = threading.Lock()
+        self._heartbeat_wake = threading.Event()
+        self._heartbeat_thread = None
+        self._heartbeat_running = False
         
     def connect(self) -> bool:
         """
@@ -74,22 +110,51 @@ class MT5Connector:
         Returns:
             True if connection successful, False otherwise
         """
+        with self._connect_lock:
+            return self._connect()
+
+    def ensure_connected(self) -> bool:
+        """
+        Reconnect only if the cached state says the terminal is unavailable.
+
+        Concurrent callers during an outage share a single reconnect attempt.
+
+        Returns:
+            True if connected, False otherwise
+        """
+        if self.is_connected():
+            return True
+
+        with self._connect_lock:
+            # Another thread may have reconnected while we waited
+            if self.is_connected():
+                return True
+            return self._connect()
+
+    def _connect(self) -> bool:
+        """Connect to MT5 terminal (caller holds the connect lock)."""
+        self._set_state(ConnectionState.RECONNECTING)
         try:
+            self.executor.start()
+
             # Initialize MT5 connection
             terminal_path = self.config.get('terminal_path', '')
             if terminal_path:
-                if not mt5.initialize(path=terminal_path):
+                if not self.executor.initialize(path=terminal_path):
                     raise MT5Error(f"Failed to initialize MT5 with path: {terminal_path}")
             else:
-                if not mt5.initialize():
+                if not self.executor.initialize():
                     raise MT5Error("Failed to initialize MT5")
 
             # 直接获取当前已登录账户的信息，不需要重新登录
-            self.account_info = mt5.account_info()
+            self.account_info = self.executor.account_info()
             if self.account_info is None:
                 raise MT5Error("Failed to get account information. Please ensure MT5 is logged in.")
 
-            self.connected = True
+            self._failures = 0
+            self.symbol_cache.invalidate()
+            self._set_state(ConnectionState.CONNECTED)
+            self.start_heartbeat()
 
             # 记录连接成功
             login = self.account_info.login
@@ -103,37 +168,139 @@ class MT5Connector:
             return True
             
         except Exception as e:
-            self.connected = False
+            self._set_state(ConnectionState.DOWN)
             log_error_with_context(self.logger, e, "MT5 connection failed")
             return False
     
     def disconnect(self) -> None:
         """Disconnect from MT5 terminal."""
+        self.stop_heartbeat()
         try:
-            if self.connected:
-                mt5.shutdown()
-                self.connected = False
+            if self.state != ConnectionState.DOWN:
+                self.executor.shutdown()
+                self._set_state(ConnectionState.DOWN)
                 log_mt5_connection(self.logger, "disconnected")
         except Exception as e:
             log_error_with_context(self.logger, e, "MT5 disconnection error")
+        finally:
+            self.executor.stop()
     
     def is_connected(self) -> bool:
         """
         Check if connected to MT5.
+
+        Reads the state maintained by the heartbeat; no terminal call is made.
         
         Returns:
             True if connected, False otherwise
         """
-        if not self.connected:
-            return False
-        
+        return self.state in (ConnectionState.CONNECTED, ConnectionState.DEGRADED)
+
+    def report_failure(self, reason: str) -> None:
+        """
+        Report a terminal failure observed outside the heartbeat (e.g. order_send).
+
+        Marks the connection degraded and wakes the heartbeat for an immediate probe.
+
+        Args:
+            reason: Failure description
+        """
+        self.logger.warning(f"MT5 failure reported: {reason}")
+        if self.state == ConnectionState.CONNECTED:
+            self._set_state(ConnectionState.DEGRADED)
+        self._heartbeat_wake.set()
+
+    def recover(self, reason: str) -> bool:
+        """
+        Probe the terminal after a failure and reconnect only if the probe fails.
+
+        Args:
+            reason: Failure description
+
+        Returns:
+            True if the connection is usable afterwards
+        """
+        self.logger.warning(f"MT5 recovery requested: {reason}")
+        if self.is_connected() and self._probe():
+            return True
+
+        self._set_state(ConnectionState.DOWN)
+        return self.ensure_connected()
+
+    def get_connection_status(self) -> Dict[str, Any]:
+        """
+        Get connection state details.
+
+        Returns:
+            Connection status dictionary
+        """
+        return {
+            'state': self.state,
+            'consecutive_failures': self._failures,
+            'heartbeat_interval': self.heartbeat_interval,
+            'last_heartbeat': (datetime.fromtimestamp(self._last_heartbeat).isoformat()
+                               if self._last_heartbeat else None)
+        }
+
+    def start_heartbeat(self) -> None:
+        """Start the background heartbeat thread if it is not running."""
+        if self._heartbeat_running:
+            return
+        self._heartbeat_running = True
+        self._heartbeat_thread = threading.Thread(target=self._heartbeat_loop,
+                                                  name='mt5-heartbeat', daemon=True)
+        self._heartbeat_thread.start()
+
+    def stop_heartbeat(self) -> None:
+        """Stop the background heartbeat thread."""
+        self._heartbeat_running = False
+        self._heartbeat_wake.set()
+        thread = self._heartbeat_thread
+        if thread and thread is not threading.current_thread():
+            thread.join(timeout=5)
+        self._heartbeat_thread = None
+
+    def _heartbeat_loop(self) -> None:
+        """Probe the terminal periodically, or immediately when a failure is reported."""
+        while self._heartbeat_running:
+            self._heartbeat_wake.wait(self.heartbeat_interval)
+            self._heartbeat_wake.clear()
+            if not self._heartbeat_running:
+                return
+
+            try:
+                if self.is_connected() and not self._probe():
+                    if self._failures >= self.failure_threshold:
+                        self._set_state(ConnectionState.DOWN)
+
+                if self.state == ConnectionState.DOWN:
+                    self.ensure_connected()
+            except Exception as e:
+                log_error_with_context(self.logger, e, "MT5 heartbeat error")
+
+    def _probe(self) -> bool:
+        """Check the terminal with a single account_info call and update the state."""
+        self._last_heartbeat = time.time()
         try:
-            # Test connection by getting account info
-            account_info = mt5.account_info()
-            return account_info is not None
-        except:
-            self.connected = False
-            return False
+            account_info = self.executor.account_info()
+        except Exception:
+            account_info = None
+
+        if account_info is not None:
+            self.account_info = account_info
+            self._failures = 0
+            self._set_state(ConnectionState.CONNECTED)
+            return True
+
+        self._failures += 1
+        self._set_state(ConnectionState.DEGRADED)
+        return False
+
+    def _set_state(self, state: str) -> None:
+        """Transition the connection state, logging changes."""
+        if self.state != state:
+            self.logger.info(f"MT5 connection state: {self.state} -> {state}")
+            self.state = state
     
     @auto_reconnect
     def get_account_info(self) -> Optional[Dict[str, Any]]:
@@ -147,7 +314,7 @@ class MT5Connector:
             if not self.is_connected():
                 raise ConnectionError("Not connected to MT5")
             
-            account_info = mt5.account_info()
+            account_info = self.executor.account_info()
             if account_info is None:
                 return None
             
@@ -187,32 +354,84 @@ class MT5Connector:
             if not self.is_connected():
                 raise ConnectionError("Not connected to MT5")
             
-            symbol_info = mt5.symbol_info(symbol)
-            if symbol_info is None:
+            # Static contract data and quote come from separately-aged caches
+            static = self.symbol_cache.get_static(symbol)
+            if static is None:
                 return None
-            
-            return {
-                'name': symbol_info.name,
-                'description': symbol_info.description,
-                'currency_base': symbol_info.currency_base,
-                'currency_profit': symbol_info.currency_profit,
-                'currency_margin': symbol_info.currency_margin,
-                'digits': symbol_info.digits,
-                'point': symbol_info.point,
-                'spread': symbol_info.spread,
-                'volume_min': symbol_info.volume_min,
-                'volume_max': symbol_info.volume_max,
-                'volume_step': symbol_info.volume_step,
-                'trade_mode': symbol_info.trade_mode,
-                'bid': symbol_info.bid,
-                'ask': symbol_info.ask,
-                'time': symbol_info.time
-            }
+
+            quote = self.symbol_cache.get_quote(symbol)
+            if quote is None:
+                return None
+
+            symbol_info = dict(static)
+            symbol_info.update(quote)
+            symbol_info['spread'] = round((quote['ask'] - quote['bid']) / static['point']) if static['point'] else 0
+            return symbol_info
             
         except Exception as e:
             log_error_with_context(self.logger, e, f"Failed to get symbol info for {symbol}")
             return None
     
+    @auto_reconnect
+    def get_symbol_static(self, symbol: str) -> Optional[Dict[str, Any]]:
+        """
+        Get cached static contract data for a symbol.
+
+        Args:
+            symbol: Trading symbol
+
+        Returns:
+            Static symbol data (digits, volume limits, filling mode, ...) or None if failed
+        """
+        try:
+            if not self.is_connected():
+                raise ConnectionError("Not connected to MT5")
+
+            return self.symbol_cache.get_static(symbol)
+
+        except Exception as e:
+            log_error_with_context(self.logger, e, f"Failed to get static symbol info for {symbol}")
+            return None
+
+    @auto_reconnect
+    def get_quote(self, symbol: str) -> Optional[Dict[str, Any]]:
+        """
+        Get the latest quote for a symbol within the cache freshness bound.
+
+        Args:
+            symbol: Trading symbol
+
+        Returns:
+            Quote dictionary (bid, ask, time, time_msc) or None if failed
+        """
+        try:
+            if not self.is_connected():
+                raise ConnectionError("Not connected to MT5")
+
+            return self.symbol_cache.get_quote(symbol)
+
+        except Exception as e:
+            log_error_with_context(self.logger, e, f"Failed to get quote for {symbol}")
+            return None
+
+    def attach_tick_streamer(self, tick_streamer) -> None:
+        """
+        Use a background tick streamer as the first source for quotes.
+
+        Args:
+            tick_streamer: TickStreamer instance
+        """
+        self.symbol_cache.quote_source = tick_streamer
+
+    def invalidate_symbol_cache(self, symbol: str = None) -> None:
+        """
+        Invalidate cached symbol data.
+
+        Args:
+            symbol: Symbol to invalidate (optional, if None invalidates all)
+        """
+        self.symbol_cache.invalidate(symbol)
+
     @auto_reconnect
     def get_positions(self, symbol: str = None) -> List[Dict[str, Any]]:
         """
@@ -229,9 +448,9 @@ class MT5Connector:
                 raise ConnectionError("Not connected to MT5")
             
             if symbol:
-                positions = mt5.positions_get(symbol=symbol)
+                positions = self.executor.positions_get(symbol=symbol)
             else:
-                positions = mt5.positions_get()
+                positions = self.executor.positions_get()
             
             if positions is None:
                 return []
@@ -278,9 +497,9 @@ class MT5Connector:
                 raise ConnectionError("Not connected to MT5")
             
             if symbol:
-                orders = mt5.orders_get(symbol=symbol)
+                orders = self.executor.orders_get(symbol=symbol)
             else:
-                orders = mt5.orders_get()
+                orders = self.executor.orders_get()
             
             if orders is None:
                 return []
@@ -321,9 +540,9 @@ class MT5Connector:
                 return None
             
             # Get latest tick to get server time
-            symbols = mt5.symbols_get()
+            symbols = self.executor.symbols_get()
             if symbols and len(symbols) > 0:
-                tick = mt5.symbol_info_tick(symbols[0].name)
+                tick = self.executor.symbol_info_tick(symbols[0].name)
                 if tick:
                     return datetime.fromtimestamp(tick.time)
             
@@ -348,12 +567,12 @@ class MT5Connector:
             if not self.is_connected():
                 return False
             
-            symbol_info = mt5.symbol_info(symbol)
-            if symbol_info is None:
+            static = self.symbol_cache.get_static(symbol)
+            if static is None:
                 return False
             
             # Check if symbol is visible and tradeable
-            return symbol_info.visible and symbol_info.trade_mode != 0
+            return static['visible'] and static['trade_mode'] != 0
             
         except Exception as e:
             log_error_with_context(self.logger, e, f"Failed to check symbol availability for {symbol}")
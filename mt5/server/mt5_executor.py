@@ -0,0 +1,427 @@
+"""
+MT5 Executor for MT5 Trading HTTP Server.
+Owns the MetaTrader 5 terminal session on a single thread and serves typed
+commands from a queue, so HTTP concurrency never reaches terminal IPC.
+"""
+
+from mt5_backend import mt5
+import logging
+import queue
+import threading
+from contextlib import contextmanager
+from concurrent.futures import Future, TimeoutError as FutureTimeoutError
+from time import perf_counter_ns
+from typing import Dict, Any, Optional, List, Tuple
+from utils.exceptions import MT5Error, OutcomeUnknownError
+from utils.ipc_accounting import IPCScope, IPCStats, current_scope, begin_scope, end_scope
+from utils.tracing import tracer
+
+
+class MT5Command:
+    """A single MT5 API call queued for the executor thread."""
+
+    __slots__ = ('name', 'args', 'kwargs', 'future', 'last_error', 'scope', 'queued')
+
+    def __init__(self, name: str, args: tuple, kwargs: Dict[str, Any], scope: IPCScope = None):
+        self.name = name
+        self.args = args
+        self.kwargs = kwargs
+        self.future = Future()
+        self.last_error = None
+        self.scope = scope
+        self.queued = perf_counter_ns()
+
+    @property
+    def read_only(self) -> bool:
+        """Whether the command only reads terminal state."""
+        return self.name in MT5Executor.READ_COMMANDS
+
+    @property
+    def key(self) -> Tuple:
+        """Identity used to share one terminal call between identical reads."""
+        return (self.name, self.args, tuple(sorted(self.kwargs.items())))
+
+
+class MT5Executor:
+    """
+    Single-owner executor for MetaTrader5 module calls.
+
+    Read-only commands that arrive in the same drain cycle are batched:
+    identical reads share one terminal call. Writes are executed strictly in
+    arrival order, and any read queued after a write observes its effect.
+
+    A command whose caller timed out before it reached the terminal is
+    cancelled and never executed, so a retry cannot duplicate it.
+
+    Every terminal call is timed and attributed to the IPC scope (request,
+    job or order) of the thread that queued it, and counted per command in
+    aggregate statistics.
+    """
+
+    READ_COMMANDS = frozenset({
+        'account_info', 'terminal_info', 'symbol_info', 'symbol_info_tick', 'symbols_get',
+        'positions_get', 'orders_get', 'history_deals_get', 'history_orders_get',
+        'copy_ticks_from', 'last_error'
+    })
+
+    WRITE_COMMANDS = frozenset({
+        'initialize', 'shutdown', 'login', 'symbol_select', 'order_check', 'order_send'
+    })
+
+    def __init__(self, config: Dict[str, Any] = None):
+        """
+        Initialize MT5 executor.
+
+        Args:
+            config: MT5 configuration dictionary (optional)
+        """
+        config = config or {}
+        self.logger = logging.getLogger('mt5_server.executor')
+        self.timeout = config.get('timeout', {}).get('trade', 10)
+
+        accounting = config.get('ipc_accounting', {})
+        self.accounting = accounting.get('enabled', True)
+        self.budgets: Dict[str, int] = dict(accounting.get('budgets', {}))
+        self.max_details = accounting.get('max_details', 64)
+        self._ipc = IPCStats()
+
+        self._queue: 'queue.Queue[Optional[MT5Command]]' = queue.Queue()
+        self._thread = None
+        self._lock = threading.Lock()
+        self._local = threading.local()
+        self._stats = {'commands': 0, 'terminal_calls': 0, 'batched_reads': 0, 'max_batch': 0,
+                       'cancelled': 0, 'unknown_outcomes': 0}
+
+    @property
+    def running(self) -> bool:
+        """Whether the executor thread is alive."""
+        return self._thread is not None and self._thread.is_alive()
+
+    def start(self) -> None:
+        """Start the executor thread if it is not already running."""
+        with self._lock:
+            if self.running:
+                return
+            self._thread = threading.Thread(target=self._run, name='mt5-executor', daemon=True)
+            self._thread.start()
+        self.logger.info("MT5 executor started")
+
+    def stop(self) -> None:
+        """Stop the executor thread after draining queued commands."""
+        with self._lock:
+            thread = self._thread
+            if thread is None:
+                return
+            self._queue.put(None)
+            self._thread = None
+
+        if thread is not threading.current_thread():
+            thread.join(timeout=5)
+        self.logger.info("MT5 executor stopped")
+
+    def submit(self, name: str, *args, **kwargs) -> Future:
+        """
+        Queue an MT5 call for the executor thread.
+
+        Args:
+            name: MetaTrader5 function name
+            *args: Positional arguments
+            **kwargs: Keyword arguments
+
+        Returns:
+            Future resolving to the call result
+
+        Raises:
+            MT5Error: If the command is unknown or the executor is not running
+        """
+        return self._enqueue(name, args, kwargs).future
+
+    def call(self, name: str, *args, **kwargs) -> Any:
+        """
+        Execute an MT5 call on the executor thread and wait for its result.
+
+        Args:
+            name: MetaTrader5 function name
+            *args: Positional arguments
+            **kwargs: Keyword arguments
+
+        Returns:
+            Call result
+
+        Raises:
+            MT5Error: If the call timed out before it was executed; it is cancelled
+            OutcomeUnknownError: If a write was already executing when the timeout expired
+        """
+        command = self._enqueue(name, args, kwargs)
+        try:
+            result = command.future.result(timeout=self.timeout)
+        except FutureTimeoutError:
+            if command.future.cancel():
+                raise MT5Error(f"MT5 command {name} timed out after {self.timeout}s in queue, cancelled")
+            if not command.read_only:
+                # The terminal may still fill it; retrying could duplicate the trade
+                self._stats['unknown_outcomes'] += 1
+                raise OutcomeUnknownError(f"MT5 command {name} still executing after {self.timeout}s, "
+                                          f"outcome unknown")
+            raise MT5Error(f"MT5 command {name} timed out after {self.timeout}s")
+
+        if not command.read_only:
+            self._local.last_error = command.last_error
+        return result
+
+    def _enqueue(self, name: str, args: tuple, kwargs: Dict[str, Any]) -> MT5Command:
+        """Validate and queue a command."""
+        if name not in self.READ_COMMANDS and name not in self.WRITE_COMMANDS:
+            raise MT5Error(f"Unsupported MT5 command: {name}")
+        if not self.running:
+            raise MT5Error(f"MT5 executor is not running, cannot execute {name}")
+
+        command = MT5Command(name, args, kwargs, current_scope() if self.accounting else None)
+        self._queue.put(command)
+        return command
+
+    # IPC accounting
+
+    def open_scope(self, name: str) -> IPCScope:
+        """
+        Start attributing this thread's terminal calls to a new scope.
+
+        Args:
+            name: Scope name; a budget configured under the same name applies
+
+        Returns:
+            The scope, to be passed to close_scope
+        """
+        return begin_scope(name, self.budgets.get(name), self.max_details)
+
+    def close_scope(self, scope: IPCScope) -> None:
+        """
+        Close a scope once its calls have completed and count it in the aggregates.
+
+        Args:
+            scope: Scope returned by open_scope
+        """
+        end_scope(scope)
+        if not self.accounting:
+            return
+        self._ipc.record_scope(scope)
+        if scope.over_budget:
+            self.logger.warning(f"IPC budget exceeded for {scope.name}: "
+                                f"{scope.terminal_calls} terminal calls (budget {scope.budget}), "
+                                f"by command {scope.by_command}")
+
+    @contextmanager
+    def scope(self, name: str):
+        """
+        Attribute terminal calls made inside the block to a new scope.
+
+        Args:
+            name: Scope name; a budget configured under the same name applies
+
+        Yields:
+            The scope
+        """
+        scope = self.open_scope(name)
+        try:
+            yield scope
+        finally:
+            self.close_scope(scope)
+
+    # Typed commands
+
+    def initialize(self, **kwargs) -> bool:
+        """Initialize the terminal connection."""
+        return self.call('initialize', **kwargs)
+
+    def shutdown(self) -> None:
+        """Shut down the terminal connection."""
+        return self.call('shutdown')
+
+    def account_info(self):
+        """Get current account information."""
+        return self.call('account_info')
+
+    def symbol_info(self, symbol: str):
+        """Get symbol specification."""
+        return self.call('symbol_info', symbol)
+
+    def symbol_info_tick(self, symbol: str):
+        """Get latest tick for a symbol."""
+        return self.call('symbol_info_tick', symbol)
+
+    def symbols_get(self):
+        """Get all symbols."""
+        return self.call('symbols_get')
+
+    def positions_get(self, **kwargs):
+        """Get open positions, optionally filtered by symbol or ticket."""
+        return self.call('positions_get', **kwargs)
+
+    def orders_get(self, **kwargs):
+        """Get pending orders, optionally filtered by symbol or ticket."""
+        return self.call('orders_get', **kwargs)
+
+    def order_send(self, request: Dict[str, Any]):
+        """Send a trade request."""
+        return self.call('order_send', request)
+
+    def last_error(self) -> Tuple[int, str]:
+        """
+        Get the error of this thread's most recent failed write.
+
+        Falls back to querying the terminal when no write error was captured.
+
+        Returns:
+            (code, description) tuple
+        """
+        error = getattr(self._local, 'last_error', None)
+        if error is not None:
+            return error
+        return self.call('last_error')
+
+    def get_stats(self) -> Dict[str, Any]:
+        """
+        Get executor statistics.
+
+        Returns:
+            Statistics dictionary
+        """
+        stats = dict(self._stats)
+        stats['queue_depth'] = self._queue.qsize()
+        stats['running'] = self.running
+        if self.accounting:
+            stats['ipc'] = self._ipc.to_dict()
+        return stats
+
+    def _run(self) -> None:
+        """Executor loop: drain the queue and execute commands in batches."""
+        while True:
+            command = self._queue.get()
+            batch = [command]
+            while True:
+                try:
+                    batch.append(self._queue.get_nowait())
+                except queue.Empty:
+                    break
+
+            stopping = False
+            commands = []
+            for item in batch:
+                if item is None:
+                    stopping = True
+                else:
+                    commands.append(item)
+
+            if commands:
+                self._execute_batch(commands)
+            if stopping:
+                return
+
+    def _execute_batch(self, commands: List[MT5Command]) -> None:
+        """Execute a drained batch, sharing identical reads between writes."""
+        self._stats['commands'] += len(commands)
+        self._stats['max_batch'] = max(self._stats['max_batch'], len(commands))
+
+        reads: Dict[Tuple, List[MT5Command]] = {}
+        for command in commands:
+            if command.read_only:
+                try:
+                    reads.setdefault(command.key, []).append(command)
+                except TypeError:
+                    # Unhashable arguments, execute on its own
+                    self._execute_reads([command])
+                continue
+
+            # A write ends the current read segment
+            for group in reads.values():
+                self._execute_reads(group)
+            reads = {}
+            self._execute_write(command)
+
+        for group in reads.values():
+            self._execute_reads(group)
+
+    def _execute_reads(self, group: List[MT5Command]) -> None:
+        """Execute one read and resolve every identical command with its result."""
+        group = self._claim(group)
+        if not group:
+            return
+        command = group[0]
+        self._stats['terminal_calls'] += 1
+        self._stats['batched_reads'] += len(group) - 1
+        started = perf_counter_ns()
+        try:
+            result = getattr(mt5, command.name)(*command.args, **command.kwargs)
+        except Exception as e:
+            self._account(group, started, e)
+            for item in group:
+                item.future.set_exception(e)
+            return
+
+        self._account(group, started, result)
+        for item in group:
+            item.future.set_result(result)
+
+    def _execute_write(self, command: MT5Command) -> None:
+        """Execute a write and capture the terminal error it produced, if any."""
+        if not self._claim([command]):
+            return
+        self._stats['terminal_calls'] += 1
+        started = perf_counter_ns()
+        try:
+            result = getattr(mt5, command.name)(*command.args, **command.kwargs)
+            self._account([command], started, result)
+            if (result is None or result is False) and command.name != 'shutdown':
+                # Read the error before any other command can overwrite it
+                self._stats['terminal_calls'] += 1
+                started = perf_counter_ns()
+                command.last_error = mt5.last_error()
+                self._account([command], started, command.last_error, 'last_error')
+            command.future.set_result(result)
+        except Exception as e:
+            self._account([command], started, e)
+            command.future.set_exception(e)
+
+    def _claim(self, group: List[MT5Command]) -> List[MT5Command]:
+        """Mark commands as running, dropping those cancelled by a timed-out caller."""
+        claimed = [command for command in group if command.future.set_running_or_notify_cancel()]
+        self._stats['cancelled'] += len(group) - len(claimed)
+        return claimed
+
+    def _account(self, group: List[MT5Command], started: int, result: Any, name: str = None) -> None:
+        """Attribute one terminal call to the scopes of the commands it served."""
+        if not self.accounting:
+            return
+        finished = perf_counter_ns()
+        name = name or group[0].name
+        ipc_ms = (finished - started) / 1e6
+        failed = result is None or result is False or isinstance(result, Exception)
+
+        self._ipc.record_command(name, len(group), ipc_ms, failed)
+        tracer.record(f"ipc.{name}", ipc_ms)
+
+        summary = _summarize(result)
+        for index, item in enumerate(group):
+            if item.scope is not None:
+                # Only the first command of a shared read pays for the round trip
+                item.scope.add(name, 0 if index else 1, ipc_ms,
+                               (started - item.queued) / 1e6, summary, failed)
+
+
+def _summarize(result: Any) -> str:
+    """Short description of a terminal call result for IPC accounting."""
+    if isinstance(result, Exception):
+        return f"error: {type(result).__name__}: {result}"
+    if result is None:
+        return 'none'
+    if result is False or result is True:
+        return str(result).lower()
+    retcode = getattr(result, 'retcode', None)
+    if retcode is not None:
+        return f"retcode {retcode}"
+    if type(result) is tuple:
+        if len(result) == 2 and isinstance(result[0], int) and isinstance(result[1], str):
+            # last_error() -> (code, description)
+            return f"{result[0]}: {result[1]}"
+        return f"{len(result)} items"
+    return 'ok'
@@ -0,0 +1,822 @@
+"""
+MT5 Simulator for MT5 Trading HTTP Server.
+In-process stand-in for the MetaTrader5 module with a position ledger, a
+margin model and configurable IPC latency, requotes and disconnects, so the
+server can be benchmarked and load-tested without a Windows terminal.
+"""
+
+import fnmatch
+import logging
+import math
+import random
+import threading
+import time
+from collections import namedtuple
+from datetime import datetime
+from functools import wraps
+from typing import Dict, Any, Optional, List, Tuple
+
+
+# Result records, field names as in the MetaTrader5 package (subsets where the real record is wider)
+AccountInfo = namedtuple('AccountInfo', [
+    'login', 'trade_mode', 'leverage', 'limit_orders', 'margin_so_mode', 'trade_allowed', 'trade_expert',
+    'margin_mode', 'currency_digits', 'fifo_close', 'balance', 'credit', 'profit', 'equity', 'margin',
+    'margin_free', 'margin_level', 'margin_so_call', 'margin_so_so', 'margin_initial', 'margin_maintenance',
+    'assets', 'liabilities', 'commission_blocked', 'name', 'server', 'currency', 'company'
+])
+TerminalInfo = namedtuple('TerminalInfo', [
+    'connected', 'trade_allowed', 'tradeapi_disabled', 'build', 'ping_last', 'company', 'name', 'path'
+])
+SymbolInfo = namedtuple('SymbolInfo', [
+    'name', 'description', 'path', 'currency_base', 'currency_profit', 'currency_margin', 'digits', 'point',
+    'spread', 'trade_contract_size', 'trade_tick_size', 'trade_stops_level', 'volume_min', 'volume_max',
+    'volume_step', 'trade_mode', 'filling_mode', 'order_mode', 'select', 'visible', 'bid', 'ask', 'time'
+])
+Tick = namedtuple('Tick', ['time', 'bid', 'ask', 'last', 'volume', 'time_msc', 'flags', 'volume_real'])
+TradePosition = namedtuple('TradePosition', [
+    'ticket', 'time', 'time_msc', 'time_update', 'time_update_msc', 'type', 'magic', 'identifier', 'reason',
+    'volume', 'price_open', 'sl', 'tp', 'price_current', 'swap', 'profit', 'symbol', 'comment', 'external_id'
+])
+TradeOrder = namedtuple('TradeOrder', [
+    'ticket', 'time_setup', 'time_setup_msc', 'time_done', 'time_done_msc', 'time_expiration', 'type',
+    'type_time', 'type_filling', 'state', 'magic', 'position_id', 'position_by_id', 'reason',
+    'volume_initial', 'volume_current', 'price_open', 'sl', 'tp', 'price_current', 'price_stoplimit',
+    'symbol', 'comment', 'external_id'
+])
+TradeDeal = namedtuple('TradeDeal', [
+    'ticket', 'order', 'time', 'time_msc', 'type', 'entry', 'magic', 'position_id', 'reason', 'volume',
+    'price', 'commission', 'swap', 'profit', 'fee', 'symbol', 'comment', 'external_id'
+])
+TradeRequest = namedtuple('TradeRequest', [
+    'action', 'magic', 'order', 'symbol', 'volume', 'price', 'stoplimit', 'sl', 'tp', 'deviation', 'type',
+    'type_filling', 'type_time', 'expiration', 'comment', 'position', 'position_by'
+])
+OrderSendResult = namedtuple('OrderSendResult', [
+    'retcode', 'deal', 'order', 'volume', 'price', 'bid', 'ask', 'comment', 'request_id',
+    'retcode_external', 'request'
+])
+OrderCheckResult = namedtuple('OrderCheckResult', [
+    'retcode', 'balance', 'equity', 'profit', 'margin', 'margin_free', 'margin_level', 'comment', 'request'
+])
+
+
+# Instruments available when the configuration lists none
+DEFAULT_SYMBOLS = {
+    'EURUSD': {'bid': 1.085, 'digits': 5, 'spread': 10, 'contract_size': 100000, 'volatility': 2},
+    'GBPUSD': {'bid': 1.27, 'digits': 5, 'spread': 12, 'contract_size': 100000, 'volatility': 2},
+    'USDJPY': {'bid': 150.0, 'digits': 3, 'spread': 12, 'contract_size': 100000, 'volatility': 2},
+    'XAUUSD': {'bid': 2650.0, 'digits': 2, 'spread': 20, 'contract_size': 100, 'volatility': 10},
+}
+
+DEFAULT_LATENCY = {
+    'default': {'distribution': 'lognormal', 'median_ms': 0.2, 'sigma': 0.5},
+    'order_send': {'distribution': 'lognormal', 'median_ms': 25.0, 'sigma': 0.4},
+}
+
+LATENCY_DISTRIBUTIONS = ('fixed', 'uniform', 'normal', 'lognormal', 'exponential')
+
+
+class LatencyModel:
+    """Samples simulated IPC latency in milliseconds from a configured distribution."""
+
+    def __init__(self, spec: Dict[str, Any], rng: random.Random):
+        """
+        Initialize latency model.
+
+        Args:
+            spec: Distribution specification, e.g. {'distribution': 'lognormal', 'median_ms': 25, 'sigma': 0.4}
+            rng: Random stream dedicated to this model
+        """
+        self.spec = spec
+        self.distribution = spec.get('distribution', 'fixed')
+        self.rng = rng
+
+    def sample(self) -> float:
+        """Draw one latency in milliseconds."""
+        spec = self.spec
+        if self.distribution == 'fixed':
+            return spec.get('value_ms', 0.0)
+        if self.distribution == 'uniform':
+            return self.rng.uniform(spec.get('min_ms', 0.0), spec.get('max_ms', 0.0))
+        if self.distribution == 'normal':
+            return max(0.0, self.rng.gauss(spec.get('mean_ms', 0.0), spec.get('stddev_ms', 0.0)))
+        if self.distribution == 'lognormal':
+            return self.rng.lognormvariate(math.log(spec.get('median_ms', 1.0)), spec.get('sigma', 0.0))
+        if self.distribution == 'exponential':
+            mean = spec.get('mean_ms', 0.0)
+            return self.rng.expovariate(1.0 / mean) if mean > 0 else 0.0
+        raise ValueError(f"Unknown latency distribution: {self.distribution}")
+
+
+def ipc_call(func):
+    """Run a simulator method as a terminal call: connection check, latency, last error."""
+    name = func.__name__
+
+    @wraps(func)
+    def wrapper(self, *args, **kwargs):
+        return self._call(name, func, args, kwargs)
+    return wrapper
+
+
+class SimulatedMT5:
+    """
+    Simulated MetaTrader5 terminal.
+
+    Exposes the subset of the MetaTrader5 API the server uses, with the
+    package's constants and result field names. Calls are serialized like the
+    terminal's IPC channel and each sleeps for a latency drawn from the
+    function's distribution.
+
+    Prices follow a per-symbol random walk, one step per tick interval.
+    Market orders fill at the current bid/ask against a hedging or netting
+    ledger. Margin is volume * contract size / leverage per symbol (the
+    larger side on hedging accounts), converted to the account currency at
+    the current price; profit in a quote currency other than the account
+    currency is converted only when the base currency is the account
+    currency (USDJPY on a USD account), cross rates are not modelled. Any
+    call may start a simulated
+    disconnect: calls fail with "No IPC connection" until the outage has
+    passed and initialize() succeeds again.
+
+    Every random draw comes from a stream seeded from the configured seed and
+    the stream's purpose (latency per function, price per symbol, events), so
+    a run with the same seed and the same call sequence is reproducible.
+    Pending orders, stop-loss/take-profit triggering, swaps and commissions
+    are not simulated.
+    """
+
+    # Trade request actions
+    TRADE_ACTION_DEAL = 1
+    TRADE_ACTION_PENDING = 5
+    TRADE_ACTION_SLTP = 6
+    TRADE_ACTION_MODIFY = 7
+    TRADE_ACTION_REMOVE = 8
+    TRADE_ACTION_CLOSE_BY = 10
+
+    # Order types, filling and expiration
+    ORDER_TYPE_BUY = 0
+    ORDER_TYPE_SELL = 1
+    ORDER_FILLING_FOK = 0
+    ORDER_FILLING_IOC = 1
+    ORDER_FILLING_RETURN = 2
+    ORDER_TIME_GTC = 0
+    ORDER_STATE_FILLED = 4
+
+    # Positions and deals
+    POSITION_TYPE_BUY = 0
+    POSITION_TYPE_SELL = 1
+    DEAL_TYPE_BUY = 0
+    DEAL_TYPE_SELL = 1
+    DEAL_ENTRY_IN = 0
+    DEAL_ENTRY_OUT = 1
+    DEAL_ENTRY_INOUT = 2
+    DEAL_ENTRY_OUT_BY = 3
+
+    # Symbol properties
+    SYMBOL_FILLING_FOK = 1
+    SYMBOL_FILLING_IOC = 2
+    SYMBOL_ORDER_MARKET = 1
+    SYMBOL_ORDER_LIMIT = 2
+    SYMBOL_ORDER_STOP = 4
+    SYMBOL_ORDER_STOP_LIMIT = 8
+    SYMBOL_ORDER_SL = 16
+    SYMBOL_ORDER_TP = 32
+    SYMBOL_ORDER_CLOSEBY = 64
+    SYMBOL_TRADE_MODE_DISABLED = 0
+    SYMBOL_TRADE_MODE_FULL = 4
+
+    # Account properties
+    ACCOUNT_TRADE_MODE_DEMO = 0
+    ACCOUNT_TRADE_MODE_CONTEST = 1
+    ACCOUNT_TRADE_MODE_REAL = 2
+    ACCOUNT_MARGIN_MODE_RETAIL_NETTING = 0
+    ACCOUNT_MARGIN_MODE_EXCHANGE = 1
+    ACCOUNT_MARGIN_MODE_RETAIL_HEDGING = 2
+
+    # Trade server return codes
+    TRADE_RETCODE_REQUOTE = 10004
+    TRADE_RETCODE_REJECT = 10006
+    TRADE_RETCODE_DONE = 10009
+    TRADE_RETCODE_INVALID = 10013
+    TRADE_RETCODE_INVALID_VOLUME = 10014
+    TRADE_RETCODE_INVALID_PRICE = 10015
+    TRADE_RETCODE_TRADE_DISABLED = 10017
+    TRADE_RETCODE_NO_MONEY = 10019
+    TRADE_RETCODE_INVALID_FILL = 10030
+    TRADE_RETCODE_CONNECTION = 10031
+    TRADE_RETCODE_POSITION_CLOSED = 10036
+
+    # last_error() codes
+    RES_S_OK = 1
+    RES_E_FAIL = -1
+    RES_E_INVALID_PARAMS = -2
+    RES_E_NOT_FOUND = -4
+    RES_E_INTERNAL_FAIL_INIT = -10003
+    RES_E_INTERNAL_FAIL_CONNECT = -10004
+
+    MARGIN_MODES = {'hedging': ACCOUNT_MARGIN_MODE_RETAIL_HEDGING, 'netting': ACCOUNT_MARGIN_MODE_RETAIL_NETTING}
+
+    def __init__(self, config: Dict[str, Any] = None):
+        """
+        Initialize simulator.
+
+        Args:
+            config: Simulator configuration dictionary (optional)
+        """
+        config = config or {}
+        self.logger = logging.getLogger('mt5_server.simulator')
+        self._seed = config.get('seed', 0)
+        self._tick_interval = config.get('tick_interval_ms', 100) / 1000.0
+        self._execution = config.get('execution', 'market')
+        self._requote_probability = config.get('requote_probability', 0.0)
+        self._disconnect_probability = config.get('disconnect_probability', 0.0)
+        self._disconnect_ms = config.get('disconnect_ms', 2000)
+
+        account = config.get('account', {})
+        self._login = account.get('login', 10000001)
+        self._balance = float(account.get('balance', 10000.0))
+        self._leverage = account.get('leverage', 100)
+        self._currency = account.get('currency', 'USD')
+        self._margin_mode = self.MARGIN_MODES[account.get('margin_mode', 'hedging')]
+        self._server = account.get('server', 'Simulator-Demo')
+
+        latency = dict(DEFAULT_LATENCY)
+        latency.update(config.get('latency', {}))
+        self._latency_specs = latency
+        self._latency: Dict[str, LatencyModel] = {}
+
+        self._symbols: Dict[str, Dict[str, Any]] = {}
+        for name, spec in (config.get('symbols') or DEFAULT_SYMBOLS).items():
+            self._add_symbol(name.upper(), spec)
+
+        self._events = random.Random(f"{self._seed}:events")
+        self._lock = threading.RLock()
+        self._initialized = False
+        self._down_until = 0.0
+        self._last_error: Tuple[int, str] = (self.RES_S_OK, 'Success')
+        self._positions: Dict[int, Dict[str, Any]] = {}
+        self._deals: List[TradeDeal] = []
+        self._next_order = 1000001
+        self._next_deal = 2000001
+        self._next_request = 1
+        self._stats = {'calls': {}, 'requotes': 0, 'disconnects': 0, 'orders': 0, 'rejected': 0}
+
+    # Terminal connection
+
+    @ipc_call
+    def initialize(self, path: str = None, **kwargs) -> bool:
+        """Connect to the simulated terminal; fails while a disconnect is in progress."""
+        if time.monotonic() < self._down_until:
+            return self._fail(self.RES_E_INTERNAL_FAIL_INIT, 'IPC initialize failed, terminal not connected', False)
+        self._initialized = True
+        return True
+
+    @ipc_call
+    def login(self, login: int = None, password: str = None, server: str = None, **kwargs) -> bool:
+        """Accept any credentials."""
+        return True
+
+    @ipc_call
+    def shutdown(self) -> None:
+        """Close the connection to the simulated terminal."""
+        self._initialized = False
+
+    def last_error(self) -> Tuple[int, str]:
+        """Get the error of the last call, as (code, description); answered locally, like the package."""
+        with self._lock:
+            return self._last_error
+
+    def version(self) -> Tuple[int, int, str]:
+        """Get the simulated terminal version."""
+        return (500, 4000, '1 Jan 2025')
+
+    @ipc_call
+    def terminal_info(self) -> TerminalInfo:
+        """Get terminal state."""
+        return TerminalInfo(True, True, False, 4000, 0, 'MT5 Simulator', 'MetaTrader 5 Simulator', '')
+
+    @ipc_call
+    def account_info(self) -> AccountInfo:
+        """Get account state with equity and margin at current prices."""
+        profit = sum(self._position_profit(position) for position in self._positions.values())
+        margin = self._margin(self._exposure())
+        equity = self._balance + profit
+        return AccountInfo(
+            self._login, self.ACCOUNT_TRADE_MODE_DEMO, self._leverage, 0, 0, True, True,
+            self._margin_mode, 2, False, round(self._balance, 2), 0.0, round(profit, 2), round(equity, 2),
+            round(margin, 2), round(equity - margin, 2), round(equity / margin * 100, 2) if margin else 0.0,
+            50.0, 30.0, 0.0, 0.0, 0.0, 0.0, 0.0, 'Simulated Account', self._server, self._currency, 'MT5 Simulator'
+        )
+
+    # Market data
+
+    @ipc_call
+    def symbols_get(self, group: str = None) -> Tuple[SymbolInfo, ...]:
+        """Get all symbols, optionally filtered by a group pattern."""
+        return tuple(self._symbol_info(name) for name in self._symbols if _match_group(name, group))
+
+    @ipc_call
+    def symbol_info(self, symbol: str) -> Optional[SymbolInfo]:
+        """Get symbol specification with the current quote."""
+        if symbol not in self._symbols:
+            return self._fail(self.RES_E_NOT_FOUND, f"Symbol {symbol} not found")
+        return self._symbol_info(symbol)
+
+    @ipc_call
+    def symbol_info_tick(self, symbol: str) -> Optional[Tick]:
+        """Get the latest tick of a symbol."""
+        if symbol not in self._symbols:
+            return self._fail(self.RES_E_NOT_FOUND, f"Symbol {symbol} not found")
+        return self._tick(symbol)
+
+    @ipc_call
+    def symbol_select(self, symbol: str, enable: bool = True) -> bool:
+        """Show or hide a symbol in Market Watch."""
+        if symbol not in self._symbols:
+            return self._fail(self.RES_E_NOT_FOUND, f"Symbol {symbol} not found", False)
+        self._symbols[symbol]['visible'] = bool(enable)
+        return True
+
+    # Trading state
+
+    @ipc_call
+    def positions_get(self, symbol: str = None, group: str = None, ticket: int = None) -> Tuple[TradePosition, ...]:
+        """Get open positions, optionally filtered by symbol, group pattern or ticket."""
+        return tuple(
+            self._trade_position(position) for position in self._positions.values()
+            if (symbol is None or position['symbol'] == symbol)
+            and (ticket is None or position['ticket'] == ticket)
+            and _match_group(position['symbol'], group)
+        )
+
+    @ipc_call
+    def orders_get(self, symbol: str = None, group: str = None, ticket: int = None) -> Tuple[TradeOrder, ...]:
+        """Get pending orders; market execution only, so there are never any."""
+        return ()
+
+    @ipc_call
+    def history_deals_get(self, date_from=None, date_to=None, group: str = None,
+                          ticket: int = None, position: int = None) -> Tuple[TradeDeal, ...]:
+        """
+        Get deals by time range and group, by order ticket or by position.
+
+        Args:
+            date_from: Start time (datetime or Unix seconds)
+            date_to: End time (datetime or Unix seconds)
+            group: Symbol group pattern, e.g. "*USD*,!EUR*" (optional)
+            ticket: Order ticket (optional)
+            position: Position ticket (optional)
+        """
+        if ticket is not None:
+            return tuple(deal for deal in self._deals if deal.order == ticket)
+        if position is not None:
+            return tuple(deal for deal in self._deals if deal.position_id == position)
+        if date_from is None or date_to is None:
+            return self._fail(self.RES_E_INVALID_PARAMS, 'Invalid arguments')
+
+        start, end = _timestamp(date_from), _timestamp(date_to)
+        return tuple(deal for deal in self._deals
+                     if start <= deal.time <= end and _match_group(deal.symbol, group))
+
+    # Trading
+
+    @ipc_call
+    def order_check(self, request: Dict[str, Any]) -> Optional[OrderCheckResult]:
+        """Check a market order against volume limits and free margin without executing it."""
+        if not isinstance(request, dict):
+            return self._fail(self.RES_E_INVALID_PARAMS, 'Invalid arguments')
+
+        retcode, comment = self._check_deal(request)
+        if retcode == self.TRADE_RETCODE_DONE:
+            retcode, comment = 0, 'Done'
+        profit = sum(self._position_profit(position) for position in self._positions.values())
+        equity = self._balance + profit
+        margin = self._margin(self._exposure())
+        if retcode == 0:
+            margin = self._margin(self._exposure_after(request))
+        return OrderCheckResult(retcode, round(self._balance, 2), round(equity, 2), round(profit, 2),
+                                round(margin, 2), round(equity - margin, 2),
+                                round(equity / margin * 100, 2) if margin else 0.0, comment,
+                                _trade_request(request))
+
+    @ipc_call
+    def order_send(self, request: Dict[str, Any]) -> Optional[OrderSendResult]:
+        """
+        Execute a trade request.
+
+        Supports TRADE_ACTION_DEAL (open, or close with 'position'),
+        TRADE_ACTION_SLTP and TRADE_ACTION_CLOSE_BY.
+        """
+        if not isinstance(request, dict):
+            return self._fail(self.RES_E_INVALID_PARAMS, 'Invalid arguments')
+
+        self._next_request += 1
+        action = request.get('action')
+        if action == self.TRADE_ACTION_DEAL:
+            result = self._deal(request)
+        elif action == self.TRADE_ACTION_SLTP:
+            result = self._modify_stops(request)
+        elif action == self.TRADE_ACTION_CLOSE_BY:
+            result = self._close_by(request)
+        else:
+            result = self._result(request, self.TRADE_RETCODE_INVALID, 'Unsupported request')
+
+        self._stats['orders'] += 1
+        if result.retcode != self.TRADE_RETCODE_DONE:
+            self._stats['rejected'] += 1
+        return result
+
+    # Simulation control
+
+    def simulate_disconnect(self, duration_ms: float = None) -> None:
+        """
+        Drop the terminal connection now.
+
+        Args:
+            duration_ms: Outage length in milliseconds (optional, defaults to disconnect_ms)
+        """
+        with self._lock:
+            self._disconnect(self._disconnect_ms if duration_ms is None else duration_ms)
+
+    def get_stats(self) -> Dict[str, Any]:
+        """
+        Get simulator statistics.
+
+        Returns:
+            Statistics dictionary
+        """
+        with self._lock:
+            stats = dict(self._stats)
+            stats['calls'] = dict(self._stats['calls'])
+            stats['seed'] = self._seed
+            stats['connected'] = self._initialized
+            stats['open_positions'] = len(self._positions)
+            stats['deals'] = len(self._deals)
+            stats['balance'] = round(self._balance, 2)
+            return stats
+
+    # Call handling
+
+    def _call(self, name: str, func, args: tuple, kwargs: Dict[str, Any]):
+        """Simulate one terminal round trip around a simulator method."""
+        with self._lock:
+            calls = self._stats['calls']
+            calls[name] = calls.get(name, 0) + 1
+
+            delay = self._latency_model(name).sample()
+            if delay > 0:
+                time.sleep(delay / 1000.0)
+
+            if name != 'initialize':
+                if self._initialized and self._disconnect_probability and \
+                        self._events.random() < self._disconnect_probability:
+                    self._disconnect(self._disconnect_ms)
+                if not self._initialized:
+                    return self._fail(self.RES_E_INTERNAL_FAIL_CONNECT, 'No IPC connection',
+                                      False if name in ('login', 'symbol_select') else None)
+
+            self._last_error = (self.RES_S_OK, 'Success')
+            return func(self, *args, **kwargs)
+
+    def _latency_model(self, name: str) -> LatencyModel:
+        """Get the latency model of a function, with its own random stream."""
+        model = self._latency.get(name)
+        if model is None:
+            spec = self._latency_specs.get(name, self._latency_specs['default'])
+            model = self._latency[name] = LatencyModel(spec, random.Random(f"{self._seed}:latency:{name}"))
+        return model
+
+    def _disconnect(self, duration_ms: float) -> None:
+        """Start an outage (caller holds the lock)."""
+        self._initialized = False
+        self._down_until = time.monotonic() + duration_ms / 1000.0
+        self._stats['disconnects'] += 1
+        self.logger.info(f"Simulated terminal disconnect for {duration_ms} ms")
+
+    def _fail(self, code: int, description: str, value=None):
+        """Record a call error and return the call's failure value."""
+        self._last_error = (code, description)
+        return value
+
+    # Market model
+
+    def _add_symbol(self, name: str, spec: Dict[str, Any]) -> None:
+        """Register an instrument from its configuration."""
+        digits = spec.get('digits', 5)
+        point = 10 ** -digits
+        self._symbols[name] = {
+            'name': name,
+            'base': spec.get('currency_base', name[:3]),
+            'quote': spec.get('currency_profit', name[3:6] or self._currency),
+            'digits': digits,
+            'point': point,
+            'spread': spec.get('spread', 10),
+            'contract_size': spec.get('contract_size', 100000),
+            'volatility': spec.get('volatility', 2),
+            'volume_min': spec.get('volume_min', 0.01),
+            'volume_max': spec.get('volume_max', 100.0),
+            'volume_step': spec.get('volume_step', 0.01),
+            'filling_mode': spec.get('filling_mode', self.SYMBOL_FILLING_FOK | self.SYMBOL_FILLING_IOC),
+            'order_mode': spec.get('order_mode', 127),
+            'trade_mode': spec.get('trade_mode', self.SYMBOL_TRADE_MODE_FULL),
+            'visible': spec.get('visible', True),
+            'bid': round(spec.get('bid', 100.0), digits),
+            'tick_time': 0.0,
+            'tick_msc': 0,
+            'rng': random.Random(f"{self._seed}:price:{name}")
+        }
+
+    def _tick(self, symbol: str) -> Tick:
+        """Advance the symbol's random walk by one step per elapsed tick interval, at most once per call."""
+        state = self._symbols[symbol]
+        now = time.time()
+        if now - state['tick_time'] >= self._tick_interval:
+            if state['tick_time']:
+                step = round(state['rng'].gauss(0.0, state['volatility']))
+                state['bid'] = round(max(state['point'], state['bid'] + step * state['point']), state['digits'])
+            state['tick_time'] = now
+            # Tick times are strictly increasing, like a terminal's tick stream
+            state['tick_msc'] = max(int(now * 1000), state['tick_msc'] + 1)
+
+        bid = state['bid']
+        ask = round(bid + state['spread'] * state['point'], state['digits'])
+        return Tick(state['tick_msc'] // 1000, bid, ask, 0.0, 0, state['tick_msc'], 6, 0.0)
+
+    def _symbol_info(self, symbol: str) -> SymbolInfo:
+        """Build the symbol record with the current quote."""
+        state = self._symbols[symbol]
+        tick = self._tick(symbol)
+        return SymbolInfo(
+            symbol, f"{symbol} (simulated)", f"Simulator\\{symbol}", state['base'], state['quote'],
+            state['base'], state['digits'], state['point'], state['spread'], state['contract_size'], state['point'],
+            0, state['volume_min'], state['volume_max'], state['volume_step'], state['trade_mode'],
+            state['filling_mode'], state['order_mode'], state['visible'], state['visible'],
+            tick.bid, tick.ask, tick.time
+        )
+
+    # Ledger
+
+    def _deal(self, request: Dict[str, Any]) -> OrderSendResult:
+        """Execute a market order, opening, adding to, closing or reversing a position."""
+        retcode, comment = self._check_deal(request)
+        if retcode != self.TRADE_RETCODE_DONE:
+            return self._result(request, retcode, comment)
+
+        symbol = request['symbol']
+        order_type = request['type']
+        tick = self._tick(symbol)
+        price = tick.ask if order_type == self.ORDER_TYPE_BUY else tick.bid
+        state = self._symbols[symbol]
+
+        requested = request.get('price') or 0.0
+        slipped = requested and abs(price - requested) > request.get('deviation', 0) * state['point'] + 1e-12
+        if (self._execution == 'instant' and slipped) or \
+                (self._requote_probability and self._events.random() < self._requote_probability):
+            self._stats['requotes'] += 1
+            return self._result(request, self.TRADE_RETCODE_REQUOTE, 'Requote', bid=tick.bid, ask=tick.ask)
+
+        if self._margin(self._exposure_after(request)) > self._margin(self._exposure()) and \
+                self._margin(self._exposure_after(request)) > self._equity():
+            return self._result(request, self.TRADE_RETCODE_NO_MONEY, 'No money')
+
+        order = self._new_order()
+        volume = request['volume']
+        ticket = request.get('position')
+        if ticket:
+            position = self._positions[ticket]
+            deal = self._close(position, volume, price, order, self.DEAL_ENTRY_OUT, request)
+        elif self._margin_mode == self.ACCOUNT_MARGIN_MODE_RETAIL_HEDGING:
+            deal = self._open(symbol, order_type, volume, price, order, request)
+        else:
+            deal = self._net(symbol, order_type, volume, price, order, request)
+
+        return self._result(request, self.TRADE_RETCODE_DONE, 'Request executed', deal=deal.ticket,
+                            order=order, volume=volume, price=price, bid=tick.bid, ask=tick.ask)
+
+    def _check_deal(self, request: Dict[str, Any]) -> Tuple[int, str]:
+        """Validate a market order request; returns (retcode, comment)."""
+        symbol = request.get('symbol')
+        state = self._symbols.get(symbol)
+        if state is None or request.get('type') not in (self.ORDER_TYPE_BUY, self.ORDER_TYPE_SELL):
+            return self.TRADE_RETCODE_INVALID, 'Invalid request'
+        if state['trade_mode'] == self.SYMBOL_TRADE_MODE_DISABLED:
+            return self.TRADE_RETCODE_TRADE_DISABLED, 'Trade disabled'
+
+        volume = request.get('volume')
+        if not isinstance(volume, (int, float)) or not state['volume_min'] <= volume <= state['volume_max'] \
+                or abs(volume / state['volume_step'] - round(volume / state['volume_step'])) > 1e-6:
+            return self.TRADE_RETCODE_INVALID_VOLUME, 'Invalid volume'
+
+        filling = request.get('type_filling', self.ORDER_FILLING_FOK)
+        if (filling == self.ORDER_FILLING_FOK and not state['filling_mode'] & self.SYMBOL_FILLING_FOK) or \
+                (filling == self.ORDER_FILLING_IOC and not state['filling_mode'] & self.SYMBOL_FILLING_IOC):
+            return self.TRADE_RETCODE_INVALID_FILL, 'Unsupported filling mode'
+
+        ticket = request.get('position')
+        if ticket:
+            position = self._positions.get(ticket)
+            if position is None or position['symbol'] != symbol:
+                return self.TRADE_RETCODE_POSITION_CLOSED, 'Position does not exist'
+            if position['type'] == request['type']:
+                return self.TRADE_RETCODE_INVALID, 'Invalid request'
+            if volume > position['volume'] + 1e-9:
+                return self.TRADE_RETCODE_INVALID_VOLUME, 'Invalid volume'
+
+        return self.TRADE_RETCODE_DONE, 'Request executed'
+
+    def _open(self, symbol: str, order_type: int, volume: float, price: float, order: int,
+              request: Dict[str, Any]) -> TradeDeal:
+        """Open a new position whose ticket is the order ticket."""
+        now = time.time()
+        self._positions[order] = {
+            'ticket': order, 'symbol': symbol, 'type': order_type, 'volume': volume, 'price_open': price,
+            'sl': request.get('sl') or 0.0, 'tp': request.get('tp') or 0.0, 'magic': request.get('magic', 0),
+            'comment': request.get('comment', ''), 'time': now, 'time_update': now
+        }
+        return self._record_deal(order, order, symbol, order_type, self.DEAL_ENTRY_IN, volume, price, 0.0, request)
+
+    def _close(self, position: Dict[str, Any], volume: float, price: float, order: int, entry: int,
+               request: Dict[str, Any]) -> TradeDeal:
+        """Close part or all of a position at a price and realize its profit."""
+        profit = self._profit(position, volume, price)
+        self._balance += profit
+        position['volume'] = round(position['volume'] - volume, 8)
+        position['time_update'] = time.time()
+        if position['volume'] <= 0:
+            del self._positions[position['ticket']]
+
+        deal_type = self.DEAL_TYPE_SELL if position['type'] == self.POSITION_TYPE_BUY else self.DEAL_TYPE_BUY
+        return self._record_deal(order, position['ticket'], position['symbol'], deal_type, entry, volume,
+                                 price, profit, request)
+
+    def _net(self, symbol: str, order_type: int, volume: float, price: float, order: int,
+             request: Dict[str, Any]) -> TradeDeal:
+        """Apply a deal to the single position of a netting account."""
+        position = next((p for p in self._positions.values() if p['symbol'] == symbol), None)
+        if position is None:
+            return self._open(symbol, order_type, volume, price, order, request)
+
+        if position['type'] == order_type:
+            total = position['volume'] + volume
+            position['price_open'] = round((position['price_open'] * position['volume'] + price * volume) / total,
+                                           self._symbols[symbol]['digits'] + 3)
+            position['volume'] = round(total, 8)
+            position['time_update'] = time.time()
+            return self._record_deal(order, position['ticket'], symbol, order_type, self.DEAL_ENTRY_IN,
+                                     volume, price, 0.0, request)
+
+        if volume <= position['volume'] + 1e-9:
+            return self._close(position, volume, price, order, self.DEAL_ENTRY_OUT, request)
+
+        # Reversal: realize the closed volume and turn the position around under the same ticket
+        remainder = round(volume - position['volume'], 8)
+        profit = self._profit(position, position['volume'], price)
+        self._balance += profit
+        position.update(type=order_type, volume=remainder, price_open=price, time_update=time.time())
+        return self._record_deal(order, position['ticket'], symbol, order_type, self.DEAL_ENTRY_INOUT,
+                                 volume, price, profit, request)
+
+    def _close_by(self, request: Dict[str, Any]) -> OrderSendResult:
+        """Close a position by an opposite one of the same symbol (hedging accounts only)."""
+        position = self._positions.get(request.get('position'))
+        opposite = self._positions.get(request.get('position_by'))
+        if position is None or opposite is None:
+            return self._result(request, self.TRADE_RETCODE_POSITION_CLOSED, 'Position does not exist')
+        if self._margin_mode != self.ACCOUNT_MARGIN_MODE_RETAIL_HEDGING or \
+                position['symbol'] != opposite['symbol'] or position['type'] == opposite['type']:
+            return self._result(request, self.TRADE_RETCODE_INVALID, 'Invalid request')
+
+        # The position closes at the opening price of the opposite one, which closes flat
+        volume = min(position['volume'], opposite['volume'])
+        order = self._new_order()
+        deal = self._close(position, volume, opposite['price_open'], order, self.DEAL_ENTRY_OUT_BY, request)
+        self._close(opposite, volume, opposite['price_open'], order, self.DEAL_ENTRY_OUT_BY, request)
+        tick = self._tick(deal.symbol)
+        return self._result(request, self.TRADE_RETCODE_DONE, 'Request executed', deal=deal.ticket,
+                            order=order, volume=volume, price=deal.price, bid=tick.bid, ask=tick.ask)
+
+    def _modify_stops(self, request: Dict[str, Any]) -> OrderSendResult:
+        """Set stop-loss and take-profit of a position (stored, not triggered)."""
+        position = self._positions.get(request.get('position'))
+        if position is None:
+            return self._result(request, self.TRADE_RETCODE_POSITION_CLOSED, 'Position does not exist')
+        position['sl'] = request.get('sl') or 0.0
+        position['tp'] = request.get('tp') or 0.0
+        position['time_update'] = time.time()
+        return self._result(request, self.TRADE_RETCODE_DONE, 'Request executed')
+
+    def _record_deal(self, order: int, position_id: int, symbol: str, deal_type: int, entry: int, volume: float,
+                     price: float, profit: float, request: Dict[str, Any]) -> TradeDeal:
+        """Append a deal to the history."""
+        now = time.time()
+        deal = TradeDeal(self._next_deal, order, int(now), int(now * 1000), deal_type, entry,
+                         request.get('magic', 0), position_id, 3, volume, price, 0.0, 0.0, round(profit, 2) + 0.0, 0.0,
+                         symbol, request.get('comment', ''), '')
+        self._next_deal += 1
+        self._deals.append(deal)
+        return deal
+
+    def _new_order(self) -> int:
+        """Allocate an order ticket."""
+        order = self._next_order
+        self._next_order += 1
+        return order
+
+    def _result(self, request: Dict[str, Any], retcode: int, comment: str, deal: int = 0, order: int = 0,
+                volume: float = 0.0, price: float = 0.0, bid: float = 0.0, ask: float = 0.0) -> OrderSendResult:
+        """Build an order_send result."""
+        return OrderSendResult(retcode, deal, order, volume, price, bid, ask, comment, self._next_request, 0,
+                               _trade_request(request))
+
+    # Margin model
+
+    def _exposure(self) -> Dict[str, List[float]]:
+        """Open volume per symbol as {symbol: [long, short]}."""
+        exposure: Dict[str, List[float]] = {}
+        for position in self._positions.values():
+            exposure.setdefault(position['symbol'], [0.0, 0.0])[position['type']] += position['volume']
+        return exposure
+
+    def _exposure_after(self, request: Dict[str, Any]) -> Dict[str, List[float]]:
+        """Open volume per symbol if a validated market order were filled."""
+        exposure = self._exposure()
+        sides = exposure.setdefault(request['symbol'], [0.0, 0.0])
+        volume, side = request['volume'], request['type']
+        if request.get('position'):
+            sides[1 - side] -= volume
+        elif self._margin_mode == self.ACCOUNT_MARGIN_MODE_RETAIL_HEDGING:
+            sides[side] += volume
+        else:
+            net = sides[side] - sides[1 - side] + volume
+            sides[side], sides[1 - side] = max(net, 0.0), max(-net, 0.0)
+        return exposure
+
+    def _margin(self, exposure: Dict[str, List[float]]) -> float:
+        """Margin of an exposure: the larger side per symbol, in the account currency."""
+        margin = 0.0
+        for symbol, (long_volume, short_volume) in exposure.items():
+            state = self._symbols[symbol]
+            base_margin = max(long_volume, short_volume) * state['contract_size'] / self._leverage
+            if state['base'] != self._currency:
+                base_margin *= self._tick(symbol).ask
+            margin += base_margin
+        return margin
+
+    def _equity(self) -> float:
+        """Balance plus floating profit."""
+        return self._balance + sum(self._position_profit(position) for position in self._positions.values())
+
+    def _profit(self, position: Dict[str, Any], volume: float, price: float) -> float:
+        """Profit of closing volume of a position at a price."""
+        state = self._symbols[position['symbol']]
+        direction = 1 if position['type'] == self.POSITION_TYPE_BUY else -1
+        profit = (price - position['price_open']) * direction * volume * state['contract_size']
+        if state['quote'] != self._currency and state['base'] == self._currency:
+            profit /= price
+        return profit
+
+    def _position_profit(self, position: Dict[str, Any]) -> float:
+        """Floating profit of a position at the current closing price."""
+        tick = self._tick(position['symbol'])
+        price = tick.bid if position['type'] == self.POSITION_TYPE_BUY else tick.ask
+        return self._profit(position, position['volume'], price)
+
+    def _trade_position(self, position: Dict[str, Any]) -> TradePosition:
+        """Build the position record at current prices."""
+        tick = self._tick(position['symbol'])
+        current = tick.bid if position['type'] == self.POSITION_TYPE_BUY else tick.ask
+        return TradePosition(
+            position['ticket'], int(position['time']), int(position['time'] * 1000), int(position['time_update']),
+            int(position['time_update'] * 1000), position['type'], position['magic'], position['ticket'], 3,
+            position['volume'], position['price_open'], position['sl'], position['tp'], current, 0.0,
+            round(self._profit(position, position['volume'], current), 2), position['symbol'],
+            position['comment'], ''
+        )
+
+
+def _trade_request(request: Dict[str, Any]) -> TradeRequest:
+    """Echo a request dictionary as a TradeRequest record."""
+    return TradeRequest(*(request.get(field, 0 if field not in ('symbol', 'comment') else '')
+                          for field in TradeRequest._fields))
+
+
+def _match_group(symbol: str, group: Optional[str]) -> bool:
+    """Match a symbol against an MT5 group pattern such as "*USD*,!EUR*"."""
+    if not group:
+        return True
+    matched = False
+    for pattern in group.split(','):
+        pattern = pattern.strip()
+        if pattern.startswith('!'):
+            if fnmatch.fnmatchcase(symbol, pattern[1:]):
+                return False
+        elif fnmatch.fnmatchcase(symbol, pattern):
+            matched = True
+    return matched
+
+
+def _timestamp(value) -> float:
+    """Convert a datetime or Unix seconds to Unix seconds."""
+    if isinstance(value, datetime):
+        return value.timestamp()
+    return float(value)
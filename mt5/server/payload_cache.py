@@ -0,0 +1,131 @@
+"""
+Payload Cache for MT5 Trading HTTP Server.
+Caches parsed and validated webhook payloads by raw request body.
+"""
+
+import logging
+import threading
+from collections import OrderedDict
+from typing import Dict, Any, Optional, Tuple
+
+
+# Value types a cached payload may hold; anything else is not cached
+SCALAR_TYPES = (str, int, float, bool, type(None))
+
+
+class PayloadCache:
+    """
+    Bounded LRU map from raw webhook body to its validated standard payload.
+
+    Alerts are generated from a few hundred fixed templates, so the same body
+    arrives again and again. A hit skips Chinese parsing and payload
+    validation and costs one dictionary lookup plus a copy. Payloads are
+    stored frozen as tuples of items and handed out as fresh dicts, so the
+    request path may mutate them freely.
+
+    Validation depends on the webhook configuration, so the cache must be
+    cleared whenever the configuration is reloaded.
+    """
+
+    def __init__(self, config: Dict[str, Any] = None):
+        """
+        Initialize payload cache.
+
+        Args:
+            config: webhook.parse_cache configuration dictionary (optional)
+        """
+        config = config or {}
+        self.logger = logging.getLogger('mt5_server.payload_cache')
+        self.enabled = config.get('enabled', True)
+        self.max_entries = config.get('max_entries', 1024)
+        self.max_body_bytes = config.get('max_body_bytes', 4096)
+
+        self._entries: 'OrderedDict[Tuple[bool, bytes], tuple]' = OrderedDict()
+        self._lock = threading.Lock()
+        self._stats = {'hits': 0, 'misses': 0, 'stored': 0, 'uncacheable': 0, 'evicted': 0, 'invalidations': 0}
+
+    @staticmethod
+    def make_key(content_type: str, body: bytes) -> Tuple[bool, bytes]:
+        """
+        Derive the cache key for a request body.
+
+        Args:
+            content_type: Request content type
+            body: Raw request body
+
+        Returns:
+            Cache key; JSON and text bodies are parsed differently and never share entries
+        """
+        return ('application/json' in (content_type or ''), body)
+
+    def get(self, key: Tuple[bool, bytes]) -> Optional[Dict[str, Any]]:
+        """
+        Look up the payload for a body.
+
+        Args:
+            key: Cache key from make_key()
+
+        Returns:
+            Fresh copy of the validated payload, or None on a miss
+        """
+        if not self.enabled:
+            return None
+
+        with self._lock:
+            frozen = self._entries.get(key)
+            if frozen is None:
+                self._stats['misses'] += 1
+                return None
+            self._entries.move_to_end(key)
+            self._stats['hits'] += 1
+        return dict(frozen)
+
+    def put(self, key: Tuple[bool, bytes], payload: Dict[str, Any]) -> None:
+        """
+        Store the validated payload for a body.
+
+        Args:
+            key: Cache key from make_key()
+            payload: Parsed and validated standard payload
+        """
+        if not self.enabled:
+            return
+
+        if len(key[1]) > self.max_body_bytes or \
+                not all(isinstance(value, SCALAR_TYPES) for value in payload.values()):
+            with self._lock:
+                self._stats['uncacheable'] += 1
+            return
+
+        frozen = tuple(payload.items())
+        with self._lock:
+            self._entries[key] = frozen
+            self._entries.move_to_end(key)
+            self._stats['stored'] += 1
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+                self._stats['evicted'] += 1
+
+    def clear(self, *args) -> None:
+        """Drop every cached payload (used as a configuration reload listener)."""
+        with self._lock:
+            dropped = len(self._entries)
+            self._entries.clear()
+            self._stats['invalidations'] += 1
+        self.logger.info(f"Payload cache cleared ({dropped} entries)")
+
+    def get_stats(self) -> Dict[str, Any]:
+        """
+        Get cache statistics.
+
+        Returns:
+            Statistics dictionary including hit rate
+        """
+        with self._lock:
+            stats = dict(self._stats)
+            stats['size'] = len(self._entries)
+        lookups = stats['hits'] + stats['misses']
+        stats['hit_rate'] = round(stats['hits'] / lookups, 4) if lookups else 0.0
+        stats['enabled'] = self.enabled
+        stats['max_entries'] = self.max_entries
+        return stats
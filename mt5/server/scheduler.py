@@ -0,0 +1,527 @@
+"""
+Execution Scheduler for MT5 Trading HTTP Server.
+Defers webhook trades to the aligned bar close without holding request threads.
+"""
+
+import heapq
+import logging
+import threading
+import time
+import uuid
+from collections import OrderedDict
+from datetime import datetime
+from typing import Dict, Any, Optional, Callable, List, Tuple
+from execution_lanes import ExecutionLanes, Priority
+from trade_journal import job_context
+from utils.ipc_accounting import ipc_scope
+from utils.tracing import tracer
+
+
+class JobStatus:
+    """Job lifecycle states."""
+    PENDING = 'pending'
+    RUNNING = 'running'
+    COMPLETED = 'completed'
+    FAILED = 'failed'
+    ROLLED_BACK = 'rolled_back'
+
+
+class Job:
+    """A trade scheduled for execution at a bar boundary."""
+
+    __slots__ = ('id', 'payload', 'run_at', 'status', 'result', 'error', 'error_type',
+                 'created_at', 'started_at', 'finished_at', 'batch', 'ipc', '_done')
+
+    def __init__(self, payload: Dict[str, Any], run_at: float, job_id: str = None):
+        self.id = job_id or ExecutionScheduler.new_job_id()
+        self.payload = payload
+        self.run_at = run_at
+        self.status = JobStatus.PENDING
+        self.result = None
+        self.error = None
+        self.error_type = None
+        self.created_at = time.time()
+        self.started_at = None
+        self.finished_at = None
+        self.batch = None
+        self.ipc = None
+        self._done = threading.Event()
+
+    @property
+    def finished(self) -> bool:
+        """Whether the job has completed or failed."""
+        return self.status in (JobStatus.COMPLETED, JobStatus.FAILED)
+
+    def wait(self, timeout: float = None) -> bool:
+        """
+        Block until the job finishes.
+
+        Args:
+            timeout: Maximum seconds to wait (optional)
+
+        Returns:
+            True if the job finished within the timeout
+        """
+        return self._done.wait(timeout)
+
+    def to_dict(self, debug: bool = False) -> Dict[str, Any]:
+        """
+        Serialize job state for API responses.
+
+        Args:
+            debug: Include the MT5 IPC calls made by the job
+
+        Returns:
+            Job state dictionary
+        """
+        state = {
+            'job_id': self.id,
+            'status': self.status,
+            'action': self.payload.get('action'),
+            'symbol': self.payload.get('symbol'),
+            'scheduled_for': datetime.fromtimestamp(self.run_at).isoformat(),
+            'created_at': datetime.fromtimestamp(self.created_at).isoformat(),
+            'started_at': datetime.fromtimestamp(self.started_at).isoformat() if self.started_at else None,
+            'finished_at': datetime.fromtimestamp(self.finished_at).isoformat() if self.finished_at else None,
+            'result': self.result,
+            'error': self.error,
+            'error_type': self.error_type
+        }
+        if debug:
+            state['ipc'] = self.ipc
+        return state
+
+
+class BatchJob:
+    """
+    A basket of trade jobs scheduled for the same bar boundary.
+
+    Legs execute independently through the scheduler; the batch finishes when
+    its last leg does. An atomic batch whose legs did not all complete is
+    rolled back through the rollback handler.
+    """
+
+    __slots__ = ('id', 'legs', 'run_at', 'atomic', 'status', 'result', 'error', 'error_type',
+                 'created_at', 'finished_at', 'rollback', '_rollback_handler', '_pending', '_lock', '_done')
+
+    def __init__(self, legs: List[Job], run_at: float, atomic: bool = False,
+                 rollback_handler: Callable[[List[Dict[str, Any]]], Dict[str, Any]] = None,
+                 batch_id: str = None):
+        self.id = batch_id or ExecutionScheduler.new_job_id()
+        self.legs = legs
+        self.run_at = run_at
+        self.atomic = atomic
+        self.status = JobStatus.PENDING
+        self.result = None
+        self.error = None
+        self.error_type = None
+        self.created_at = time.time()
+        self.finished_at = None
+        self.rollback = None
+        self._rollback_handler = rollback_handler
+        self._pending = len(legs)
+        self._lock = threading.Lock()
+        self._done = threading.Event()
+
+        for leg in legs:
+            leg.batch = self
+
+    @property
+    def finished(self) -> bool:
+        """Whether every leg has finished."""
+        return self.status in (JobStatus.COMPLETED, JobStatus.FAILED, JobStatus.ROLLED_BACK)
+
+    @property
+    def started_at(self) -> Optional[float]:
+        """Start time of the earliest started leg."""
+        started = [leg.started_at for leg in self.legs if leg.started_at]
+        return min(started) if started else None
+
+    def wait(self, timeout: float = None) -> bool:
+        """
+        Block until the batch finishes.
+
+        Args:
+            timeout: Maximum seconds to wait (optional)
+
+        Returns:
+            True if the batch finished within the timeout
+        """
+        return self._done.wait(timeout)
+
+    def leg_finished(self) -> bool:
+        """
+        Account for a finished leg; rolls back when the last leg of a failed atomic batch finishes.
+
+        Returns:
+            True if this was the last leg
+        """
+        with self._lock:
+            self._pending -= 1
+            if self._pending > 0:
+                if self.status == JobStatus.PENDING:
+                    self.status = JobStatus.RUNNING
+                return False
+
+        failed = [leg for leg in self.legs if leg.status == JobStatus.FAILED]
+        if failed and self.atomic and self._rollback_handler:
+            filled = [leg.result for leg in self.legs if leg.status == JobStatus.COMPLETED and leg.result]
+            try:
+                self.rollback = self._rollback_handler(filled)
+                self.status = JobStatus.ROLLED_BACK
+            except Exception as e:
+                self.rollback = {'error': str(e)}
+                self.status = JobStatus.FAILED
+        else:
+            self.status = JobStatus.FAILED if failed else JobStatus.COMPLETED
+
+        if failed:
+            self.error = f"{len(failed)} of {len(self.legs)} legs failed"
+            self.error_type = 'BatchError'
+        self.result = self._summary()
+        self.finished_at = time.time()
+        self._done.set()
+        return True
+
+    def to_dict(self, debug: bool = False) -> Dict[str, Any]:
+        """
+        Serialize batch state with per-leg results for API responses.
+
+        Args:
+            debug: Include the MT5 IPC calls made by each leg
+
+        Returns:
+            Batch state dictionary
+        """
+        return {
+            'job_id': self.id,
+            'type': 'batch',
+            'status': self.status,
+            'atomic': self.atomic,
+            'scheduled_for': datetime.fromtimestamp(self.run_at).isoformat(),
+            'created_at': datetime.fromtimestamp(self.created_at).isoformat(),
+            'finished_at': datetime.fromtimestamp(self.finished_at).isoformat() if self.finished_at else None,
+            'summary': self._summary(),
+            'legs': [leg.to_dict(debug) for leg in self.legs],
+            'rollback': self.rollback,
+            'error': self.error
+        }
+
+    def _summary(self) -> Dict[str, int]:
+        """Count legs by status."""
+        summary = {'total': len(self.legs)}
+        for leg in self.legs:
+            summary[leg.status] = summary.get(leg.status, 0) + 1
+        return summary
+
+
+class ExecutionScheduler:
+    """
+    Runs trade jobs at minute boundaries from a single timer thread.
+
+    Pending jobs are heap entries ordered by due time; only due jobs occupy
+    a worker thread, so request threads return immediately after scheduling.
+    Due jobs are routed into per-symbol lanes: jobs for one symbol run in
+    submission order while different symbols execute in parallel, and exits
+    are served ahead of modifies and new entries across lanes.
+    """
+
+    def __init__(self, handler: Callable[[Dict[str, Any]], Dict[str, Any]],
+                 config: Dict[str, Any] = None, coalescer=None):
+        """
+        Initialize execution scheduler.
+
+        Args:
+            handler: Callable executing a payload and returning its result
+            config: Scheduler configuration dictionary (optional)
+            coalescer: SignalCoalescer grouping same-bar jobs (optional)
+        """
+        config = config or {}
+        self.handler = handler
+        self.coalescer = coalescer
+        self.logger = logging.getLogger('mt5_server.scheduler')
+        self.workers = config.get('workers', 4)
+        self.job_retention = config.get('job_retention', 3600)
+        self.max_jobs = config.get('max_jobs', 10000)
+
+        self._heap: List[Tuple[float, int, Job]] = []
+        self._sequence = 0
+        self._jobs: 'OrderedDict[str, Job]' = OrderedDict()
+        self._condition = threading.Condition()
+        self.lanes = ExecutionLanes(self.workers, config)
+        self._thread = None
+        self._running = False
+        self._listeners: List[Callable[[Job], None]] = []
+        self._stats = {'submitted': 0, 'completed': 0, 'failed': 0}
+
+    @staticmethod
+    def next_minute_boundary(now: float = None) -> float:
+        """
+        Get the timestamp of the next minute boundary (bar close).
+
+        Args:
+            now: Reference timestamp (optional, defaults to current time)
+
+        Returns:
+            Epoch seconds of the next HH:MM:00
+        """
+        if now is None:
+            now = time.time()
+        return (int(now // 60) + 1) * 60.0
+
+    def start(self) -> None:
+        """Start the timer thread and worker pool."""
+        with self._condition:
+            if self._running:
+                return
+            self._running = True
+
+        self.lanes.start()
+        self._thread = threading.Thread(target=self._run, name='mt5-scheduler', daemon=True)
+        self._thread.start()
+        self.logger.info(f"Execution scheduler started with {self.workers} workers")
+
+    def stop(self) -> None:
+        """Stop the timer thread; jobs already running are allowed to finish."""
+        with self._condition:
+            self._running = False
+            self._condition.notify_all()
+
+        if self._thread:
+            self._thread.join(timeout=5)
+        self.lanes.stop()
+        self.logger.info("Execution scheduler stopped")
+
+    @staticmethod
+    def new_job_id() -> str:
+        """
+        Generate a job identifier ahead of submission.
+
+        Returns:
+            New job id
+        """
+        return uuid.uuid4().hex
+
+    def submit(self, payload: Dict[str, Any], run_at: float = None, job_id: str = None) -> Job:
+        """
+        Schedule a payload for execution.
+
+        Args:
+            payload: Validated trade payload
+            run_at: Epoch seconds to execute at (optional, defaults to next minute boundary)
+            job_id: Job identifier (optional, e.g. from new_job_id or a journal replay)
+
+        Returns:
+            Scheduled job
+        """
+        job = Job(payload, run_at if run_at is not None else self.next_minute_boundary(), job_id)
+
+        with self._condition:
+            self._purge_finished()
+            self._jobs[job.id] = job
+            self._sequence += 1
+            heapq.heappush(self._heap, (job.run_at, self._sequence, job))
+            self._stats['submitted'] += 1
+            self._condition.notify()
+
+        self.logger.info(f"Job {job.id} scheduled for "
+                         f"{datetime.fromtimestamp(job.run_at).strftime('%H:%M:%S')}: "
+                         f"{payload.get('action')} {payload.get('symbol')}")
+        return job
+
+    def submit_batch(self, payloads: List[Dict[str, Any]], run_at: float = None, job_ids: List[str] = None,
+                     atomic: bool = False,
+                     rollback_handler: Callable[[List[Dict[str, Any]]], Dict[str, Any]] = None,
+                     batch_id: str = None) -> BatchJob:
+        """
+        Schedule several payloads as one batch at the same boundary.
+
+        Args:
+            payloads: Validated trade payloads, one per leg
+            run_at: Epoch seconds to execute at (optional, defaults to next minute boundary)
+            job_ids: Leg job identifiers (optional)
+            atomic: Roll back filled legs when any leg fails
+            rollback_handler: Callable undoing the results of filled legs (required when atomic)
+            batch_id: Batch identifier (optional, e.g. when the batch was journaled first)
+
+        Returns:
+            Scheduled batch
+        """
+        if run_at is None:
+            run_at = self.next_minute_boundary()
+        job_ids = job_ids or [None] * len(payloads)
+        legs = [Job(payload, run_at, job_id) for payload, job_id in zip(payloads, job_ids)]
+        batch = BatchJob(legs, run_at, atomic, rollback_handler, batch_id)
+
+        with self._condition:
+            self._purge_finished()
+            self._jobs[batch.id] = batch
+            for leg in legs:
+                self._jobs[leg.id] = leg
+                self._sequence += 1
+                heapq.heappush(self._heap, (run_at, self._sequence, leg))
+            self._stats['submitted'] += len(legs)
+            self._condition.notify()
+
+        self.logger.info(f"Batch {batch.id} scheduled for "
+                         f"{datetime.fromtimestamp(run_at).strftime('%H:%M:%S')} with {len(legs)} legs"
+                         f"{' (atomic)' if atomic else ''}")
+        return batch
+
+    def add_listener(self, callback: Callable[[Job], None]) -> None:
+        """
+        Register a callback invoked with each job after it finishes.
+
+        Args:
+            callback: Callable receiving the finished job
+        """
+        self._listeners.append(callback)
+
+    def get_job(self, job_id: str) -> Optional[Job]:
+        """
+        Look up a job by id.
+
+        Args:
+            job_id: Job identifier
+
+        Returns:
+            Job or None if unknown or expired
+        """
+        with self._condition:
+            return self._jobs.get(job_id)
+
+    def get_stats(self) -> Dict[str, Any]:
+        """
+        Get scheduler statistics.
+
+        Returns:
+            Statistics dictionary
+        """
+        with self._condition:
+            stats = dict(self._stats)
+            stats['pending'] = len(self._heap)
+            stats['tracked_jobs'] = len(self._jobs)
+            stats['next_run'] = (datetime.fromtimestamp(self._heap[0][0]).isoformat()
+                                 if self._heap else None)
+        return stats
+
+    def _run(self) -> None:
+        """Timer loop dispatching due jobs to the worker pool."""
+        while True:
+            with self._condition:
+                while self._running:
+                    if self._heap:
+                        delay = self._heap[0][0] - time.time()
+                        if delay <= 0:
+                            break
+                        self._condition.wait(timeout=delay)
+                    else:
+                        self._condition.wait()
+                if not self._running:
+                    return
+
+                due = []
+                now = time.time()
+                while self._heap and self._heap[0][0] <= now:
+                    due.append(heapq.heappop(self._heap)[2])
+
+            units = self.coalescer.group(due) if self.coalescer else [[job] for job in due]
+            for unit in units:
+                job = unit[0]
+                priority = Priority.for_action(job.payload.get('action'))
+                if len(unit) == 1:
+                    self.lanes.submit(job.payload.get('symbol'), self._execute, job, priority=priority)
+                else:
+                    self.lanes.submit(job.payload.get('symbol'), self._execute_group, unit, priority=priority)
+
+    def _execute(self, job: Job) -> None:
+        """Execute a due job and record its outcome."""
+        job.started_at = time.time()
+        job.status = JobStatus.RUNNING
+        self._trace_start(job)
+
+        with ipc_scope('job') as scope:
+            try:
+                with job_context(job.id, job.run_at, job.started_at):
+                    result, error = self.handler(job.payload), None
+            except Exception as e:
+                result, error = None, e
+        job.ipc = scope.to_dict()
+        self._finish(job, result, error)
+
+    def _execute_group(self, jobs: List[Job]) -> None:
+        """Execute a coalesced group of jobs as one net order."""
+        started_at = time.time()
+        for job in jobs:
+            job.started_at = started_at
+            job.status = JobStatus.RUNNING
+            self._trace_start(job)
+
+        with ipc_scope('job_group') as scope:
+            try:
+                with job_context(','.join(job.id for job in jobs), jobs[0].run_at, started_at):
+                    outcomes = self.coalescer.execute(jobs)
+            except Exception as e:
+                outcomes = [(None, e)] * len(jobs)
+
+        # The net order's calls are shared by every job of the group
+        ipc = scope.to_dict()
+        for job, (result, error) in zip(jobs, outcomes):
+            job.ipc = ipc
+            self._finish(job, result, error)
+
+    @staticmethod
+    def _trace_start(job: Job) -> None:
+        """Record the bar boundary wait and the dispatch delay past the boundary."""
+        action, symbol = job.payload.get('action'), job.payload.get('symbol')
+        tracer.record('schedule.boundary_wait', (job.started_at - job.created_at) * 1000, action, symbol)
+        tracer.record('schedule.dispatch', max(0.0, job.started_at - job.run_at) * 1000, action, symbol)
+
+    def _finish(self, job: Job, result: Optional[Dict[str, Any]], error: Optional[Exception]) -> None:
+        """Record a job outcome and notify listeners."""
+        if error is None:
+            job.result = result
+            job.status = JobStatus.COMPLETED
+            outcome = 'completed'
+        else:
+            job.error = str(error)
+            job.error_type = type(error).__name__
+            job.status = JobStatus.FAILED
+            outcome = 'failed'
+            self.logger.error(f"Job {job.id} failed: {error}")
+        job.finished_at = time.time()
+        job._done.set()
+
+        with self._condition:
+            self._stats[outcome] += 1
+
+        finished = [job]
+        if job.batch is not None and job.batch.leg_finished():
+            finished.append(job.batch)
+
+        for item in finished:
+            for callback in self._listeners:
+                try:
+                    callback(item)
+                except Exception as e:
+                    self.logger.error(f"Job listener failed for job {item.id}: {e}")
+
+    def _purge_finished(self) -> None:
+        """Drop expired finished jobs and enforce the job cap (caller holds the lock)."""
+        cutoff = time.time() - self.job_retention
+        overflow = len(self._jobs) - self.max_jobs + 1
+        stale = []
+
+        # Jobs are kept in creation order, so expired entries cluster at the front.
+        # Pending and running jobs are never dropped, but later jobs behind them
+        # may have expired, so the scan stops at the first unexpired finished job.
+        for job_id, job in self._jobs.items():
+            if not job.finished:
+                continue
+            if overflow <= 0 and job.finished_at >= cutoff:
+                break
+            stale.append(job_id)
+            overflow -= 1
+
+        for job_id in stale:
+            del self._jobs[job_id]
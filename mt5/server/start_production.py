@@ -72,6 +72,10 @@ def check_requirements():
         'Flask-CORS': 'flask_cors'
     }
     
+    # The simulated backend does not need the terminal package
+    if os.environ.get('MT5_BACKEND', '').lower() == 'simulated':
+        required_packages.pop('MetaTrader5')
+
     missing_packages = []
     for pip_name, import_name in required_packages.items():
         try:
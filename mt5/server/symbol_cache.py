@@ -0,0 +1,150 @@
+"""
+Symbol Cache for MT5 Trading HTTP Server.
+Caches static contract specifications and short-lived quotes per symbol.
+"""
+
+import logging
+import threading
+import time
+from typing import Dict, Any, Optional
+
+
+class SymbolCache:
+    """
+    Two-tier symbol cache.
+
+    Static contract data (digits, volume limits, filling mode, trade mode,
+    visibility) changes rarely and is kept for a long TTL or until explicitly
+    invalidated. Quotes come from symbol_info_tick and are only reused within
+    a millisecond-scale freshness bound.
+    """
+
+    STATIC_FIELDS = (
+        'name', 'description', 'currency_base', 'currency_profit', 'currency_margin',
+        'digits', 'point', 'volume_min', 'volume_max', 'volume_step',
+        'trade_mode', 'filling_mode', 'order_mode', 'visible'
+    )
+
+    def __init__(self, executor, config: Dict[str, Any] = None):
+        """
+        Initialize symbol cache.
+
+        Args:
+            executor: MT5Executor used for terminal calls
+            config: Symbol cache configuration dictionary (optional)
+        """
+        config = config or {}
+        self.executor = executor
+        self.logger = logging.getLogger('mt5_server.symbol_cache')
+        self.static_ttl = config.get('static_ttl', 3600)
+        self.quote_max_age = config.get('quote_max_age_ms', 250) / 1000.0
+
+        # Optional background tick source (TickStreamer) consulted before the terminal
+        self.quote_source = None
+
+        # symbol -> (loaded_at, data); tuples are replaced atomically
+        self._static: Dict[str, tuple] = {}
+        self._quotes: Dict[str, tuple] = {}
+        self._lock = threading.Lock()
+        self._stats = {'static_hits': 0, 'static_misses': 0, 'quote_hits': 0, 'quote_misses': 0,
+                       'stream_hits': 0}
+
+    def get_static(self, symbol: str) -> Optional[Dict[str, Any]]:
+        """
+        Get static contract data for a symbol.
+
+        Args:
+            symbol: Trading symbol
+
+        Returns:
+            Static symbol data or None if the symbol is unknown
+        """
+        entry = self._static.get(symbol)
+        if entry and time.monotonic() - entry[0] < self.static_ttl:
+            self._count('static_hits')
+            return entry[1]
+
+        self._count('static_misses')
+        symbol_info = self.executor.symbol_info(symbol)
+        if symbol_info is None:
+            return None
+
+        data = {field: getattr(symbol_info, field) for field in self.STATIC_FIELDS}
+        self._static[symbol] = (time.monotonic(), data)
+        return data
+
+    def get_quote(self, symbol: str) -> Optional[Dict[str, Any]]:
+        """
+        Get the latest quote for a symbol, reusing one fetched within the freshness bound.
+
+        A fresh tick from the attached quote source is preferred; symbols priced
+        here are handed to the source so subsequent quotes are streamed.
+
+        Args:
+            symbol: Trading symbol
+
+        Returns:
+            Quote dictionary (bid, ask, time, time_msc) or None if unavailable
+        """
+        quote_source = self.quote_source
+        if quote_source is not None:
+            quote = quote_source.latest(symbol)
+            if quote is not None:
+                self._count('stream_hits')
+                return quote
+            quote_source.track(symbol)
+
+        entry = self._quotes.get(symbol)
+        if entry and time.monotonic() - entry[0] < self.quote_max_age:
+            self._count('quote_hits')
+            return entry[1]
+
+        self._count('quote_misses')
+        tick = self.executor.symbol_info_tick(symbol)
+        if tick is None:
+            return None
+
+        quote = {
+            'bid': tick.bid,
+            'ask': tick.ask,
+            'time': tick.time,
+            'time_msc': tick.time_msc
+        }
+        self._quotes[symbol] = (time.monotonic(), quote)
+        return quote
+
+    def invalidate(self, symbol: str = None) -> None:
+        """
+        Drop cached data for one symbol or for all symbols.
+
+        Args:
+            symbol: Symbol to invalidate (optional, if None invalidates all)
+        """
+        if symbol is None:
+            self._static.clear()
+            self._quotes.clear()
+            self.logger.info("Symbol cache invalidated")
+        else:
+            self._static.pop(symbol, None)
+            self._quotes.pop(symbol, None)
+            self.logger.debug(f"Symbol cache invalidated for {symbol}")
+
+    def get_stats(self) -> Dict[str, Any]:
+        """
+        Get cache statistics.
+
+        Returns:
+            Statistics dictionary
+        """
+        with self._lock:
+            stats = dict(self._stats)
+        stats['static_entries'] = len(self._static)
+        stats['quote_entries'] = len(self._quotes)
+        stats['static_ttl'] = self.static_ttl
+        stats['quote_max_age_ms'] = int(self.quote_max_age * 1000)
+        return stats
+
+    def _count(self, counter: str) -> None:
+        """Increment a statistics counter."""
+        with self._lock:
+            self._stats[counter] += 1
@@ -0,0 +1,242 @@
+"""
+Tick Streamer for MT5 Trading HTTP Server.
+Polls ticks in the background into per-symbol ring buffers so pricing and
+quote endpoints never wait on the terminal.
+"""
+
+import logging
+import threading
+import time
+from typing import Dict, Any, Optional, List, Iterable
+import numpy as np
+from utils.logger import log_error_with_context
+
+
+TICK_DTYPE = np.dtype([
+    ('time_msc', 'i8'),
+    ('bid', 'f8'),
+    ('ask', 'f8'),
+    ('last', 'f8'),
+    ('volume', 'f8'),
+    ('received_at', 'f8')
+])
+
+
+class TickRingBuffer:
+    """
+    Fixed-size ring buffer of ticks for one symbol.
+
+    Written only by the streamer thread. The latest tick is published as an
+    immutable tuple reference, so readers never take a lock.
+    """
+
+    def __init__(self, size: int):
+        """
+        Initialize ring buffer.
+
+        Args:
+            size: Number of ticks retained
+        """
+        self.size = size
+        self._data = np.zeros(size, dtype=TICK_DTYPE)
+        self._count = 0
+        # (received_at monotonic, quote dict); replaced as a whole on every append
+        self.latest = None
+
+    def append(self, tick) -> bool:
+        """
+        Append a tick if it is newer than the last one recorded.
+
+        Args:
+            tick: MT5 tick object
+
+        Returns:
+            True if the tick was recorded
+        """
+        latest = self.latest
+        if latest is not None and tick.time_msc <= latest[1]['time_msc']:
+            return False
+
+        received_at = time.monotonic()
+        self._data[self._count % self.size] = (tick.time_msc, tick.bid, tick.ask,
+                                               tick.last, tick.volume, time.time())
+        self._count += 1
+        self.latest = (received_at, {
+            'bid': tick.bid,
+            'ask': tick.ask,
+            'time': tick.time,
+            'time_msc': tick.time_msc
+        })
+        return True
+
+    def recent(self, limit: int) -> List[Dict[str, Any]]:
+        """
+        Get the most recent ticks, oldest first.
+
+        Args:
+            limit: Maximum number of ticks
+
+        Returns:
+            List of tick dictionaries
+        """
+        count = self._count
+        limit = max(0, min(limit, count, self.size))
+        rows = self._data[np.arange(count - limit, count) % self.size]
+        return [
+            {
+                'time_msc': int(row['time_msc']),
+                'bid': float(row['bid']),
+                'ask': float(row['ask']),
+                'last': float(row['last']),
+                'volume': float(row['volume']),
+                'received_at': float(row['received_at'])
+            }
+            for row in rows
+        ]
+
+    def __len__(self) -> int:
+        return min(self._count, self.size)
+
+
+class TickStreamer:
+    """Background poller of symbol_info_tick for configured and recently traded symbols."""
+
+    def __init__(self, mt5_connector, config: Dict[str, Any] = None, symbols: Iterable[str] = None):
+        """
+        Initialize tick streamer.
+
+        Args:
+            mt5_connector: MT5Connector instance
+            config: Tick stream configuration dictionary (optional)
+            symbols: Symbols always streamed, e.g. trading.allowed_symbols (optional)
+        """
+        config = config or {}
+        self.mt5_connector = mt5_connector
+        self.logger = logging.getLogger('mt5_server.ticks')
+        self.enabled = config.get('enabled', True)
+        self.poll_interval = config.get('poll_interval_ms', 100) / 1000.0
+        self.buffer_size = config.get('buffer_size', 4096)
+        self.max_age = config.get('max_age_ms', 1000) / 1000.0
+        self.recent_symbol_ttl = config.get('recent_symbol_ttl', 3600)
+
+        self._symbols = set(symbols or [])
+        self._recent: Dict[str, float] = {}
+        self._buffers: Dict[str, TickRingBuffer] = {}
+        self._stop = threading.Event()
+        self._thread = None
+        self._stats = {'polls': 0, 'ticks': 0, 'errors': 0}
+
+    def start(self) -> None:
+        """Start the polling thread."""
+        if not self.enabled or (self._thread and self._thread.is_alive()):
+            return
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._run, name='mt5-ticks', daemon=True)
+        self._thread.start()
+        self.logger.info(f"Tick streamer started, polling every {int(self.poll_interval * 1000)}ms")
+
+    def stop(self) -> None:
+        """Stop the polling thread."""
+        self._stop.set()
+        if self._thread:
+            self._thread.join(timeout=5)
+            self._thread = None
+
+    def track(self, symbol: str) -> None:
+        """
+        Add a symbol to the stream for the recent-symbol TTL.
+
+        Args:
+            symbol: Trading symbol
+        """
+        self._recent[symbol] = time.monotonic()
+
+    def latest(self, symbol: str) -> Optional[Dict[str, Any]]:
+        """
+        Get the latest streamed quote if it is within the freshness bound.
+
+        Args:
+            symbol: Trading symbol
+
+        Returns:
+            Quote dictionary or None if not streamed or stale
+        """
+        buffer = self._buffers.get(symbol)
+        latest = buffer.latest if buffer else None
+        if latest is None or time.monotonic() - latest[0] > self.max_age:
+            return None
+        return latest[1]
+
+    def history(self, symbol: str, limit: int = 100) -> List[Dict[str, Any]]:
+        """
+        Get recent streamed ticks for a symbol.
+
+        Args:
+            symbol: Trading symbol
+            limit: Maximum number of ticks
+
+        Returns:
+            List of tick dictionaries, oldest first
+        """
+        buffer = self._buffers.get(symbol)
+        return buffer.recent(limit) if buffer else []
+
+    def get_stats(self) -> Dict[str, Any]:
+        """
+        Get streamer statistics.
+
+        Returns:
+            Statistics dictionary
+        """
+        now = time.monotonic()
+        ages = {}
+        for symbol, buffer in list(self._buffers.items()):
+            latest = buffer.latest
+            if latest is not None:
+                ages[symbol] = int((now - latest[0]) * 1000)
+
+        stats = dict(self._stats)
+        stats['running'] = bool(self._thread and self._thread.is_alive())
+        stats['symbols'] = sorted(self._active_symbols())
+        stats['tick_age_ms'] = ages
+        return stats
+
+    def _active_symbols(self) -> set:
+        """Configured symbols plus symbols traded within the recent-symbol TTL."""
+        cutoff = time.monotonic() - self.recent_symbol_ttl
+        for symbol, last_used in list(self._recent.items()):
+            if last_used < cutoff:
+                self._recent.pop(symbol, None)
+        return self._symbols | set(self._recent)
+
+    def _run(self) -> None:
+        """Polling loop."""
+        while not self._stop.wait(self.poll_interval):
+            if not self.mt5_connector.is_connected():
+                continue
+            try:
+                self._poll()
+            except Exception as e:
+                self._stats['errors'] += 1
+                log_error_with_context(self.logger, e, "Tick polling failed")
+
+    def _poll(self) -> None:
+        """Fetch ticks for all active symbols in one executor batch."""
+        symbols = self._active_symbols()
+        if not symbols:
+            return
+
+        executor = self.mt5_connector.executor
+        futures = {symbol: executor.submit('symbol_info_tick', symbol) for symbol in symbols}
+        self._stats['polls'] += 1
+
+        for symbol, future in futures.items():
+            tick = future.result(timeout=executor.timeout)
+            if tick is None:
+                continue
+
+            buffer = self._buffers.get(symbol)
+            if buffer is None:
+                buffer = self._buffers[symbol] = TickRingBuffer(self.buffer_size)
+            if buffer.append(tick):
+                self._stats['ticks'] += 1
@@ -0,0 +1,518 @@
+"""
+Trade Journal for MT5 Trading HTTP Server.
+Append-only, time-partitioned JSONL journal of sent orders with sidecar indexes.
+"""
+
+import bisect
+import json
+import logging
+import os
+import struct
+import threading
+import time
+from collections import deque
+from contextlib import contextmanager
+from datetime import datetime, timezone
+from functools import wraps
+from typing import Dict, Any, Iterator, List, Optional, Tuple
+from utils.logger import log_error_with_context
+
+
+# Sparse time index entry: latest trade time of all records before the offset, byte offset
+TIME_INDEX_ENTRY = struct.Struct('<dQ')
+
+# Ticket index entry: order or position ticket, byte offset of the record
+TICKET_INDEX_ENTRY = struct.Struct('<qQ')
+
+# Segment file name format per partition size; partitions are UTC so DST never splits or merges them
+PARTITION_FORMATS = {'day': '%Y%m%d', 'hour': '%Y%m%d-%H'}
+PARTITION_SECONDS = {'day': 86400, 'hour': 3600}
+
+# Fixed record schema; every record carries every field, in this order
+RECORD_FIELDS = ('ts', 'time', 'job_id', 'ticket', 'position', 'position_by', 'symbol', 'side', 'volume',
+                 'requested_price', 'fill_price', 'magic', 'retcode', 'status', 'error', 'latency_ms')
+
+# Record status values
+STATUS_DONE = 'done'
+STATUS_REJECTED = 'rejected'
+STATUS_FAILED = 'failed'
+
+
+# Scheduled job the current thread is executing, if any
+_context = threading.local()
+
+
+@contextmanager
+def job_context(job_id: str, run_at: float, started_at: float):
+    """
+    Attribute orders sent inside the block to a scheduled job.
+
+    Args:
+        job_id: Job identifier (comma-separated for coalesced groups)
+        run_at: Scheduled execution timestamp
+        started_at: Timestamp the job was picked up by a worker
+    """
+    previous = getattr(_context, 'job', None)
+    _context.job = (job_id, run_at, started_at)
+    try:
+        yield
+    finally:
+        _context.job = previous
+
+
+def bind_job_context(func):
+    """
+    Carry the calling thread's job context into a function run on a worker pool.
+
+    Args:
+        func: Function to wrap
+
+    Returns:
+        Wrapper installing the captured context around each call
+    """
+    job = getattr(_context, 'job', None)
+    if job is None:
+        return func
+
+    @wraps(func)
+    def wrapper(*args, **kwargs):
+        with job_context(*job):
+            return func(*args, **kwargs)
+    return wrapper
+
+
+def elapsed_ms(start: float, end: float) -> float:
+    """Milliseconds between two perf_counter readings."""
+    return round((end - start) * 1000, 3)
+
+
+class TradeSegment:
+    """
+    One partition of the journal: a JSONL data file plus two sidecar indexes.
+
+    The ticket index (.tix) holds an entry for the order ticket and the
+    position tickets of every record. The time index (.tmx) is sparse: every
+    index_interval records it stores the byte offset and the latest trade time
+    of everything before it, so a time range query seeks straight to the
+    first block that can contain matching records even if a few records were
+    written slightly out of order.
+    """
+
+    def __init__(self, directory: str, name: str):
+        """
+        Describe a segment by its partition name.
+
+        Args:
+            directory: Journal directory
+            name: Partition name, e.g. 20240315 or 20240315-09
+        """
+        self.name = name
+        base = os.path.join(directory, f"trades-{name}")
+        self.path = base + '.jsonl'
+        self.ticket_index_path = base + '.tix'
+        self.time_index_path = base + '.tmx'
+        self.start, self.end = self.partition_range(name)
+
+        self._data = None
+        self._ticket_index = None
+        self._time_index = None
+        self.size = 0
+        self.count = 0
+        self.max_ts = 0.0
+
+    @staticmethod
+    def partition_range(name: str) -> Tuple[float, float]:
+        """
+        Get the UTC time range covered by a partition name.
+
+        Args:
+            name: Partition name
+
+        Returns:
+            (start timestamp, end timestamp)
+
+        Raises:
+            ValueError: If the name is not a partition name
+        """
+        kind = 'hour' if '-' in name else 'day'
+        start = datetime.strptime(name, PARTITION_FORMATS[kind]).replace(tzinfo=timezone.utc).timestamp()
+        return start, start + PARTITION_SECONDS[kind]
+
+    def open_for_append(self, index_interval: int) -> None:
+        """
+        Open the segment for writing, repairing it after an unclean shutdown.
+
+        A torn last line is truncated and both indexes are rebuilt from the
+        data file, so an index never points past or misses a record.
+
+        Args:
+            index_interval: Records between time index entries
+        """
+        entries: List[Tuple[int, float, Tuple[Optional[int], ...]]] = []
+        valid = 0
+        if os.path.exists(self.path):
+            with open(self.path, 'rb') as f:
+                offset = 0
+                for line in f:
+                    if not line.endswith(b'\n'):
+                        break
+                    try:
+                        record = json.loads(line)
+                        tickets = (record.get('ticket'), record.get('position'), record.get('position_by'))
+                        entries.append((offset, record['ts'], tickets))
+                    except (ValueError, KeyError):
+                        pass
+                    offset += len(line)
+                valid = offset
+            if valid < os.path.getsize(self.path):
+                with open(self.path, 'r+b') as f:
+                    f.truncate(valid)
+
+        self._data = open(self.path, 'ab')
+        self._ticket_index = open(self.ticket_index_path, 'wb')
+        self._time_index = open(self.time_index_path, 'wb')
+        self.size = valid
+        self.count = 0
+        self.max_ts = 0.0
+        for offset, ts, tickets in entries:
+            self._index(offset, ts, tickets, index_interval)
+        self.flush()
+
+    def append(self, line: bytes, ts: float, tickets: Tuple[Optional[int], ...], index_interval: int) -> None:
+        """Write one encoded record and its index entries (writer thread only)."""
+        offset = self.size
+        self._data.write(line)
+        self.size += len(line)
+        self._index(offset, ts, tickets, index_interval)
+
+    def flush(self) -> None:
+        """Flush the data file before the indexes; readers skip entries whose record is still incomplete."""
+        self._data.flush()
+        self._ticket_index.flush()
+        self._time_index.flush()
+
+    def close(self) -> None:
+        """Close all files."""
+        for f in (self._data, self._ticket_index, self._time_index):
+            if f is not None:
+                f.close()
+        self._data = self._ticket_index = self._time_index = None
+
+    def _index(self, offset: int, ts: float, tickets: Tuple[Optional[int], ...], index_interval: int) -> None:
+        """Add index entries for a record at the given offset."""
+        if self.count % index_interval == 0:
+            self._time_index.write(TIME_INDEX_ENTRY.pack(self.max_ts, offset))
+        for ticket in set(tickets):
+            if ticket:
+                self._ticket_index.write(TICKET_INDEX_ENTRY.pack(ticket, offset))
+        self.count += 1
+        self.max_ts = max(self.max_ts, ts)
+
+    def seek_offset(self, since: float) -> int:
+        """
+        Find where to start reading for records at or after a time.
+
+        Args:
+            since: Start timestamp
+
+        Returns:
+            Byte offset; every record before it is older than since
+        """
+        try:
+            with open(self.time_index_path, 'rb') as f:
+                entries = list(TIME_INDEX_ENTRY.iter_unpack(f.read()))
+        except OSError:
+            return 0
+        position = bisect.bisect_left([max_ts for max_ts, _ in entries], since) - 1
+        return entries[position][1] if position >= 0 else 0
+
+    def ticket_offsets(self, ticket: int) -> List[int]:
+        """
+        Find the records of an order or position ticket.
+
+        Args:
+            ticket: Order or position ticket
+
+        Returns:
+            Sorted byte offsets of matching records
+        """
+        try:
+            with open(self.ticket_index_path, 'rb') as f:
+                data = f.read()
+        except OSError:
+            return []
+        return sorted({offset for key, offset in TICKET_INDEX_ENTRY.iter_unpack(data) if key == ticket})
+
+
+class TradeJournal:
+    """
+    Structured journal of every order sent to MT5.
+
+    Each market order, close, close-by and modification is recorded with a
+    fixed schema: tickets, symbol, side, requested and fill price, volume,
+    retcode and per-stage latency. Recording only appends to an in-memory
+    queue; a writer thread encodes and appends batches to the segment of the
+    record's UTC day (or hour) and maintains the sidecar indexes. Queries
+    read segments line by line through the indexes and never load a whole
+    file.
+    """
+
+    def __init__(self, config: Dict[str, Any] = None):
+        """
+        Initialize trade journal.
+
+        Args:
+            config: Trade journal configuration dictionary (optional)
+        """
+        config = config or {}
+        self.logger = logging.getLogger('mt5_server.trade_journal')
+        self.enabled = config.get('enabled', True)
+        self.directory = config.get('directory', 'trades')
+        self.partition = config.get('partition', 'day')
+        self.flush_interval = config.get('flush_interval_ms', 50) / 1000.0
+        self.max_pending = config.get('max_pending', 10000)
+        self.index_interval = config.get('index_interval', 64)
+
+        self._pending = deque()
+        self._segments: Dict[str, TradeSegment] = {}
+        self._lock = threading.Lock()
+        self._write_lock = threading.Lock()
+        self._stop = threading.Event()
+        self._thread = None
+        self._stats = {'recorded': 0, 'written': 0, 'dropped': 0, 'write_errors': 0, 'batches': 0, 'queries': 0}
+
+    def start(self) -> None:
+        """Start the writer thread."""
+        os.makedirs(self.directory, exist_ok=True)
+        if self._thread and self._thread.is_alive():
+            return
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._run, name='mt5-trade-journal', daemon=True)
+        self._thread.start()
+        self.logger.info(f"Trade journal started in {self.directory}, {self.partition} partitions")
+
+    def stop(self) -> None:
+        """Write outstanding records and close all segments."""
+        self._stop.set()
+        if self._thread:
+            self._thread.join(timeout=5)
+            self._thread = None
+        self.flush()
+        with self._write_lock:
+            for segment in self._segments.values():
+                segment.close()
+            self._segments.clear()
+
+    def record_order(self, side: str, request: Dict[str, Any], result=None, status: str = STATUS_DONE,
+                     latency_ms: Dict[str, float] = None, error: str = None, volume: float = None) -> None:
+        """
+        Record one order sent to MT5.
+
+        Args:
+            side: buy, sell, close, close_by or modify
+            request: MT5 order request dictionary
+            result: order_send result (optional, None if no result was returned)
+            status: done, rejected or failed
+            latency_ms: Stage latencies in milliseconds (optional)
+            error: Error message for rejected or failed orders (optional)
+            volume: Volume override for requests without a volume field (optional)
+        """
+        ts = time.time()
+        latency = dict(latency_ms) if latency_ms else {}
+        job = getattr(_context, 'job', None)
+        job_id = None
+        if job is not None:
+            job_id, run_at, started_at = job
+            latency['dispatch'] = round((started_at - run_at) * 1000, 3)
+
+        record = (
+            round(ts, 6),
+            datetime.fromtimestamp(ts).isoformat(),
+            job_id,
+            getattr(result, 'order', None) or None,
+            request.get('position'),
+            request.get('position_by'),
+            request.get('symbol'),
+            side,
+            volume if volume is not None else request.get('volume'),
+            request.get('price'),
+            getattr(result, 'price', None) or None,
+            request.get('magic'),
+            getattr(result, 'retcode', None),
+            status,
+            error,
+            latency
+        )
+
+        with self._lock:
+            if len(self._pending) >= self.max_pending:
+                self._stats['dropped'] += 1
+                return
+            self._pending.append(record)
+            self._stats['recorded'] += 1
+
+    def flush(self) -> None:
+        """Write every record recorded so far."""
+        with self._write_lock:
+            with self._lock:
+                batch, self._pending = self._pending, deque()
+            if batch:
+                self._write_batch(batch)
+
+    def query(self, since: float = None, until: float = None, ticket: int = None,
+              filters: Dict[str, Any] = None, limit: int = None) -> Iterator[bytes]:
+        """
+        Stream matching records as JSON lines, oldest partition first.
+
+        Ticket lookups go through the ticket index; time ranges select
+        partitions by name and seek through the time index. Field filters are
+        matched against the encoded bytes before a line is decoded.
+
+        Args:
+            since: Earliest trade timestamp (optional)
+            until: Latest trade timestamp (optional)
+            ticket: Order or position ticket (optional)
+            filters: Exact field values, e.g. {'symbol': 'XAUUSD', 'magic': 12345} (optional)
+            limit: Maximum records to return (optional)
+
+        Yields:
+            Encoded records, each ending in a newline
+        """
+        with self._lock:
+            self._stats['queries'] += 1
+
+        patterns = [self._field_bytes(field, value) for field, value in (filters or {}).items()]
+        returned = 0
+        for segment in self._query_segments(since, until):
+            for offset, line in self._scan(segment, since, ticket):
+                if not all(pattern in line for pattern in patterns):
+                    continue
+                ts = self._line_ts(line)
+                if (since is not None and ts < since) or (until is not None and ts > until):
+                    continue
+                # The byte pattern may also occur inside another field; confirm on the decoded record
+                if patterns and not self._matches(json.loads(line), filters):
+                    continue
+                yield line
+                returned += 1
+                if limit is not None and returned >= limit:
+                    return
+
+    def get_stats(self) -> Dict[str, Any]:
+        """
+        Get journal statistics.
+
+        Returns:
+            Statistics dictionary
+        """
+        with self._lock:
+            stats = dict(self._stats)
+            stats['pending'] = len(self._pending)
+        stats['open_segments'] = sorted(self._segments)
+        stats['directory'] = self.directory
+        stats['partition'] = self.partition
+        return stats
+
+    def _run(self) -> None:
+        """Writer loop."""
+        while not self._stop.wait(self.flush_interval):
+            try:
+                self.flush()
+            except Exception as e:
+                log_error_with_context(self.logger, e, "Trade journal write failed")
+
+    def _write_batch(self, batch: deque) -> None:
+        """Encode and append a batch of records (caller holds the write lock)."""
+        touched = {}
+        written = 0
+        try:
+            for record in batch:
+                segment = self._segment_for(record[0])
+                line = json.dumps(dict(zip(RECORD_FIELDS, record)), ensure_ascii=False,
+                                  separators=(',', ':'), default=str).encode('utf-8') + b'\n'
+                segment.append(line, record[0], record[3:6], self.index_interval)
+                touched[segment.name] = segment
+                written += 1
+        finally:
+            for segment in touched.values():
+                segment.flush()
+            with self._lock:
+                self._stats['written'] += written
+                self._stats['write_errors'] += len(batch) - written
+                self._stats['batches'] += 1
+
+        # Keep only the newest partition open; late records reopen older ones on demand
+        if len(self._segments) > 1:
+            latest = max(self._segments)
+            for name in [name for name in self._segments if name != latest]:
+                self._segments.pop(name).close()
+
+    def _segment_for(self, ts: float) -> TradeSegment:
+        """Get the open segment for a trade timestamp, opening it if needed (writer only)."""
+        name = datetime.fromtimestamp(ts, timezone.utc).strftime(PARTITION_FORMATS[self.partition])
+        segment = self._segments.get(name)
+        if segment is None:
+            segment = TradeSegment(self.directory, name)
+            segment.open_for_append(self.index_interval)
+            self._segments[name] = segment
+        return segment
+
+    def _query_segments(self, since: Optional[float], until: Optional[float]) -> List[TradeSegment]:
+        """List the segments overlapping a time range, oldest first."""
+        try:
+            names = os.listdir(self.directory)
+        except OSError:
+            return []
+
+        segments = []
+        for filename in names:
+            if not (filename.startswith('trades-') and filename.endswith('.jsonl')):
+                continue
+            try:
+                segment = TradeSegment(self.directory, filename[len('trades-'):-len('.jsonl')])
+            except ValueError:
+                continue
+            if (since is not None and segment.end <= since) or (until is not None and segment.start > until):
+                continue
+            segments.append(segment)
+        return sorted(segments, key=lambda segment: segment.start)
+
+    @staticmethod
+    def _scan(segment: TradeSegment, since: Optional[float], ticket: Optional[int]) -> Iterator[Tuple[int, bytes]]:
+        """Yield (offset, line) for the candidate records of one segment."""
+        try:
+            f = open(segment.path, 'rb')
+        except OSError:
+            return
+        with f:
+            if ticket is not None:
+                for offset in segment.ticket_offsets(ticket):
+                    f.seek(offset)
+                    line = f.readline()
+                    if line.endswith(b'\n'):
+                        yield offset, line
+                return
+
+            offset = segment.seek_offset(since) if since is not None else 0
+            f.seek(offset)
+            for line in f:
+                # A line still being written by the writer thread is not complete yet
+                if not line.endswith(b'\n'):
+                    return
+                yield offset, line
+                offset += len(line)
+
+    @staticmethod
+    def _line_ts(line: bytes) -> float:
+        """Read the leading ts field without decoding the record."""
+        return float(line[6:line.index(b',', 6)])
+
+    @staticmethod
+    def _field_bytes(field: str, value: Any) -> bytes:
+        """Encoded form of a field as it appears in a record line."""
+        return f'"{field}":{json.dumps(value, ensure_ascii=False)}'.encode('utf-8')
+
+    @staticmethod
+    def _matches(record: Dict[str, Any], filters: Dict[str, Any]) -> bool:
+        """Check decoded field values."""
+        return all(record.get(field) == value for field, value in filters.items())
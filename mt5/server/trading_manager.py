@@ -3,16 +3,21 @@ Trading Manager for MT5 Trading HTTP Server.
 Handles trade execution and management operations.
 """
 
-import MetaTrader5 as mt5
+from mt5_backend import mt5
 import logging
 import re
 from typing import Dict, Any, Optional, List
 from datetime import datetime, time, timezone, timedelta
 import pytz
 from functools import wraps
-from utils.exceptions import TradingError, ValidationError, ConnectionError
-from utils.validators import validate_trade_parameters, sanitize_comment
+from time import perf_counter
+from close_engine import CloseEngine
+from utils.trading_hours import TradingHoursBitmap
+from utils.exceptions import TradingError, ValidationError, ConnectionError, OutcomeUnknownError
+from utils.validators import compile_trade_validator, sanitize_comment
 from utils.logger import log_trade_operation, log_error_with_context
+from utils.tracing import tracer
+from trade_journal import STATUS_DONE, STATUS_REJECTED, STATUS_FAILED, elapsed_ms
 
 
 def auto_reconnect_trading(func):
@@ -22,15 +27,19 @@ def auto_reconnect_trading(func):
     @wraps(func)
     def wrapper(self, *args, **kwargs):
         try:
-            # Check connection before attempting operation
+            # Check cached connection state before attempting operation
             if not self.mt5_connector.is_connected():
                 self.logger.warning(f"MT5 not connected before {func.__name__}, attempting to reconnect...")
-                if not self.mt5_connector.connect():
+                if not self.mt5_connector.ensure_connected():
                     raise ConnectionError(f"MT5 connection failed before {func.__name__}")
 
             # First attempt
             return func(self, *args, **kwargs)
         except Exception as e:
+            # A write that may have filled must not be sent again
+            if isinstance(e, OutcomeUnknownError):
+                raise
+
             # Check if it's a connection-related error
             error_str = str(e).lower()
             if (not self.mt5_connector.is_connected() or
@@ -38,12 +47,12 @@ def auto_reconnect_trading(func):
                 "connection" in error_str or
                 isinstance(e, ConnectionError)):
 
-                self.logger.warning(f"MT5 connection lost during {func.__name__}, attempting to reconnect...")
+                self.logger.warning(f"MT5 connection lost during {func.__name__}, attempting to recover...")
 
-                # Attempt to reconnect
-                if self.mt5_connector.connect():
-                    self.logger.info(f"MT5 reconnection successful, retrying {func.__name__}")
-                    # Retry the operation after successful reconnection
+                # Probe the terminal, reconnecting only if the probe fails
+                if self.mt5_connector.recover(f"{func.__name__}: {e}"):
+                    self.logger.info(f"MT5 connection recovered, retrying {func.__name__}")
+                    # Retry the operation after successful recovery
                     return func(self, *args, **kwargs)
                 else:
                     self.logger.error(f"MT5 reconnection failed for {func.__name__}")
@@ -56,6 +65,13 @@ def auto_reconnect_trading(func):
 
 class TradingManager:
     """Manages trading operations through MT5."""
+
+    # close_type -> MT5 position type
+    CLOSE_TYPES = {'long': 0, 'short': 1}
+
+    # action -> IPC accounting scope (budgets are configured per scope)
+    IPC_SCOPES = {'buy': 'market_order', 'sell': 'market_order', 'close': 'close',
+                  'close_all': 'close_all', 'modify': 'modify'}
     
     def __init__(self, mt5_connector, config: Dict[str, Any]):
         """
@@ -69,8 +85,18 @@ class TradingManager:
         self.config = config
         self.logger = logging.getLogger('mt5_server.trading')
 
-        # Get custom intervals from config
+        # Get custom intervals from config, compiled into a minute lookup table
         self.custom_intervals = config.get('custom_intervals', {})
+        self.trading_hours = TradingHoursBitmap(self.custom_intervals, self._parse_timezone)
+
+        # Volume and symbol limits compiled once from the trading configuration
+        self._check_trade = compile_trade_validator(config)
+
+        # Bulk close pipeline shared by close and close_all
+        self.close_engine = CloseEngine(mt5_connector, config, self._get_optimal_filling_mode)
+
+        # Structured record of every order sent (optional, see attach_trade_journal)
+        self.trade_journal = None
 
     @staticmethod
     def _parse_timezone(timezone_str: str):
@@ -108,6 +134,38 @@ class TradingManager:
         except pytz.exceptions.UnknownTimeZoneError:
             raise ValidationError(f"Invalid timezone: {timezone_str}. Use standard names like 'Asia/Shanghai' or GMT+/-N format like 'GMT+8'")
 
+    def attach_trade_journal(self, trade_journal) -> None:
+        """
+        Record every order sent, including closes, in a trade journal.
+
+        Args:
+            trade_journal: Started TradeJournal instance
+        """
+        self.trade_journal = trade_journal
+        self.close_engine.trade_journal = trade_journal
+
+    def reload_config(self, config: Dict[str, Any]) -> None:
+        """
+        Apply a reloaded trading configuration: limits, defaults and trading hours.
+
+        Args:
+            config: New trading configuration dictionary, including custom_intervals
+        """
+        self.config = config
+        self._check_trade = compile_trade_validator(config)
+        self.reload_intervals(config.get('custom_intervals', {}))
+
+    def reload_intervals(self, custom_intervals: Dict[str, Any]) -> None:
+        """
+        Replace custom intervals and recompile the trading hours table.
+
+        Args:
+            custom_intervals: New custom_intervals configuration section
+        """
+        self.custom_intervals = custom_intervals or {}
+        self.trading_hours = TradingHoursBitmap(self.custom_intervals, self._parse_timezone)
+        self.logger.info(f"Trading hours recompiled from {len(self.trading_hours.intervals)} intervals")
+
     def _is_trading_time_allowed(self) -> bool:
         """
         Check if trading is currently allowed based on custom intervals.
@@ -120,41 +178,12 @@ class TradingManager:
             return False
 
         try:
-            self.logger.info(f"Checking {len(self.custom_intervals)} custom intervals")
-
-            # Check each custom interval
-            for interval_id, interval in self.custom_intervals.items():
-                self.logger.info(f"Checking interval {interval_id}: {interval['name']}")
-
-                # Get current time in the interval's timezone
-                tz = self._parse_timezone(interval['timezone'])
-                current_time = datetime.now(tz).time()
+            if self.logger.isEnabledFor(logging.DEBUG):
+                self.logger.debug(f"Trading hours check: {self.trading_hours.explain()}")
 
-                self.logger.info(f"Current time in {interval['timezone']}: {current_time}")
+            if self.trading_hours.is_allowed():
+                return True
 
-                # Parse interval times
-                start_time = datetime.strptime(interval['start_time'], "%H:%M").time()
-                end_time = datetime.strptime(interval['end_time'], "%H:%M").time()
-
-                self.logger.info(f"Interval time: {start_time} - {end_time}")
-
-                # Check if current time is within this interval
-                if start_time <= end_time:
-                    # Same day trading hours (e.g., 09:00 - 17:00)
-                    is_within = start_time <= current_time <= end_time
-                    self.logger.info(f"Same day check: {start_time} <= {current_time} <= {end_time} = {is_within}")
-                    if is_within:
-                        self.logger.info(f"Trading allowed in interval {interval_id} ({interval['name']})")
-                        return True
-                else:
-                    # Overnight trading hours (e.g., 22:00 - 06:00)
-                    is_within = current_time >= start_time or current_time <= end_time
-                    self.logger.info(f"Overnight check: {current_time} >= {start_time} OR {current_time} <= {end_time} = {is_within}")
-                    if is_within:
-                        self.logger.info(f"Trading allowed in interval {interval_id} ({interval['name']})")
-                        return True
-
-            # No intervals allow trading at current time
             self.logger.warning("Trading not allowed at current time - no intervals matched")
             return False
 
@@ -163,6 +192,7 @@ class TradingManager:
             # If there's an error, deny trading to be safe
             return False
         
+    @tracer.trace('execute')
     def execute_webhook_trade(self, payload: Dict[str, Any]) -> Dict[str, Any]:
         """
         Execute trade based on webhook payload.
@@ -176,12 +206,11 @@ class TradingManager:
         try:
             action = payload['action'].lower()
             symbol = payload['symbol'].upper()
+            tracer.label(action, symbol)
 
             # Check if time interval check is enabled
             if payload.get('enable_time_check'):
-                self.logger.info(f"Time interval check enabled for {action} {symbol}")
                 is_allowed = self._is_trading_time_allowed()
-                self.logger.info(f"Time check result: {is_allowed}")
                 if not is_allowed:
                     error_msg = {
                         'success': False,
@@ -192,18 +221,20 @@ class TradingManager:
                     self.logger.warning(f"Time check blocked trading: {error_msg}")
                     return error_msg
 
-            # Route to appropriate handler
-            if action in ['buy', 'sell']:
-                return self._execute_market_order(payload)
-            elif action == 'close':
-                return self._close_position(payload)
-            elif action == 'close_all':
-                return self._close_all_positions(payload.get('symbol'))
-            elif action == 'modify':
-                return self._modify_position(payload)
-            else:
+            if action not in self.IPC_SCOPES:
                 raise ValidationError(f"Unsupported action: {action}")
 
+            # Route to appropriate handler, counting its terminal calls against the action's budget
+            with self.mt5_connector.executor.scope(self.IPC_SCOPES[action]):
+                if action in ['buy', 'sell']:
+                    return self._execute_market_order(payload)
+                elif action == 'close':
+                    return self._close_position(payload)
+                elif action == 'close_all':
+                    return self._close_all_positions(payload.get('symbol'))
+                else:
+                    return self._modify_position(payload)
+
         except Exception as e:
             log_error_with_context(self.logger, e, "Webhook trade execution failed", payload=payload)
             raise
@@ -231,12 +262,15 @@ class TradingManager:
         Returns:
             Order execution result
         """
+        started = perf_counter()
         action = payload['action'].lower()
         symbol = payload['symbol'].upper()
         volume = payload.get('volume', self.config.get('default_volume', 0.1))
         
         # Validate parameters
-        validate_trade_parameters(symbol, volume, action, self.config)
+        errors = self._check_trade(symbol, volume, action)
+        if errors:
+            raise ValidationError('; '.join(errors))
         
         # Check symbol availability
         if not self.mt5_connector.check_symbol_availability(symbol):
@@ -249,6 +283,7 @@ class TradingManager:
         
         # Validate and adjust volume
         volume = self._validate_and_adjust_volume(volume, symbol_info)
+        tracer.mark('order.validate')
         
         # Prepare order request
         order_type = mt5.ORDER_TYPE_BUY if action == 'buy' else mt5.ORDER_TYPE_SELL
@@ -260,13 +295,8 @@ class TradingManager:
         magic = payload.get('magic', self.config.get('magic_number', 12345))
         comment = sanitize_comment(payload.get('comment', 'Webhook Trade'))
 
-        # Get MT5 symbol info object for filling mode
-        mt5_symbol_info = mt5.symbol_info(symbol)
-        if mt5_symbol_info is None:
-            raise TradingError(f"Failed to get MT5 symbol info for {symbol}")
-
         # Determine appropriate filling mode based on symbol support
-        filling_mode = self._get_optimal_filling_mode(mt5_symbol_info)
+        filling_mode = self._get_optimal_filling_mode(symbol_info)
 
         # Create order request
         request = {
@@ -289,18 +319,27 @@ class TradingManager:
             request['deviation'] = max_slippage
         
         # Execute order
-        self.logger.info(f"Sending order request: {request}")
-        result = mt5.order_send(request)
+        self.logger.info("Sending order request: %s", request)
+        tracer.mark('order.prepare')
+        sent = perf_counter()
+        result = self.mt5_connector.executor.order_send(request)
+        tracer.mark('order.send')
+        latency = {'prepare': elapsed_ms(started, sent), 'send': elapsed_ms(sent, perf_counter())}
 
         if result is None:
-            last_error = mt5.last_error()
+            last_error = self.mt5_connector.executor.last_error()
             error_msg = f"Failed to send order - no result returned. Last error: {last_error}"
             self.logger.error(error_msg)
+            self.mt5_connector.report_failure(error_msg)
+            self._journal(action, request, None, STATUS_FAILED, latency, error_msg)
             raise TradingError(error_msg)
         
         if result.retcode != mt5.TRADE_RETCODE_DONE:
             error_msg = f"Order failed: {result.retcode} - {result.comment}"
+            self._journal(action, request, result, STATUS_REJECTED, latency, error_msg)
             raise TradingError(error_msg)
+
+        self._journal(action, request, result, STATUS_DONE, latency)
         
         # Log successful trade
         log_trade_operation(
@@ -325,7 +364,10 @@ class TradingManager:
     @auto_reconnect_trading
     def _close_position(self, payload: Dict[str, Any]) -> Dict[str, Any]:
         """
-        Close specific position.
+        Close specific position, or all positions of the symbol.
+
+        Honors close_type (long/short); a full close of both directions nets
+        opposite positions with close-by orders on hedging accounts.
         
         Args:
             payload: Close payload
@@ -348,88 +390,26 @@ class TradingManager:
             if not position:
                 raise TradingError(f"Position with ticket {ticket} not found")
             positions = [position]
-        
-        results = []
-        for position in positions:
-            try:
-                # Determine close volume
-                close_volume = volume if volume else position['volume']
-                if close_volume > position['volume']:
-                    close_volume = position['volume']
-                
-                # Determine order type (opposite of position)
-                order_type = mt5.ORDER_TYPE_SELL if position['type'] == 0 else mt5.ORDER_TYPE_BUY
-                
-                # Get current price
-                symbol_info = self.mt5_connector.get_symbol_info(symbol)
-                if not symbol_info:
-                    raise TradingError(f"Failed to get symbol info for {symbol}")
-                
-                price = symbol_info['bid'] if position['type'] == 0 else symbol_info['ask']
-
-                # Get MT5 symbol info for filling mode
-                mt5_symbol_info = mt5.symbol_info(symbol)
-                if mt5_symbol_info is None:
-                    raise TradingError(f"Failed to get MT5 symbol info for {symbol}")
-
-                filling_mode = self._get_optimal_filling_mode(mt5_symbol_info)
-
-                # Create close request
-                request = {
-                    'action': mt5.TRADE_ACTION_DEAL,
-                    'symbol': symbol,
-                    'volume': close_volume,
-                    'type': order_type,
-                    'position': position['ticket'],
-                    'price': price,
-                    'magic': position['magic'],
-                    'comment': f"Close {position['ticket']}",
-                    'type_time': mt5.ORDER_TIME_GTC,
-                    'type_filling': filling_mode,
-                }
-                
-                # Execute close order
-                result = mt5.order_send(request)
-                
-                if result is None:
-                    raise TradingError(f"Failed to close position {position['ticket']} - no result")
-                
-                if result.retcode != mt5.TRADE_RETCODE_DONE:
-                    raise TradingError(f"Failed to close position {position['ticket']}: {result.comment}")
-                
-                # Log successful close
-                log_trade_operation(
-                    self.logger, 'close', symbol, close_volume,
-                    result.price, f"Success - Closed ticket: {position['ticket']}"
-                )
-                
-                results.append({
-                    'original_ticket': position['ticket'],
-                    'close_ticket': result.order,
-                    'symbol': symbol,
-                    'volume': close_volume,
-                    'price': result.price,
-                    'profit': position['profit'],
-                    'retcode': result.retcode,
-                    'timestamp': datetime.now().isoformat()
-                })
-                
-            except Exception as e:
-                log_error_with_context(
-                    self.logger, e, f"Failed to close position {position['ticket']}"
-                )
-                results.append({
-                    'original_ticket': position['ticket'],
-                    'error': str(e),
-                    'timestamp': datetime.now().isoformat()
-                })
-        
-        return {'closed_positions': results}
+
+        # 平多/平空: only close positions in the requested direction
+        close_type = payload.get('close_type')
+        if close_type:
+            position_type = self.CLOSE_TYPES.get(close_type)
+            if position_type is None:
+                raise ValidationError(f"Invalid close_type: {close_type}. Must be one of {list(self.CLOSE_TYPES)}")
+            positions = [p for p in positions if p['type'] == position_type]
+            if not positions:
+                raise TradingError(f"No open {close_type} positions found for {symbol}")
+        
+        return self.close_engine.close_positions(positions, volume)
     
     @auto_reconnect_trading
     def _close_all_positions(self, symbol: str = None) -> Dict[str, Any]:
         """
         Close all positions for symbol or all symbols.
+
+        Uses a single positions snapshot; positions are closed in parallel,
+        grouped by symbol.
         
         Args:
             symbol: Symbol to close (optional, if None closes all)
@@ -441,27 +421,46 @@ class TradingManager:
         if not positions:
             return {'message': 'No positions to close', 'closed_positions': []}
         
-        results = []
-        for position in positions:
-            try:
-                close_payload = {
-                    'symbol': position['symbol'],
-                    'ticket': position['ticket']
-                }
-                result = self._close_position(close_payload)
-                results.extend(result['closed_positions'])
-            except Exception as e:
-                log_error_with_context(
-                    self.logger, e, f"Failed to close position {position['ticket']}"
-                )
-                results.append({
-                    'original_ticket': position['ticket'],
-                    'error': str(e),
-                    'timestamp': datetime.now().isoformat()
-                })
-        
-        return {'closed_positions': results}
+        return self.close_engine.close_positions(positions)
     
+    @auto_reconnect_trading
+    def rollback_entries(self, results: List[Dict[str, Any]]) -> Dict[str, Any]:
+        """
+        Close the volume opened by filled entry orders, e.g. of a failed atomic batch.
+
+        Args:
+            results: Market order results of the filled entries
+
+        Returns:
+            Close operation result
+        """
+        # Atomic batch legs are never coalesced, so each result owns its whole fill
+        volumes = {}
+        for result in results:
+            ticket = result.get('ticket')
+            volume = result.get('volume')
+            if ticket and volume:
+                volumes[ticket] = round(volumes.get(ticket, 0) + volume, 8)
+
+        if not volumes:
+            return {'message': 'No filled entries to roll back', 'closed_positions': []}
+
+        # Close exactly the volume each entry opened; partial amounts rule out close-by netting
+        positions = [
+            dict(position, volume=min(position['volume'], volumes[position['ticket']]))
+            for position in self.mt5_connector.get_positions()
+            if position['ticket'] in volumes
+        ]
+        result = self.close_engine.close_positions(positions, allow_close_by=False)
+
+        missing = sorted(set(volumes) - {position['ticket'] for position in positions})
+        if missing:
+            self.logger.warning(f"Rollback could not find positions for tickets: {missing}")
+            result['missing_tickets'] = missing
+
+        self.logger.info(f"Rolled back {len(positions)} entry positions")
+        return result
+
     @auto_reconnect_trading
     def _modify_position(self, payload: Dict[str, Any]) -> Dict[str, Any]:
         """
@@ -473,6 +472,7 @@ class TradingManager:
         Returns:
             Modify operation result
         """
+        started = perf_counter()
         symbol = payload['symbol'].upper()
         ticket = payload.get('ticket')
         new_sl = payload.get('sl') or payload.get('stop_loss')
@@ -501,13 +501,20 @@ class TradingManager:
         }
         
         # Execute modification
-        result = mt5.order_send(request)
+        sent = perf_counter()
+        result = self.mt5_connector.executor.order_send(request)
+        latency = {'prepare': elapsed_ms(started, sent), 'send': elapsed_ms(sent, perf_counter())}
         
         if result is None:
+            self.mt5_connector.report_failure(f"order_send returned no result modifying {ticket}")
+            self._journal('modify', request, None, STATUS_FAILED, latency, "No result")
             raise TradingError(f"Failed to modify position {ticket} - no result")
         
         if result.retcode != mt5.TRADE_RETCODE_DONE:
+            self._journal('modify', request, result, STATUS_REJECTED, latency, result.comment)
             raise TradingError(f"Failed to modify position {ticket}: {result.comment}")
+
+        self._journal('modify', request, result, STATUS_DONE, latency)
         
         self.logger.info(f"Position {ticket} modified successfully - SL: {new_sl}, TP: {new_tp}")
         
@@ -520,44 +527,50 @@ class TradingManager:
             'timestamp': datetime.now().isoformat()
         }
 
+    def _journal(self, side: str, request: Dict[str, Any], result, status: str,
+                 latency: Dict[str, float], error: str = None) -> None:
+        """Record a sent order in the trade journal, if one is attached."""
+        if self.trade_journal is not None:
+            self.trade_journal.record_order(side, request, result, status, latency, error)
+
     def _get_optimal_filling_mode(self, symbol_info):
         """
         Determine the optimal filling mode for the symbol.
 
         Args:
-            symbol_info: MT5 symbol info object
+            symbol_info: Symbol information dictionary
 
         Returns:
             Appropriate filling mode constant
         """
         try:
-            filling_mode_flags = symbol_info.filling_mode
+            filling_mode_flags = symbol_info['filling_mode']
 
-            self.logger.debug(f"Symbol {symbol_info.name} filling mode flags: {filling_mode_flags}")
+            self.logger.debug("Symbol %s filling mode flags: %s", symbol_info['name'], filling_mode_flags)
 
             # Check supported filling modes in order of preference
             # FOK (Fill or Kill) - preferred for most cases (flag value 1)
             if filling_mode_flags & 1:
-                self.logger.debug(f"Using FOK filling mode for {symbol_info.name}")
+                self.logger.debug("Using FOK filling mode for %s", symbol_info['name'])
                 return mt5.ORDER_FILLING_FOK
 
             # IOC (Immediate or Cancel) - second preference (flag value 2)
             elif filling_mode_flags & 2:
-                self.logger.debug(f"Using IOC filling mode for {symbol_info.name}")
+                self.logger.debug("Using IOC filling mode for %s", symbol_info['name'])
                 return mt5.ORDER_FILLING_IOC
 
             # Return - fallback option (flag value 4)
             elif filling_mode_flags & 4:
-                self.logger.debug(f"Using RETURN filling mode for {symbol_info.name}")
+                self.logger.debug("Using RETURN filling mode for %s", symbol_info['name'])
                 return mt5.ORDER_FILLING_RETURN
 
             else:
                 # If no specific mode is supported, try FOK as default
-                self.logger.warning(f"No specific filling mode found for {symbol_info.name}, using FOK as default")
+                self.logger.warning(f"No specific filling mode found for {symbol_info['name']}, using FOK as default")
                 return mt5.ORDER_FILLING_FOK
 
         except Exception as e:
-            self.logger.error(f"Error determining filling mode for {symbol_info.name}: {e}")
+            self.logger.error(f"Error determining filling mode for {symbol_info['name']}: {e}")
             # Fallback to FOK
             return mt5.ORDER_FILLING_FOK
 
@@ -4,10 +4,90 @@ Parses Chinese text commands into trading parameters.
 """
 
 import re
-from typing import Dict, Any, Optional, List
+from collections import deque
+from typing import Dict, Any, Optional, List, Tuple
 from utils.exceptions import ValidationError
 
 
+class KeywordAutomaton:
+    """
+    Aho-Corasick automaton over a fixed keyword set.
+
+    Built once; matching a text is a single pass over its characters,
+    independent of the number of keywords.
+    """
+
+    def __init__(self, keywords: Dict[str, str]):
+        """
+        Build the automaton.
+
+        Args:
+            keywords: Keyword -> kind mapping
+        """
+        self.keywords = keywords
+        self._goto: List[Dict[str, int]] = [{}]
+        self._fail: List[int] = [0]
+        self._output: List[List[str]] = [[]]
+
+        for keyword in keywords:
+            state = 0
+            for char in keyword:
+                next_state = self._goto[state].get(char)
+                if next_state is None:
+                    next_state = len(self._goto)
+                    self._goto[state][char] = next_state
+                    self._goto.append({})
+                    self._fail.append(0)
+                    self._output.append([])
+                state = next_state
+            self._output[state].append(keyword)
+
+        # 广度优先计算失败指针，并合并后缀关键词的输出
+        queue = deque(self._goto[0].values())
+        while queue:
+            state = queue.popleft()
+            for char, next_state in self._goto[state].items():
+                queue.append(next_state)
+                fail = self._fail[state]
+                while fail and char not in self._goto[fail]:
+                    fail = self._fail[fail]
+                target = self._goto[fail].get(char, 0)
+                # 根节点的子节点失败指针指向根
+                self._fail[next_state] = target if target != next_state else 0
+                self._output[next_state] = self._output[next_state] + self._output[self._fail[next_state]]
+
+    def longest_at(self, text: str) -> Dict[int, str]:
+        """
+        Find the longest keyword starting at each position, keeping only non-overlapping leftmost matches.
+
+        Args:
+            text: Text to scan
+
+        Returns:
+            Start index -> keyword
+        """
+        longest: Dict[int, str] = {}
+        state = 0
+        for index, char in enumerate(text):
+            while state and char not in self._goto[state]:
+                state = self._fail[state]
+            state = self._goto[state].get(char, 0)
+            for keyword in self._output[state]:
+                start = index - len(keyword) + 1
+                current = longest.get(start)
+                if current is None or len(keyword) > len(current):
+                    longest[start] = keyword
+
+        # 去掉被更靠左的匹配覆盖的关键词（如"强制平仓"中的"平仓"）
+        matches: Dict[int, str] = {}
+        covered = 0
+        for start in sorted(longest):
+            if start >= covered:
+                matches[start] = longest[start]
+                covered = start + len(longest[start])
+        return matches
+
+
 class ChineseMessageParser:
     """Parser for Chinese trading messages."""
     
@@ -64,10 +144,48 @@ class ChineseMessageParser:
         '开启时间区间': 'enable_time_check'
     }
     
+    # 多条指令分隔符
+    COMMAND_SEPARATORS = '\n\r;；'
+
+    # 数值类型参数
+    NUMERIC_PARAMS = ('volume', 'sl', 'tp', 'price', 'deviation', 'magic', 'ticket')
+
+    # 关键词自动机，首次使用时构建，所有实例共享
+    _automaton = None
+
     def __init__(self):
         """Initialize parser."""
-        pass
-    
+        if ChineseMessageParser._automaton is None:
+            keywords = {}
+            keywords.update({word: 'action' for word in self.ACTION_MAP})
+            keywords.update({word: 'param' for word in self.PARAM_MAP})
+            keywords.update({word: 'switch' for word in self.SWITCH_PARAMS})
+            ChineseMessageParser._automaton = KeywordAutomaton(keywords)
+        self.automaton = ChineseMessageParser._automaton
+
+    def split_commands(self, message: str) -> List[str]:
+        """
+        Split a message into individual commands on newlines or semicolons.
+
+        Args:
+            message: Chinese trading message, possibly holding several commands
+
+        Returns:
+            Non-empty commands in message order
+        """
+        commands = []
+        start = 0
+        for index, char in enumerate(message):
+            if char in self.COMMAND_SEPARATORS:
+                command = message[start:index].strip()
+                if command:
+                    commands.append(command)
+                start = index + 1
+        command = message[start:].strip()
+        if command:
+            commands.append(command)
+        return commands
+
     def parse_message(self, message: str) -> Dict[str, Any]:
         """
         Parse Chinese message into trading parameters.
@@ -90,22 +208,24 @@ class ChineseMessageParser:
             raise ValidationError("消息内容为空")
         
         # 分割消息为词组
-        parts = self._split_message(message)
-        if len(parts) < 1:
-            raise ValidationError("消息格式错误，至少需要操作方向")
+        tokens = self._tokenize(message)
 
-        # 检查是否包含"开启时间区间"开关参数
+        # "开启时间区间"开关可以出现在任意位置
         enable_time_check = False
-        if "开启时间区间" in parts:
-            enable_time_check = True
-            parts.remove("开启时间区间")  # 移除开关参数，继续解析其他部分
+        remaining = []
+        for token in tokens:
+            if token[0] == 'switch' and token[1] == '开启时间区间':
+                enable_time_check = True
+            else:
+                remaining.append(token)
+        tokens = remaining
 
-        if len(parts) < 1:
+        if len(tokens) < 1:
             raise ValidationError("消息格式错误，至少需要操作方向")
 
         # 解析操作方向
-        action_text = parts[0]
-        action = self._parse_action(action_text)
+        kind, text, value = tokens[0]
+        action = self._parse_action(text if value is None else f"{text}={value}")
 
         # 构建基础参数
         params = {
@@ -117,69 +237,149 @@ class ChineseMessageParser:
             params['enable_time_check'] = True
 
         # 普通交易命令，需要交易品种
-        if len(parts) < 2:
-            raise ValidationError(f"缺少交易品种 (action={action}, parts={len(parts)})")
+        if len(tokens) < 2 or tokens[1][0] != 'text':
+            raise ValidationError(f"缺少交易品种 (action={action}, parts={len(tokens)})")
 
         # 解析交易品种
-        symbol = parts[1].upper()
+        symbol = tokens[1][1].upper()
         if not self._is_valid_symbol(symbol):
             raise ValidationError(f"无效的交易品种: {symbol}")
 
         params['symbol'] = symbol
-        start_index = 2
         
         # 解析其他参数
-        for i in range(start_index, len(parts)):
-            part = parts[i]
-            self._parse_parameter(part, params)
+        for kind, text, value in tokens[2:]:
+            if kind == 'action':
+                raise ValidationError(f"一条指令只能包含一个操作方向: {text}，多条指令请用换行或;分隔")
+            if kind == 'param':
+                self._parse_key_value(text, value, params)
+            elif kind == 'switch':
+                self._parse_switch(text, params)
+            else:
+                self._parse_parameter(text, params)
         
         return params
-    
-    def _split_message(self, message: str) -> List[str]:
-        """Split message into parts."""
-        # 先检查是否以多词操作开头
-        multi_word_actions = ['开启时间区间']
-
-        for action in multi_word_actions:
-            if message.startswith(action):
-                # 找到多词操作，分割剩余部分
-                remaining = message[len(action):].strip()
-                if remaining:
-                    # 分割剩余参数
-                    remaining_parts = []
-                    current_part = ""
-
-                    for char in remaining:
-                        if char == ' ':
-                            if current_part:
-                                remaining_parts.append(current_part)
-                                current_part = ""
-                        else:
-                            current_part += char
-
-                    if current_part:
-                        remaining_parts.append(current_part)
-
-                    return [action] + remaining_parts
-                else:
-                    return [action]
 
-        # 普通分割逻辑
-        parts = []
-        current_part = ""
+    def parse_messages(self, message: str) -> List[Dict[str, Any]]:
+        """
+        Parse a message holding one or more commands into standard webhook parameters.
+
+        Args:
+            message: Chinese trading message, commands separated by newlines or semicolons
 
-        for char in message:
-            if char == ' ':
-                if current_part:
-                    parts.append(current_part)
-                    current_part = ""
-            else:
-                current_part += char
+        Returns:
+            Standard webhook parameters per command
+
+        Raises:
+            ValidationError: If any command is invalid
+        """
+        if not message or not isinstance(message, str):
+            raise ValidationError("消息不能为空")
+
+        commands = self.split_commands(message)
+        if not commands:
+            raise ValidationError("消息内容为空")
+
+        payloads = []
+        for index, command in enumerate(commands, 1):
+            try:
+                params = self.parse_message(command)
+                self.validate_params(params)
+            except ValidationError as e:
+                if len(commands) == 1:
+                    raise
+                raise ValidationError(f"第{index}条指令: {e}")
+            payloads.append(self.convert_to_standard_format(params))
+        return payloads
+
+    def _tokenize(self, command: str) -> List[Tuple[str, str, Optional[str]]]:
+        """
+        Tokenize one command in a single pass, with or without spaces.
+
+        Keywords are taken leftmost-longest (止损价格 wins over 止损). Text
+        between keywords is split on whitespace and on ASCII/Chinese
+        boundaries, so 开多XAUUSD仓位=0.1 reads as 开多, XAUUSD, 仓位=0.1.
+
+        Returns:
+            (kind, text, value) tuples; kind is action, param, switch or text
+        """
+        matches = self.automaton.longest_at(command)
+        tokens = []
+        length = len(command)
+        index = 0
 
-        if current_part:
-            parts.append(current_part)
+        while index < length:
+            char = command[index]
+            if char.isspace():
+                index += 1
+                continue
 
-        return parts
+            keyword = matches.get(index)
+            if keyword is not None:
+                kind = self.automaton.keywords[keyword]
+                index += len(keyword)
+                value = None
+                if kind == 'param':
+                    value_start = self._skip_assignment(command, index)
+                    if value_start is None:
+                        # 参数名后没有"="，按开关处理
+                        kind = 'switch'
+                    else:
+                        index = self._scan_value(command, value_start, self.PARAM_MAP[keyword], matches)
+                        value = command[value_start:index]
+                tokens.append((kind, keyword, value))
+                continue
+
+            # 自由文本：交易品种、未知键值对或未知开关
+            start = index
+            ascii_run = char.isascii()
+            index += 1
+            while index < length:
+                char = command[index]
+                if char.isspace() or index in matches:
+                    break
+                if char.isascii() != ascii_run and command[index - 1] != '=' and char != '=':
+                    break
+                index += 1
+            tokens.append(('text', command[start:index], None))
+
+        return tokens
+
+    @staticmethod
+    def _skip_assignment(command: str, index: int) -> Optional[int]:
+        """Return the index after '=' following a parameter name, or None if there is none."""
+        length = len(command)
+        while index < length and command[index] == ' ':
+            index += 1
+        if index < length and command[index] in '=＝':
+            index += 1
+            while index < length and command[index] == ' ':
+                index += 1
+            return index
+        return None
+
+    def _scan_value(self, command: str, index: int, param_name: str, matches: Dict[int, str]) -> int:
+        """
+        Find the end of a parameter value.
+
+        Numeric values end at the first non-ASCII character; text values end at
+        whitespace or where the next "参数=" begins, so keywords inside a
+        comment stay part of it.
+        """
+        length = len(command)
+        numeric = param_name in self.NUMERIC_PARAMS
+        while index < length:
+            char = command[index]
+            if char.isspace():
+                break
+            if numeric and not char.isascii():
+                break
+            keyword = matches.get(index)
+            if keyword is not None and self.automaton.keywords[keyword] == 'param' and \
+                    self._skip_assignment(command, index + len(keyword)) is not None:
+                break
+            index += 1
+        return index
     
     def _parse_action(self, action_text: str) -> str:
         """Parse action from Chinese text."""
@@ -235,9 +435,7 @@ class ChineseMessageParser:
             return None
         
         # 数值类型参数
-        numeric_params = ['volume', 'sl', 'tp', 'price', 'deviation', 'magic', 'ticket']
-        
-        if param_name in numeric_params:
+        if param_name in self.NUMERIC_PARAMS:
             try:
                 # 尝试转换为浮点数
                 if '.' in value:
@@ -311,6 +509,10 @@ class ChineseMessageParser:
         return standard_params
 
 
+# 解析器无状态，所有调用共享一个实例
+_parser = ChineseMessageParser()
+
+
 def parse_chinese_message(message: str) -> Dict[str, Any]:
     """
     Convenience function to parse Chinese message.
@@ -320,8 +522,24 @@ def parse_chinese_message(message: str) -> Dict[str, Any]:
         
     Returns:
         Standard webhook parameters
+
+    Raises:
+        ValidationError: If the message is invalid or holds more than one command
+    """
+    payloads = _parser.parse_messages(message)
+    if len(payloads) > 1:
+        raise ValidationError(f"消息包含{len(payloads)}条指令，多条指令请使用 /webhook/batch")
+    return payloads[0]
+
+
+def parse_chinese_messages(message: str) -> List[Dict[str, Any]]:
+    """
+    Convenience function to parse a Chinese message holding several commands.
+
+    Args:
+        message: Chinese trading message, commands separated by newlines or semicolons
+
+    Returns:
+        Standard webhook parameters per command
     """
-    parser = ChineseMessageParser()
-    params = parser.parse_message(message)
-    parser.validate_params(params)
-    return parser.convert_to_standard_format(params)
+    return _parser.parse_messages(message)
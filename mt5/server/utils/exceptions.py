@@ -18,6 +18,11 @@ class MT5Error(MT5ServerError):
     pass
 
 
+class OutcomeUnknownError(MT5Error):
+    """A write reached the terminal but its result was not observed in time."""
+    pass
+
+
 class ValidationError(MT5ServerError):
     """Data validation errors."""
     pass
@@ -0,0 +1,236 @@
+"""
+IP allowlist for MT5 Trading HTTP Server.
+Compiles allowed IPs and CIDR ranges into sorted integer ranges matched by binary search.
+"""
+
+import bisect
+import ipaddress
+import logging
+import threading
+from collections import OrderedDict
+from typing import Dict, Any, Iterable, List, Optional, Tuple, Union
+from utils.exceptions import ValidationError
+
+
+IPAddress = Union[ipaddress.IPv4Address, ipaddress.IPv6Address]
+
+
+def parse_ip(value: str) -> Optional[IPAddress]:
+    """
+    Parse an IP address, unwrapping IPv4-mapped IPv6 addresses.
+
+    Args:
+        value: IP address string
+
+    Returns:
+        Address object, or None if the string is not an IP address
+    """
+    try:
+        address = ipaddress.ip_address(value.strip())
+    except (ValueError, AttributeError):
+        return None
+    if address.version == 6 and address.ipv4_mapped:
+        return address.ipv4_mapped
+    return address
+
+
+class RangeSet:
+    """
+    Set of IP ranges stored as disjoint sorted integer ranges per address family.
+
+    Overlapping and adjacent entries are merged at compile time, so a lookup
+    is one binary search over the range starts regardless of how many CIDR
+    blocks were configured.
+    """
+
+    def __init__(self, entries: Iterable[str]):
+        """
+        Compile IP addresses and CIDR ranges.
+
+        Args:
+            entries: IP addresses or CIDR ranges
+
+        Raises:
+            ValidationError: If an entry is not a valid IP address or network
+        """
+        ranges = {4: [], 6: []}
+        for entry in entries:
+            try:
+                network = ipaddress.ip_network(str(entry).strip(), strict=False)
+            except ValueError:
+                raise ValidationError(f"Invalid IP address or network: {entry}")
+            if network.version == 6 and network.prefixlen >= 96 and network.network_address.ipv4_mapped:
+                # ::ffff:a.b.c.d/n describes IPv4 addresses
+                network = ipaddress.ip_network(f"{network.network_address.ipv4_mapped}/{network.prefixlen - 96}")
+            ranges[network.version].append((int(network.network_address), int(network.broadcast_address)))
+
+        self._starts: Dict[int, List[int]] = {}
+        self._ends: Dict[int, List[int]] = {}
+        self.size = 0
+        for version, items in ranges.items():
+            merged: List[Tuple[int, int]] = []
+            for start, end in sorted(items):
+                if merged and start <= merged[-1][1] + 1:
+                    merged[-1] = (merged[-1][0], max(merged[-1][1], end))
+                else:
+                    merged.append((start, end))
+            self._starts[version] = [start for start, _ in merged]
+            self._ends[version] = [end for _, end in merged]
+            self.size += len(merged)
+
+    def __bool__(self) -> bool:
+        return self.size > 0
+
+    def contains(self, address: IPAddress) -> bool:
+        """
+        Check whether an address falls in any range.
+
+        Args:
+            address: Parsed IP address
+
+        Returns:
+            True if the address is covered
+        """
+        starts = self._starts[address.version]
+        value = int(address)
+        index = bisect.bisect_right(starts, value) - 1
+        return index >= 0 and value <= self._ends[address.version][index]
+
+
+class IPAllowlist:
+    """
+    Client IP allowlist with trusted-proxy handling.
+
+    X-Forwarded-For is only honoured when the direct peer is a trusted proxy;
+    the header is then walked from the right, skipping further trusted
+    proxies, and the first untrusted hop is the client. Otherwise the header
+    is ignored, since any client can set it.
+
+    Recent lookups, allowed and denied, are kept in a small LRU cache.
+    """
+
+    def __init__(self, allowed_ips: Iterable[str] = None, trusted_proxies: Iterable[str] = None,
+                 cache_size: int = 1024):
+        """
+        Compile the allowlist.
+
+        Args:
+            allowed_ips: Allowed IP addresses or CIDR ranges; empty allows every client
+            trusted_proxies: Proxy addresses or CIDR ranges whose X-Forwarded-For is trusted (optional)
+            cache_size: Number of recent lookups to cache
+
+        Raises:
+            ValidationError: If an entry is invalid
+        """
+        self.logger = logging.getLogger('mt5_server.ip_allowlist')
+        self.allowed = RangeSet(allowed_ips or ())
+        self.trusted_proxies = RangeSet(trusted_proxies or ())
+        self.cache_size = cache_size
+
+        self._cache: 'OrderedDict[str, bool]' = OrderedDict()
+        self._lock = threading.Lock()
+        self._stats = {'allowed': 0, 'denied': 0, 'cache_hits': 0, 'cache_misses': 0}
+
+    @property
+    def enabled(self) -> bool:
+        """Whether any restriction is configured."""
+        return bool(self.allowed)
+
+    def client_ip(self, remote_addr: Optional[str], forwarded_for: Optional[str] = None) -> Optional[str]:
+        """
+        Resolve the client IP of a request.
+
+        Args:
+            remote_addr: Address of the direct peer
+            forwarded_for: X-Forwarded-For header value (optional)
+
+        Returns:
+            Client IP address string
+        """
+        if not forwarded_for or not self.trusted_proxies:
+            return remote_addr
+
+        peer = parse_ip(remote_addr or '')
+        if peer is None or not self.trusted_proxies.contains(peer):
+            return remote_addr
+
+        client = remote_addr
+        for hop in reversed(forwarded_for.split(',')):
+            hop = hop.strip()
+            address = parse_ip(hop)
+            if address is None:
+                # Unparseable hop: stop at the last address we could verify
+                break
+            client = hop
+            if not self.trusted_proxies.contains(address):
+                break
+        return client
+
+    def is_allowed(self, ip: Optional[str]) -> bool:
+        """
+        Check whether a client IP is allowed.
+
+        Args:
+            ip: Client IP address string
+
+        Returns:
+            True if allowed (always True when no restriction is configured)
+        """
+        if not self.allowed:
+            return True
+        if not ip:
+            self._count(False)
+            return False
+
+        with self._lock:
+            cached = self._cache.get(ip)
+            if cached is not None:
+                self._cache.move_to_end(ip)
+                self._stats['cache_hits'] += 1
+                self._stats['allowed' if cached else 'denied'] += 1
+                return cached
+
+        address = parse_ip(ip)
+        allowed = address is not None and self.allowed.contains(address)
+
+        with self._lock:
+            self._stats['cache_misses'] += 1
+            self._stats['allowed' if allowed else 'denied'] += 1
+            self._cache[ip] = allowed
+            if len(self._cache) > self.cache_size:
+                self._cache.popitem(last=False)
+        return allowed
+
+    def check(self, remote_addr: Optional[str], forwarded_for: Optional[str] = None) -> Tuple[bool, Optional[str]]:
+        """
+        Resolve the client IP of a request and check it.
+
+        Args:
+            remote_addr: Address of the direct peer
+            forwarded_for: X-Forwarded-For header value (optional)
+
+        Returns:
+            (allowed, client IP)
+        """
+        client = self.client_ip(remote_addr, forwarded_for)
+        return self.is_allowed(client), client
+
+    def get_stats(self) -> Dict[str, Any]:
+        """
+        Get allowlist statistics.
+
+        Returns:
+            Statistics dictionary
+        """
+        with self._lock:
+            stats = dict(self._stats)
+            stats['cache_size'] = len(self._cache)
+        stats['enabled'] = self.enabled
+        stats['ranges'] = self.allowed.size
+        stats['trusted_proxy_ranges'] = self.trusted_proxies.size
+        return stats
+
+    def _count(self, allowed: bool) -> None:
+        """Count one uncached decision."""
+        with self._lock:
+            self._stats['allowed' if allowed else 'denied'] += 1
@@ -0,0 +1,268 @@
+"""
+MT5 IPC accounting for MT5 Trading HTTP Server.
+Attributes every terminal call made through the executor to the request, job or order that caused it.
+"""
+
+import threading
+from contextlib import contextmanager
+from functools import wraps
+from typing import Dict, Any, List, Optional
+from utils.metrics import LatencyHistogram
+
+
+class ScopeStack(threading.local):
+    """Per-thread stack of open IPC scopes."""
+
+    def __init__(self):
+        self.stack: List['IPCScope'] = []
+
+
+_scopes = ScopeStack()
+
+
+class IPCScope:
+    """
+    Terminal calls made on behalf of one request, job or order.
+
+    Commands capture the innermost scope of the submitting thread; the
+    executor thread, the only writer, adds each finished command to that
+    scope and to every enclosing one. Read a scope only after the work it
+    covers has finished.
+    """
+
+    def __init__(self, name: str, parent: 'IPCScope' = None, budget: int = None, max_details: int = 64):
+        """
+        Initialize scope.
+
+        Args:
+            name: Scope name, e.g. the endpoint or 'market_order'
+            parent: Enclosing scope (optional)
+            budget: Maximum terminal calls expected in this scope (optional)
+            max_details: Per-call entries kept for debug output
+        """
+        self.name = name
+        self.parent = parent
+        self.budget = budget
+        self.max_details = max_details
+        self.calls = 0
+        self.terminal_calls = 0
+        self.shared_reads = 0
+        self.errors = 0
+        self.ipc_ms = 0.0
+        self.wait_ms = 0.0
+        self.by_command: Dict[str, int] = {}
+        self.details: List[Dict[str, Any]] = []
+
+    @property
+    def over_budget(self) -> bool:
+        """Whether the scope made more terminal calls than its budget."""
+        return self.budget is not None and self.terminal_calls > self.budget
+
+    def add(self, name: str, terminal_calls: int, ipc_ms: float, wait_ms: float, result: str, failed: bool) -> None:
+        """
+        Attribute one finished command to this scope and its parents (executor thread only).
+
+        Args:
+            name: MetaTrader5 function name
+            terminal_calls: Terminal round trips made for the command (0 for a shared read)
+            ipc_ms: Time spent in the terminal call in milliseconds
+            wait_ms: Time the command waited in the executor queue in milliseconds
+            result: Short result summary
+            failed: Whether the call raised or returned no result
+        """
+        scope = self
+        while scope is not None:
+            scope.calls += 1
+            scope.terminal_calls += terminal_calls
+            scope.shared_reads += 0 if terminal_calls else 1
+            scope.errors += 1 if failed else 0
+            scope.ipc_ms += ipc_ms
+            scope.wait_ms += wait_ms
+            scope.by_command[name] = scope.by_command.get(name, 0) + 1
+            if len(scope.details) < scope.max_details:
+                scope.details.append({
+                    'command': name,
+                    'terminal_calls': terminal_calls,
+                    'ipc_ms': round(ipc_ms, 3),
+                    'wait_ms': round(wait_ms, 3),
+                    'result': result
+                })
+            scope = scope.parent
+
+    def to_dict(self, details: bool = True) -> Dict[str, Any]:
+        """
+        Summarize the scope.
+
+        Args:
+            details: Include the per-call entries
+
+        Returns:
+            Summary dictionary
+        """
+        summary = {
+            'scope': self.name,
+            'calls': self.calls,
+            'terminal_calls': self.terminal_calls,
+            'shared_reads': self.shared_reads,
+            'errors': self.errors,
+            'ipc_ms': round(self.ipc_ms, 3),
+            'wait_ms': round(self.wait_ms, 3),
+            'by_command': dict(self.by_command)
+        }
+        if self.budget is not None:
+            summary['budget'] = self.budget
+            summary['over_budget'] = self.over_budget
+        if details:
+            summary['details'] = list(self.details)
+        return summary
+
+
+def current_scope() -> Optional[IPCScope]:
+    """Get the calling thread's innermost IPC scope."""
+    stack = _scopes.stack
+    return stack[-1] if stack else None
+
+
+def begin_scope(name: str, budget: int = None, max_details: int = 64) -> IPCScope:
+    """
+    Open a scope on the calling thread, nested in the current one.
+
+    Args:
+        name: Scope name
+        budget: Maximum expected terminal calls (optional)
+        max_details: Per-call entries kept for debug output
+
+    Returns:
+        New scope
+    """
+    scope = IPCScope(name, current_scope(), budget, max_details)
+    _scopes.stack.append(scope)
+    return scope
+
+
+def end_scope(scope: IPCScope) -> None:
+    """
+    Close a scope opened with begin_scope (and any left open inside it).
+
+    Args:
+        scope: Scope to close
+    """
+    stack = _scopes.stack
+    if scope in stack:
+        del stack[stack.index(scope):]
+
+
+@contextmanager
+def ipc_scope(name: str, budget: int = None, max_details: int = 64):
+    """
+    Attribute terminal calls made inside the block to a new scope.
+
+    Args:
+        name: Scope name
+        budget: Maximum expected terminal calls (optional)
+        max_details: Per-call entries kept for debug output
+
+    Yields:
+        The scope
+    """
+    scope = begin_scope(name, budget, max_details)
+    try:
+        yield scope
+    finally:
+        end_scope(scope)
+
+
+def bind_ipc_scope(func):
+    """
+    Carry the calling thread's IPC scope into a function run on a worker pool.
+
+    Args:
+        func: Function to wrap
+
+    Returns:
+        Wrapper installing the captured scope around each call
+    """
+    scope = current_scope()
+    if scope is None:
+        return func
+
+    @wraps(func)
+    def wrapper(*args, **kwargs):
+        stack = _scopes.stack
+        stack.append(scope)
+        try:
+            return func(*args, **kwargs)
+        finally:
+            end_scope(scope)
+    return wrapper
+
+
+class IPCStats:
+    """
+    Aggregate IPC accounting across all scopes.
+
+    Keeps per-command call counts and terminal latency histograms, and per
+    scope name the distribution of terminal calls per scope and how often a
+    budget was exceeded.
+    """
+
+    def __init__(self):
+        self._commands: Dict[str, Dict[str, Any]] = {}
+        self._scopes: Dict[str, Dict[str, Any]] = {}
+        self._lock = threading.Lock()
+
+    def record_command(self, name: str, calls: int, ipc_ms: float, failed: bool) -> None:
+        """
+        Count one terminal call.
+
+        Args:
+            name: MetaTrader5 function name
+            calls: Commands served by the call (more than one for shared reads)
+            ipc_ms: Time spent in the terminal call in milliseconds
+            failed: Whether the call raised or returned no result
+        """
+        with self._lock:
+            entry = self._commands.get(name)
+            if entry is None:
+                entry = self._commands[name] = {'calls': 0, 'terminal_calls': 0, 'errors': 0,
+                                                'latency': LatencyHistogram()}
+            entry['calls'] += calls
+            entry['terminal_calls'] += 1
+            entry['errors'] += 1 if failed else 0
+        entry['latency'].record(ipc_ms)
+
+    def record_scope(self, scope: IPCScope) -> None:
+        """
+        Count one closed scope.
+
+        Args:
+            scope: Scope whose work has finished
+        """
+        with self._lock:
+            entry = self._scopes.get(scope.name)
+            if entry is None:
+                entry = self._scopes[scope.name] = {'count': 0, 'terminal_calls': 0, 'max_terminal_calls': 0,
+                                                    'over_budget': 0, 'budget': scope.budget}
+            entry['count'] += 1
+            entry['terminal_calls'] += scope.terminal_calls
+            entry['max_terminal_calls'] = max(entry['max_terminal_calls'], scope.terminal_calls)
+            entry['over_budget'] += 1 if scope.over_budget else 0
+
+    def to_dict(self) -> Dict[str, Any]:
+        """
+        Summarize aggregate accounting.
+
+        Returns:
+            {'commands': {...}, 'scopes': {...}}
+        """
+        with self._lock:
+            commands = {name: dict(entry) for name, entry in self._commands.items()}
+            scopes = {name: dict(entry) for name, entry in self._scopes.items()}
+
+        for entry in commands.values():
+            latency = entry.pop('latency').to_dict()
+            entry['mean_ms'] = latency['mean_ms']
+            entry['p99_ms'] = latency['p99_ms']
+        for entry in scopes.values():
+            entry['mean_terminal_calls'] = round(entry['terminal_calls'] / entry['count'], 2) if entry['count'] else 0
+        return {'commands': commands, 'scopes': scopes}
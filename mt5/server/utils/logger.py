@@ -3,9 +3,284 @@ Logging utilities for MT5 Trading HTTP Server.
 """
 
 import os
+import queue
+import atexit
 import logging
 import logging.handlers
-from typing import Dict, Any
+import threading
+import time
+from typing import Dict, Any, Optional
+
+if os.name == 'nt':
+    import msvcrt
+else:
+    import fcntl
+
+
+# Background listener writing queued records (None in synchronous mode)
+_listener: Optional['LogQueueListener'] = None
+_queue_handler: Optional['BoundedQueueHandler'] = None
+
+
+class BoundedQueueHandler(logging.handlers.QueueHandler):
+    """
+    Queue handler that only enqueues; formatting and I/O happen on the listener thread.
+
+    Unlike the stock QueueHandler, records are not formatted before they are
+    queued: %-style arguments and exception info travel with the record and
+    are rendered by the listener. Top-level dict and list arguments are
+    shallow-copied so later mutation by the caller does not change the line.
+
+    The queue is a SimpleQueue, whose put takes no Python-level lock; the
+    size bound is checked against qsize() and may be exceeded by a few
+    records under contention. When the queue is full the overflow policy
+    decides: "drop" discards the new record, "block" waits for space, and
+    "drop_info" (default) discards records below WARNING but waits for
+    warnings and errors.
+    """
+
+    OVERFLOW_POLICIES = ('drop_info', 'drop', 'block')
+
+    # Poll interval while a blocked record waits for queue space
+    BLOCK_POLL_INTERVAL = 0.005
+
+    def __init__(self, size: int = 10000, overflow: str = 'drop_info', block_timeout: float = 1.0):
+        """
+        Initialize handler.
+
+        Args:
+            size: Records buffered before the overflow policy applies
+            overflow: Overflow policy (drop_info, drop or block)
+            block_timeout: Longest wait in seconds for space before a blocked record is dropped
+        """
+        super().__init__(queue.SimpleQueue())
+        self.size = size
+        self.overflow = overflow
+        self.block_timeout = block_timeout
+        self._stats_lock = threading.Lock()
+        self.dropped = 0
+
+    def handle(self, record: logging.LogRecord) -> bool:
+        """Filter and enqueue a record without taking the handler lock; the queue is thread-safe."""
+        result = self.filter(record)
+        if result:
+            self.enqueue(self.prepare(record))
+        return bool(result)
+
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        """Snapshot mutable arguments without formatting the record."""
+        args = record.args
+        if isinstance(args, dict):
+            # A single mapping argument is stored as the args themselves
+            record.args = args.copy()
+        elif isinstance(args, tuple):
+            for arg in args:
+                if isinstance(arg, (dict, list)):
+                    record.args = tuple(arg.copy() if isinstance(arg, (dict, list)) else arg for arg in args)
+                    break
+        return record
+
+    def enqueue(self, record: logging.LogRecord) -> None:
+        """Put a record on the queue, applying the overflow policy when it is full."""
+        log_queue = self.queue
+        if log_queue.qsize() < self.size:
+            log_queue.put(record)
+            return
+
+        if self.overflow == 'drop' or (self.overflow == 'drop_info' and record.levelno < logging.WARNING):
+            self._count_drop()
+            return
+        deadline = time.monotonic() + self.block_timeout
+        while log_queue.qsize() >= self.size:
+            if time.monotonic() >= deadline:
+                self._count_drop()
+                return
+            time.sleep(self.BLOCK_POLL_INTERVAL)
+        log_queue.put(record)
+
+    def _count_drop(self) -> None:
+        """Count a dropped record."""
+        with self._stats_lock:
+            self.dropped += 1
+
+
+class LogQueueListener(logging.handlers.QueueListener):
+    """
+    Queue listener that drains records in batches.
+
+    Handlers that support it (begin_batch/end_batch) take their locks and
+    flush once per batch instead of once per record. Batches are kept small
+    and the listener yields the GIL after each full one: a request thread
+    that logs while a batch is written waits for at most one batch, so
+    larger batches raise the tail latency of logging calls.
+    """
+
+    def __init__(self, log_queue: queue.SimpleQueue, *handlers, respect_handler_level: bool = False,
+                 batch_size: int = 8):
+        """
+        Initialize listener.
+
+        Args:
+            log_queue: Queue shared with the BoundedQueueHandler
+            *handlers: Handlers writing the records
+            respect_handler_level: Apply each handler's level
+            batch_size: Most records handled per batch
+        """
+        super().__init__(log_queue, *handlers, respect_handler_level=respect_handler_level)
+        self.batch_size = batch_size
+        self.handled = 0
+
+    def _monitor(self) -> None:
+        """Listener loop: handle whatever is queued, one bounded batch at a time."""
+        log_queue = self.queue
+        while True:
+            records = [log_queue.get()]
+            try:
+                while len(records) < self.batch_size:
+                    records.append(log_queue.get_nowait())
+            except queue.Empty:
+                pass
+
+            stop = False
+            for handler in self.handlers:
+                if hasattr(handler, 'begin_batch'):
+                    handler.begin_batch()
+            try:
+                for record in records:
+                    if record is self._sentinel:
+                        stop = True
+                        continue
+                    self.handle(record)
+                    self.handled += 1
+            finally:
+                for handler in self.handlers:
+                    if hasattr(handler, 'end_batch'):
+                        handler.end_batch()
+            if stop:
+                return
+            if len(records) == self.batch_size:
+                # Yield the GIL to request threads between back-to-back batches
+                time.sleep(0)
+
+
+class ProcessSafeRotatingFileHandler(logging.handlers.RotatingFileHandler):
+    """
+    Rotating file handler safe to share between worker processes.
+
+    Writes and rollovers happen under an exclusive lock on a sidecar ".lock"
+    file. The size check starts from the file on disk rather than this
+    process's stream position, and a stream whose file was rotated away by
+    another process is reopened before writing. On Windows, where an open
+    file cannot be renamed, the stream is closed after every batch.
+
+    A single emit() is its own batch; the queue listener groups records so
+    the lock is taken and the stream flushed once per batch.
+    """
+
+    def __init__(self, filename: str, maxBytes: int = 0, backupCount: int = 0, encoding: str = None):
+        super().__init__(filename, maxBytes=maxBytes, backupCount=backupCount, encoding=encoding, delay=True)
+        self._lock_file = open(f"{self.baseFilename}.lock", 'a+b')
+        self._close_after_write = os.name == 'nt'
+        self._in_batch = False
+        self._size = 0
+
+    def begin_batch(self) -> None:
+        """Take the inter-process lock and sync with rotations done by other processes."""
+        self.acquire()
+        try:
+            self._acquire_file_lock()
+        except Exception:
+            self.release()
+            raise
+        self._in_batch = True
+        self._reopen_if_rotated()
+        try:
+            self._size = os.path.getsize(self.baseFilename)
+        except OSError:
+            self._size = 0
+
+    def end_batch(self) -> None:
+        """Flush the batch and release the inter-process lock."""
+        if not self._in_batch:
+            return
+        self._in_batch = False
+        try:
+            if self.stream is not None:
+                self.stream.flush()
+                if self._close_after_write:
+                    self.stream.close()
+                    self.stream = None
+        finally:
+            self._release_file_lock()
+            self.release()
+
+    def emit(self, record: logging.LogRecord) -> None:
+        """Write a record, inside the current batch or as a batch of one."""
+        single = not self._in_batch
+        try:
+            if single:
+                self.begin_batch()
+            try:
+                message = self.format(record) + self.terminator
+                length = len(message.encode(self.encoding or 'utf-8', 'replace'))
+                if self.maxBytes > 0 and self._size > 0 and self._size + length >= self.maxBytes:
+                    self.doRollover()
+                    self._size = 0
+                if self.stream is None:
+                    self.stream = self._open()
+                self.stream.write(message)
+                self._size += length
+            finally:
+                if single:
+                    self.end_batch()
+        except Exception:
+            self.handleError(record)
+
+    def shouldRollover(self, record: logging.LogRecord) -> bool:
+        """Roll over based on the size of the file on disk, shared by all processes."""
+        if self.maxBytes <= 0:
+            return False
+        try:
+            size = os.path.getsize(self.baseFilename)
+        except OSError:
+            return False
+        return size > 0 and size + len(self.format(record)) + len(self.terminator) >= self.maxBytes
+
+    def close(self) -> None:
+        """Close the stream and the lock file."""
+        super().close()
+        if self._lock_file and not self._lock_file.closed:
+            self._lock_file.close()
+
+    def _reopen_if_rotated(self) -> None:
+        """Drop a stream whose file another process has rotated away (caller holds the file lock)."""
+        if self.stream is None:
+            return
+        try:
+            current = os.stat(self.baseFilename)
+            opened = os.fstat(self.stream.fileno())
+            rotated = (current.st_dev, current.st_ino) != (opened.st_dev, opened.st_ino)
+        except OSError:
+            rotated = True
+        if rotated:
+            self.stream.close()
+            self.stream = None
+
+    def _acquire_file_lock(self) -> None:
+        """Take the inter-process lock."""
+        if os.name == 'nt':
+            self._lock_file.seek(0)
+            msvcrt.locking(self._lock_file.fileno(), msvcrt.LK_LOCK, 1)
+        else:
+            fcntl.flock(self._lock_file.fileno(), fcntl.LOCK_EX)
+
+    def _release_file_lock(self) -> None:
+        """Release the inter-process lock."""
+        if os.name == 'nt':
+            self._lock_file.seek(0)
+            msvcrt.locking(self._lock_file.fileno(), msvcrt.LK_UNLCK, 1)
+        else:
+            fcntl.flock(self._lock_file.fileno(), fcntl.LOCK_UN)
 
 
 def setup_logger(config: Dict[str, Any]) -> logging.Logger:
@@ -22,6 +297,7 @@ def setup_logger(config: Dict[str, Any]) -> logging.Logger:
     logger = logging.getLogger('mt5_server')
     
     # Clear any existing handlers
+    stop_logging()
     logger.handlers.clear()
     
     # Set log level
@@ -32,11 +308,13 @@ def setup_logger(config: Dict[str, Any]) -> logging.Logger:
     log_format = config.get('format', '%(asctime)s - %(name)s - %(levelname)s - %(message)s')
     formatter = logging.Formatter(log_format)
     
+    handlers = []
+
     # Console handler
     if config.get('console', True):
         console_handler = logging.StreamHandler()
         console_handler.setFormatter(formatter)
-        logger.addHandler(console_handler)
+        handlers.append(console_handler)
     
     # File handler
     log_file = config.get('file', 'mt5_server.log')
@@ -50,18 +328,69 @@ def setup_logger(config: Dict[str, Any]) -> logging.Logger:
         max_size = config.get('max_size', 10485760)  # 10MB default
         backup_count = config.get('backup_count', 5)
         
-        file_handler = logging.handlers.RotatingFileHandler(
+        file_handler = ProcessSafeRotatingFileHandler(
             log_file,
             maxBytes=max_size,
             backupCount=backup_count,
             encoding='utf-8'
         )
         file_handler.setFormatter(formatter)
-        logger.addHandler(file_handler)
+        handlers.append(file_handler)
+
+    # Queue mode: request threads only enqueue, a listener thread formats and writes
+    queue_config = config.get('queue') or {}
+    if queue_config.get('enabled', False) and handlers:
+        global _listener, _queue_handler
+        _queue_handler = BoundedQueueHandler(queue_config.get('size', 10000), queue_config.get('overflow', 'drop_info'),
+                                             queue_config.get('block_timeout_ms', 1000) / 1000.0)
+        _listener = LogQueueListener(_queue_handler.queue, *handlers, respect_handler_level=True,
+                                     batch_size=queue_config.get('batch_size', 8))
+        _listener.start()
+        logger.addHandler(_queue_handler)
+    else:
+        for handler in handlers:
+            logger.addHandler(handler)
     
     return logger
 
 
+def stop_logging() -> None:
+    """Flush queued records and stop the listener thread (no-op in synchronous mode)."""
+    global _listener, _queue_handler
+    if _listener is not None:
+        _listener.stop()
+        for handler in _listener.handlers:
+            handler.close()
+        _listener = None
+    _queue_handler = None
+
+
+def get_logging_stats() -> Dict[str, Any]:
+    """
+    Get logging pipeline statistics.
+
+    Returns:
+        Statistics dictionary (queue depth and drops in queue mode)
+    """
+    handler, listener = _queue_handler, _listener
+    if handler is None:
+        return {'mode': 'sync'}
+    depth = handler.queue.qsize()
+    handled = listener.handled if listener is not None else 0
+    return {
+        'mode': 'queue',
+        'overflow': handler.overflow,
+        'queue_depth': depth,
+        'queue_size': handler.size,
+        'enqueued': handled + depth,
+        'dropped': handler.dropped
+    }
+
+
+# Flush queued records on interpreter exit
+atexit.register(stop_logging)
+
+
 def log_trade_operation(logger: logging.Logger, operation: str, symbol: str, 
                        volume: float, price: float = None, result: str = None):
     """
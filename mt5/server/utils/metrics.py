@@ -0,0 +1,122 @@
+"""
+Metrics utilities for MT5 Trading HTTP Server.
+"""
+
+import bisect
+import math
+import threading
+from typing import Dict, Any, List, Tuple
+
+
+class LatencyHistogram:
+    """
+    Log-bucketed latency histogram.
+
+    Bucket bounds grow geometrically from min_ms to max_ms, giving a constant
+    relative error per bucket with a few hundred counters; recording is a
+    binary search and an increment.
+    """
+
+    def __init__(self, min_ms: float = 0.01, max_ms: float = 60000.0, buckets_per_doubling: int = 8):
+        """
+        Initialize histogram.
+
+        Args:
+            min_ms: Upper bound of the first bucket in milliseconds
+            max_ms: Largest tracked value; larger values land in the overflow bucket
+            buckets_per_doubling: Buckets per factor of two (higher = finer resolution)
+        """
+        self.buckets_per_doubling = buckets_per_doubling
+        growth = 2 ** (1.0 / buckets_per_doubling)
+        count = int(math.ceil(math.log(max_ms / min_ms, growth))) + 1
+        self.bounds: List[float] = [min_ms * growth ** i for i in range(count)]
+        self._counts = [0] * (count + 1)
+        self._total = 0
+        self._sum = 0.0
+        self._max = 0.0
+        self._lock = threading.Lock()
+
+    def record(self, value_ms: float) -> None:
+        """
+        Record one observation.
+
+        Args:
+            value_ms: Latency in milliseconds
+        """
+        index = bisect.bisect_left(self.bounds, value_ms)
+        with self._lock:
+            self._counts[index] += 1
+            self._total += 1
+            self._sum += value_ms
+            if value_ms > self._max:
+                self._max = value_ms
+
+    def percentile(self, percent: float) -> float:
+        """
+        Get an approximate percentile.
+
+        Args:
+            percent: Percentile between 0 and 100
+
+        Returns:
+            Upper bound of the bucket holding the percentile, in milliseconds
+        """
+        with self._lock:
+            return self._percentile(percent)
+
+    def cumulative(self, step: int = 1) -> Tuple[List[Tuple[float, int]], int, float]:
+        """
+        Get cumulative bucket counts, e.g. for Prometheus export.
+
+        Counts are exact at every bucket bound: a value lands in the first
+        bucket whose bound is not below it.
+
+        Args:
+            step: Report every step-th bound (buckets_per_doubling gives powers of two)
+
+        Returns:
+            ([(bound_ms, count of values <= bound_ms), ...], total count, sum in milliseconds)
+        """
+        with self._lock:
+            counts = list(self._counts)
+            total = self._total
+            total_sum = self._sum
+
+        buckets = []
+        seen = 0
+        for index, bound in enumerate(self.bounds):
+            seen += counts[index]
+            if index % step == 0:
+                buckets.append((bound, seen))
+        return buckets, total, total_sum
+
+    def to_dict(self) -> Dict[str, Any]:
+        """
+        Summarize the histogram.
+
+        Returns:
+            Dictionary with count, mean, max and common percentiles in milliseconds
+        """
+        with self._lock:
+            return {
+                'count': self._total,
+                'mean_ms': round(self._sum / self._total, 3) if self._total else 0.0,
+                'p50_ms': round(self._percentile(50), 3),
+                'p90_ms': round(self._percentile(90), 3),
+                'p99_ms': round(self._percentile(99), 3),
+                'max_ms': round(self._max, 3)
+            }
+
+    def _percentile(self, percent: float) -> float:
+        """Percentile lookup (caller holds the lock)."""
+        if not self._total:
+            return 0.0
+        rank = max(1, int(math.ceil(self._total * percent / 100.0)))
+        seen = 0
+        for index, count in enumerate(self._counts):
+            seen += count
+            if seen >= rank:
+                # Never report more than the largest value actually observed
+                bound = self.bounds[index] if index < len(self.bounds) else self._max
+                return min(bound, self._max)
+        return self._max
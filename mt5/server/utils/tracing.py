@@ -0,0 +1,356 @@
+"""
+Request stage tracing for MT5 Trading HTTP Server.
+Records per-stage latency into log-bucketed histograms and exports them in Prometheus text format.
+"""
+
+import inspect
+import logging
+import threading
+from functools import wraps
+from time import perf_counter_ns
+from typing import Dict, Any, List, Tuple
+from utils.metrics import LatencyHistogram
+
+
+# Label value substituted for the symbol once max_series is reached
+OVERFLOW_SYMBOL = 'other'
+
+METRIC_NAME = 'mt5_stage_duration_seconds'
+
+
+class Trace:
+    """Stage timings of one unit of work on one thread."""
+
+    __slots__ = ('name', 'action', 'symbol', 'started', 'last_mark', 'stages')
+
+    def __init__(self, name: str, action: str, symbol: str):
+        self.name = name
+        self.action = action
+        self.symbol = symbol
+        self.started = self.last_mark = perf_counter_ns()
+        self.stages: Dict[str, int] = {}
+
+
+class TraceStack(threading.local):
+    """Per-thread stack of open traces; initialised per thread so lookups never miss."""
+
+    def __init__(self):
+        self.stack: List[Trace] = []
+
+
+class TraceScope:
+    """
+    Context manager and decorator running a block as a trace.
+
+    Holds no per-call state, so one instance can decorate a function called
+    from many threads at once.
+    """
+
+    def __init__(self, tracer: 'Tracer', name: str, action: str = '', symbol: str = ''):
+        self.tracer = tracer
+        self.name = name
+        self.action = action
+        self.symbol = symbol
+
+    def __enter__(self):
+        self.tracer.begin(self.name, self.action, self.symbol)
+        return self
+
+    def __exit__(self, *exc_info):
+        self.tracer.end()
+        return False
+
+    def __call__(self, func):
+        @wraps(func)
+        def wrapper(*args, **kwargs):
+            if not self.tracer.enabled:
+                return func(*args, **kwargs)
+            with self:
+                return func(*args, **kwargs)
+        return wrapper
+
+
+class Span:
+    """Context manager timing one stage."""
+
+    __slots__ = ('tracer', 'stage', 'started')
+
+    def __init__(self, tracer: 'Tracer', stage: str):
+        self.tracer = tracer
+        self.stage = stage
+
+    def __enter__(self):
+        self.started = perf_counter_ns()
+        return self
+
+    def __exit__(self, *exc_info):
+        if self.tracer.enabled:
+            self.tracer.add(self.stage, perf_counter_ns() - self.started)
+        return False
+
+
+class Tracer:
+    """
+    Lightweight stage tracer.
+
+    A trace covers one unit of work on one thread, e.g. a webhook request or
+    an order execution. Stages inside it are timed with spans, traced
+    functions or checkpoints (mark) on the monotonic perf_counter_ns clock
+    and summed per stage in the trace. When the trace ends, its duration and
+    stage totals are recorded into histograms labelled with the trace's
+    action and symbol, which are usually only known part way through.
+    Spans outside any trace (background threads) are recorded directly with
+    empty labels.
+
+    Recording a stage costs two clock reads and a dictionary update; the
+    histogram update happens once per stage when the trace ends.
+    """
+
+    def __init__(self, config: Dict[str, Any] = None):
+        """
+        Initialize tracer.
+
+        Args:
+            config: Tracing configuration dictionary (optional)
+        """
+        self.logger = logging.getLogger('mt5_server.tracing')
+        self._local = TraceStack()
+        self._histograms: Dict[Tuple[str, str, str], LatencyHistogram] = {}
+        self._lock = threading.Lock()
+        self._stats = {'overflowed_records': 0}
+        self.configure(config)
+
+    def configure(self, config: Dict[str, Any] = None) -> None:
+        """
+        Apply tracing configuration.
+
+        Args:
+            config: Tracing configuration dictionary (optional)
+        """
+        config = config or {}
+        self.enabled = config.get('enabled', True)
+        self.max_series = config.get('max_series', 2000)
+
+    def trace(self, name: str, action: str = '', symbol: str = '') -> TraceScope:
+        """
+        Create a scope running a block or function as a trace.
+
+        Args:
+            name: Trace name, recorded as a stage holding the total duration
+            action: Action label (optional, may be set later with label())
+            symbol: Symbol label (optional, may be set later with label())
+
+        Returns:
+            Context manager usable as a decorator
+        """
+        return TraceScope(self, name, action, symbol)
+
+    def span(self, stage: str) -> Span:
+        """
+        Create a context manager timing a stage.
+
+        Args:
+            stage: Stage name
+
+        Returns:
+            Span context manager
+        """
+        return Span(self, stage)
+
+    def traced(self, stage: str):
+        """
+        Decorator timing every call of a function as a stage.
+
+        Args:
+            stage: Stage name
+        """
+        def decorator(func):
+            @wraps(func)
+            def wrapper(*args, **kwargs):
+                if not self.enabled:
+                    return func(*args, **kwargs)
+                started = perf_counter_ns()
+                try:
+                    return func(*args, **kwargs)
+                finally:
+                    self.add(stage, perf_counter_ns() - started)
+            return wrapper
+        return decorator
+
+    def trace_methods(self, prefix: str):
+        """
+        Class decorator timing every public method as stage '<prefix>.<method>'.
+
+        Args:
+            prefix: Stage name prefix
+        """
+        def decorator(cls):
+            for name, member in list(vars(cls).items()):
+                if not name.startswith('_') and inspect.isfunction(member):
+                    setattr(cls, name, self.traced(f"{prefix}.{name}")(member))
+            return cls
+        return decorator
+
+    def begin(self, name: str, action: str = '', symbol: str = '') -> None:
+        """
+        Start a trace on the current thread; nested traces inherit unset labels.
+
+        Args:
+            name: Trace name
+            action: Action label (optional)
+            symbol: Symbol label (optional)
+        """
+        if not self.enabled:
+            return
+        stack = self._local.stack
+        if stack:
+            parent = stack[-1]
+            action = action or parent.action
+            symbol = symbol or parent.symbol
+        stack.append(Trace(name, (action or '').lower(), (symbol or '').upper()))
+
+    def end(self) -> None:
+        """Finish the current thread's innermost trace and record it."""
+        stack = self._local.stack
+        if not stack:
+            return
+        trace = stack.pop()
+        elapsed = perf_counter_ns() - trace.started
+
+        self._histogram(trace.name, trace.action, trace.symbol).record(elapsed / 1e6)
+        for stage, total in trace.stages.items():
+            self._histogram(stage, trace.action, trace.symbol).record(total / 1e6)
+
+    def label(self, action: str = None, symbol: str = None) -> None:
+        """
+        Set labels of the current trace and of enclosing traces that have none yet.
+
+        Args:
+            action: Action label (optional)
+            symbol: Symbol label (optional)
+        """
+        stack = self._local.stack
+        if not stack:
+            return
+        action = str(action).lower() if action else ''
+        symbol = str(symbol).upper() if symbol else ''
+        if action:
+            stack[-1].action = action
+        if symbol:
+            stack[-1].symbol = symbol
+        for trace in stack[:-1]:
+            trace.action = trace.action or action
+            trace.symbol = trace.symbol or symbol
+
+    def mark(self, stage: str) -> None:
+        """
+        Attribute the time since the trace started or since the previous mark to a stage.
+
+        Args:
+            stage: Stage name
+        """
+        stack = self._local.stack
+        if not stack:
+            return
+        trace = stack[-1]
+        now = perf_counter_ns()
+        trace.stages[stage] = trace.stages.get(stage, 0) + now - trace.last_mark
+        trace.last_mark = now
+
+    def add(self, stage: str, elapsed_ns: int) -> None:
+        """
+        Add a stage duration to the current trace, or record it directly outside a trace.
+
+        Args:
+            stage: Stage name
+            elapsed_ns: Duration in nanoseconds
+        """
+        stack = self._local.stack
+        if stack:
+            stages = stack[-1].stages
+            stages[stage] = stages.get(stage, 0) + elapsed_ns
+        else:
+            self._histogram(stage, '', '').record(elapsed_ns / 1e6)
+
+    def record(self, stage: str, elapsed_ms: float, action: str = '', symbol: str = '') -> None:
+        """
+        Record a stage duration measured elsewhere, e.g. across threads.
+
+        Args:
+            stage: Stage name
+            elapsed_ms: Duration in milliseconds
+            action: Action label (optional)
+            symbol: Symbol label (optional)
+        """
+        if self.enabled:
+            self._histogram(stage, (action or '').lower(), (symbol or '').upper()).record(elapsed_ms)
+
+    def render_prometheus(self) -> str:
+        """
+        Export every stage histogram in Prometheus text exposition format.
+
+        Bucket bounds are the powers of two of the underlying log-bucketed
+        histograms, so exported cumulative counts are exact.
+
+        Returns:
+            Exposition text
+        """
+        lines = [
+            f"# HELP {METRIC_NAME} Time spent per request stage, by action and symbol",
+            f"# TYPE {METRIC_NAME} histogram"
+        ]
+        with self._lock:
+            series = sorted(self._histograms.items())
+        for (stage, action, symbol), histogram in series:
+            buckets, total, total_sum = histogram.cumulative(histogram.buckets_per_doubling)
+            labels = f'stage="{_escape(stage)}",action="{_escape(action)}",symbol="{_escape(symbol)}"'
+            for bound_ms, count in buckets:
+                lines.append(f'{METRIC_NAME}_bucket{{{labels},le="{bound_ms / 1000:.6g}"}} {count}')
+            lines.append(f'{METRIC_NAME}_bucket{{{labels},le="+Inf"}} {total}')
+            lines.append(f'{METRIC_NAME}_sum{{{labels}}} {total_sum / 1000:.9g}')
+            lines.append(f'{METRIC_NAME}_count{{{labels}}} {total}')
+        return '\n'.join(lines) + '\n'
+
+    def get_stats(self) -> Dict[str, Any]:
+        """
+        Get tracer statistics.
+
+        Returns:
+            Statistics dictionary
+        """
+        with self._lock:
+            stats = dict(self._stats)
+        stats['enabled'] = self.enabled
+        stats['series'] = len(self._histograms)
+        stats['max_series'] = self.max_series
+        return stats
+
+    def _histogram(self, stage: str, action: str, symbol: str) -> LatencyHistogram:
+        """Get or create the histogram of a label set, capping the number of series."""
+        key = (stage, action, symbol)
+        histogram = self._histograms.get(key)
+        if histogram is not None:
+            return histogram
+
+        with self._lock:
+            histogram = self._histograms.get(key)
+            if histogram is not None:
+                return histogram
+            if len(self._histograms) >= self.max_series:
+                # Unbounded symbol values must not grow the series count forever
+                self._stats['overflowed_records'] += 1
+                key = (stage, action, OVERFLOW_SYMBOL)
+                histogram = self._histograms.get(key)
+                if histogram is not None:
+                    return histogram
+            histogram = self._histograms[key] = LatencyHistogram()
+            return histogram
+
+
+def _escape(value: str) -> str:
+    """Escape a Prometheus label value."""
+    return value.replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+
+
+# Shared tracer; decorators bind to it at import time, configuration is applied at startup
+tracer = Tracer()
@@ -0,0 +1,150 @@
+"""
+Trading hours bitmap for MT5 Trading HTTP Server.
+Compiles custom trading intervals into a UTC minute lookup table.
+"""
+
+import logging
+import time
+from datetime import datetime, timedelta, timezone
+from typing import Dict, Any, Callable, List, Optional, Tuple
+
+
+MINUTES_PER_DAY = 24 * 60
+MINUTES_PER_WEEK = 7 * MINUTES_PER_DAY
+
+
+class TradingHoursBitmap:
+    """
+    Minute-resolution lookup table of allowed trading time.
+
+    The table covers one UTC week (Monday 00:00 UTC onwards). Every interval is
+    localized per calendar date in its own timezone, so DST transitions that
+    fall inside the week are baked into the table. When the clock leaves the
+    week, the table is rebuilt for the new one. Each slot holds the 1-based
+    position of the first matching interval (0 = trading not allowed), so a
+    check is a single index lookup that also identifies the interval.
+    """
+
+    def __init__(self, custom_intervals: Dict[str, Any], parse_timezone: Callable[[str], Any]):
+        """
+        Initialize and compile trading hours.
+
+        Args:
+            custom_intervals: custom_intervals configuration section
+            parse_timezone: Callable turning a timezone string into a tzinfo
+        """
+        self.logger = logging.getLogger('mt5_server.trading_hours')
+        self.parse_timezone = parse_timezone
+        self.intervals = self._compile_intervals(custom_intervals or {})
+        # (window start in epoch minutes, table); replaced as a whole on rebuild
+        self._table: Optional[Tuple[int, bytearray]] = None
+        self.build()
+
+    def build(self, now: float = None) -> None:
+        """
+        Build the table for the UTC week containing now.
+
+        Args:
+            now: Reference timestamp (optional, defaults to current time)
+        """
+        if now is None:
+            now = time.time()
+
+        current = datetime.fromtimestamp(now, timezone.utc)
+        week_start = (current - timedelta(days=current.weekday())).replace(
+            hour=0, minute=0, second=0, microsecond=0)
+        window_start = int(week_start.timestamp()) // 60
+        table = bytearray(MINUTES_PER_WEEK)
+
+        for slot, (interval_id, interval, tz, start, end) in enumerate(self.intervals, start=1):
+            # Include the previous day so overnight intervals reach into Monday
+            for day in range(-1, 8):
+                local_date = (week_start + timedelta(days=day)).date()
+                local_start = self._localize(tz, datetime.combine(local_date, start))
+                end_date = local_date if end > start else local_date + timedelta(days=1)
+                local_end = self._localize(tz, datetime.combine(end_date, end))
+
+                first = max(int(local_start.timestamp()) // 60 - window_start, 0)
+                last = min(int(local_end.timestamp()) // 60 - window_start, MINUTES_PER_WEEK)
+                for minute in range(first, last):
+                    if not table[minute]:
+                        table[minute] = slot
+
+        self._table = (window_start, table)
+        self.logger.debug(f"Trading hours compiled for week starting {week_start.isoformat()} "
+                          f"with {len(self.intervals)} intervals")
+
+    def is_allowed(self, now: float = None) -> bool:
+        """
+        Check whether trading is allowed.
+
+        Args:
+            now: Timestamp to check (optional, defaults to current time)
+
+        Returns:
+            True if now falls inside any interval
+        """
+        return self._lookup(now) != 0
+
+    def explain(self, now: float = None) -> Dict[str, Any]:
+        """
+        Report which interval, if any, allows trading at the given time.
+
+        Args:
+            now: Timestamp to check (optional, defaults to current time)
+
+        Returns:
+            Explanation dictionary
+        """
+        if now is None:
+            now = time.time()
+
+        slot = self._lookup(now)
+        result = {
+            'allowed': slot != 0,
+            'utc_time': datetime.fromtimestamp(now, timezone.utc).isoformat(),
+            'interval_id': None,
+            'interval_name': None,
+            'intervals_compiled': len(self.intervals)
+        }
+        if slot:
+            interval_id, interval = self.intervals[slot - 1][:2]
+            result['interval_id'] = interval_id
+            result['interval_name'] = interval.get('name')
+            result['interval'] = f"{interval['start_time']}-{interval['end_time']} {interval['timezone']}"
+        return result
+
+    def _lookup(self, now: Optional[float]) -> int:
+        """Return the table slot for a timestamp, rebuilding when it leaves the window."""
+        if now is None:
+            now = time.time()
+
+        window_start, table = self._table
+        minute = int(now // 60) - window_start
+        if not 0 <= minute < MINUTES_PER_WEEK:
+            self.build(now)
+            window_start, table = self._table
+            minute = int(now // 60) - window_start
+        return table[minute]
+
+    def _compile_intervals(self, custom_intervals: Dict[str, Any]) -> List[tuple]:
+        """Parse interval definitions once; invalid entries are skipped with a warning."""
+        compiled = []
+        for interval_id, interval in custom_intervals.items():
+            try:
+                if len(compiled) >= 255:
+                    raise ValueError("at most 255 intervals are supported")
+                tz = self.parse_timezone(interval['timezone'])
+                start = datetime.strptime(interval['start_time'], "%H:%M").time()
+                end = datetime.strptime(interval['end_time'], "%H:%M").time()
+                compiled.append((interval_id, interval, tz, start, end))
+            except Exception as e:
+                self.logger.warning(f"Ignoring invalid trading interval {interval_id}: {e}")
+        return compiled
+
+    @staticmethod
+    def _localize(tz, naive: datetime) -> datetime:
+        """Attach a timezone to a naive local datetime (pytz or fixed offset)."""
+        if hasattr(tz, 'localize'):
+            return tz.localize(naive)
+        return naive.replace(tzinfo=tz)
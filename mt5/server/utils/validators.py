@@ -3,10 +3,11 @@ Validation utilities for MT5 Trading HTTP Server.
 """
 
 import re
-import ipaddress
-from typing import Dict, Any, List, Optional
+from functools import lru_cache
+from typing import Dict, Any, List, Optional, Callable
 from flask import Request
 from utils.exceptions import ValidationError
+from utils.ip_allowlist import IPAllowlist
 
 
 def validate_api_key(request: Request, security_config: Dict[str, Any]) -> bool:
@@ -26,6 +27,19 @@ def validate_api_key(request: Request, security_config: Dict[str, Any]) -> bool:
     if not api_key:
         return True
     
+    return get_request_api_key(request) == api_key
+
+
+def get_request_api_key(request: Request) -> Optional[str]:
+    """
+    Extract the API key presented by a request.
+    
+    Args:
+        request: Flask request object
+        
+    Returns:
+        API key from X-API-Key or Authorization header, or None
+    """
     # Check API key in headers
     request_api_key = request.headers.get('X-API-Key') or request.headers.get('Authorization')
     
@@ -33,7 +47,13 @@ def validate_api_key(request: Request, security_config: Dict[str, Any]) -> bool:
     if request_api_key and request_api_key.startswith('Bearer '):
         request_api_key = request_api_key[7:]
     
-    return request_api_key == api_key
+    return request_api_key
+
+
+@lru_cache(maxsize=16)
+def _compiled_allowlist(allowed_ips: tuple, trusted_proxies: tuple) -> IPAllowlist:
+    """Compile an allowlist once per distinct configuration."""
+    return IPAllowlist(allowed_ips, trusted_proxies)
 
 
 def validate_ip_address(request: Request, security_config: Dict[str, Any]) -> bool:
@@ -53,33 +73,15 @@ def validate_ip_address(request: Request, security_config: Dict[str, Any]) -> bo
     if not allowed_ips:
         return True
     
-    # Get client IP (handle proxy headers)
-    client_ip = request.headers.get('X-Forwarded-For', request.remote_addr)
-    if ',' in client_ip:
-        client_ip = client_ip.split(',')[0].strip()
-    
     try:
-        client_ip_obj = ipaddress.ip_address(client_ip)
-        
-        for allowed_ip in allowed_ips:
-            try:
-                # Check if it's a network range
-                if '/' in allowed_ip:
-                    network = ipaddress.ip_network(allowed_ip, strict=False)
-                    if client_ip_obj in network:
-                        return True
-                else:
-                    # Check exact IP match
-                    if client_ip_obj == ipaddress.ip_address(allowed_ip):
-                        return True
-            except ValueError:
-                continue
-        
-        return False
-        
-    except ValueError:
+        allowlist = _compiled_allowlist(tuple(allowed_ips), tuple(security_config.get('trusted_proxies') or ()))
+    except ValidationError:
         return False
 
+    # X-Forwarded-For is only honoured from trusted proxies
+    allowed, _ = allowlist.check(request.remote_addr, request.headers.get('X-Forwarded-For'))
+    return allowed
+
 
 def validate_webhook_payload(payload: Dict[str, Any], webhook_config: Dict[str, Any]) -> Dict[str, Any]:
     """
@@ -130,6 +132,12 @@ def validate_webhook_payload(payload: Dict[str, Any], webhook_config: Dict[str,
                 result['message'] = f"Invalid symbol format: {symbol}"
                 return result
         
+        # Validate close type field
+        if 'close_type' in payload and payload['close_type'] not in ('long', 'short'):
+            result['valid'] = False
+            result['message'] = f"Invalid close_type: {payload['close_type']}. Must be one of ['long', 'short']"
+            return result
+        
         # Validate volume field
         if 'volume' in payload:
             volume = payload['volume']
@@ -213,6 +221,145 @@ def validate_trade_parameters(symbol: str, volume: float, action: str,
         raise ValidationError(f"Invalid action: {action}")
 
 
+VALID_ACTIONS = ('buy', 'sell', 'close', 'close_all', 'modify')
+ENTRY_ACTIONS = ('buy', 'sell')
+PRICE_FIELDS = ('price', 'sl', 'tp', 'stop_loss', 'take_profit')
+SYMBOL_PATTERN = re.compile(r'[A-Z0-9._-]+')
+
+# Defaults that only make sense when opening a position (volume on close means partial close)
+ENTRY_ONLY_DEFAULTS = ('volume',)
+
+
+def compile_webhook_validator(webhook_config: Dict[str, Any],
+                              trading_config: Dict[str, Any] = None) -> Callable[[Dict[str, Any]], Dict[str, Any]]:
+    """
+    Compile webhook and trading rules into one payload validator.
+
+    Configuration is read once here: required fields, defaults, volume
+    limits and allowed symbols become constants of the returned closure, and
+    checks that cannot apply (e.g. an empty allowed_symbols list) are left
+    out. The validator reports every error at once and, when the payload is
+    valid, fills in webhook.optional_fields defaults in place.
+
+    Args:
+        webhook_config: Webhook configuration
+        trading_config: Trading configuration (optional, enables volume and symbol limits)
+
+    Returns:
+        Callable taking a payload and returning {'valid', 'message', 'errors'}
+    """
+    required_fields = tuple(webhook_config.get('required_fields') or ())
+    optional_fields = dict(webhook_config.get('optional_fields') or {})
+    defaults = tuple((field, value) for field, value in optional_fields.items()
+                     if field not in ENTRY_ONLY_DEFAULTS)
+    entry_defaults = tuple((field, value) for field, value in optional_fields.items()
+                           if field in ENTRY_ONLY_DEFAULTS)
+    valid_actions = frozenset(VALID_ACTIONS)
+    entry_actions = frozenset(ENTRY_ACTIONS)
+    symbol_match = SYMBOL_PATTERN.fullmatch
+
+    trade_check = compile_trade_validator(trading_config) if trading_config is not None else None
+    default_volume = optional_fields.get('volume', (trading_config or {}).get('default_volume', 0.1))
+
+    def validate(payload: Dict[str, Any]) -> Dict[str, Any]:
+        errors = []
+        for field in required_fields:
+            if field not in payload:
+                errors.append(f"Missing required field: {field}")
+
+        action = payload.get('action')
+        if action is not None:
+            if not isinstance(action, str) or action.lower() not in valid_actions:
+                errors.append(f"Invalid action: {action}. Must be one of {list(VALID_ACTIONS)}")
+                action = None
+            else:
+                action = action.lower()
+
+        symbol = payload.get('symbol')
+        if 'symbol' in payload:
+            if not isinstance(symbol, str) or not symbol.strip():
+                errors.append("Symbol must be a non-empty string")
+                symbol = None
+            elif not symbol_match(symbol.upper()):
+                errors.append(f"Invalid symbol format: {symbol}")
+                symbol = None
+
+        if 'close_type' in payload and payload['close_type'] not in ('long', 'short'):
+            errors.append(f"Invalid close_type: {payload['close_type']}. Must be one of ['long', 'short']")
+
+        volume = payload.get('volume', default_volume)
+        if 'volume' in payload and (not isinstance(volume, (int, float)) or volume <= 0):
+            errors.append("Volume must be a positive number")
+            volume = None
+
+        for field in PRICE_FIELDS:
+            price = payload.get(field)
+            if price is not None and (not isinstance(price, (int, float)) or price < 0):
+                errors.append(f"{field} must be a non-negative number or null")
+
+        if 'magic' in payload:
+            magic = payload['magic']
+            if not isinstance(magic, int) or magic < 0:
+                errors.append("Magic number must be a non-negative integer")
+
+        if 'comment' in payload:
+            comment = payload['comment']
+            if not isinstance(comment, str):
+                errors.append("Comment must be a string")
+            elif len(comment) > 255:
+                errors.append("Comment must be 255 characters or less")
+
+        # Volume and symbol limits apply to entries, as at execution time
+        is_entry = action in entry_actions
+        if trade_check and is_entry and symbol:
+            errors.extend(trade_check(symbol.upper(), volume, action))
+
+        if errors:
+            return {'valid': False, 'message': '; '.join(errors), 'errors': errors}
+
+        for field, value in defaults:
+            if field not in payload:
+                payload[field] = value
+        if is_entry:
+            for field, value in entry_defaults:
+                if field not in payload:
+                    payload[field] = value
+        return {'valid': True, 'message': '', 'errors': []}
+
+    return validate
+
+
+def compile_trade_validator(trading_config: Dict[str, Any]) -> Callable[[str, Optional[float], str], List[str]]:
+    """
+    Compile trading limits into a trade parameter check.
+
+    Args:
+        trading_config: Trading configuration
+
+    Returns:
+        Callable taking (symbol, volume, action) and returning a list of errors
+    """
+    min_volume = trading_config.get('min_volume', 0.01)
+    max_volume = trading_config.get('max_volume', 100.0)
+    allowed_symbols = frozenset(trading_config.get('allowed_symbols') or ())
+    valid_actions = frozenset(VALID_ACTIONS)
+
+    def check(symbol: str, volume: Optional[float], action: str) -> List[str]:
+        errors = []
+        if volume is not None:
+            if volume < min_volume:
+                errors.append(f"Volume {volume} is below minimum {min_volume}")
+            elif volume > max_volume:
+                errors.append(f"Volume {volume} exceeds maximum {max_volume}")
+        if allowed_symbols and symbol not in allowed_symbols:
+            errors.append(f"Symbol {symbol} is not in allowed symbols list")
+        if action.lower() not in valid_actions:
+            errors.append(f"Invalid action: {action}")
+        return errors
+
+    return check
+
+
 def validate_symbol_format(symbol: str) -> bool:
     """
     Validate trading symbol format.